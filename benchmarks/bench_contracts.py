@@ -0,0 +1,92 @@
+"""
+Scaling benchmark for the contract primitives (IoU, thresholding, NMS, drawing).
+
+Times ``iou``, ``iou_matrix``, ``apply_threshold``, ``nms`` and ``draw_boxes``
+over growing numbers of synthetic detections.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_contracts --out benchmarks/results/contracts.json
+    python -m benchmarks.bench_contracts --sizes 10 100 1000 --generators clustered
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Callable, Dict, List
+
+import numpy as np
+from PIL import Image
+
+from src.vision.boxes import iou, iou_matrix
+from src.vision.contracts import apply_threshold, nms
+from src.vision.viz import draw_boxes
+
+from .harness import Measurement, measure, print_table, write_report
+from .synthetic import GENERATORS, SyntheticFrame
+
+DEFAULT_SIZES = [10, 100, 1_000, 5_000, 10_000, 50_000]
+#: Reference set size for ``iou_matrix`` (N × M, M fixed so the sweep stays linear in N).
+IOU_MATRIX_REFERENCE = 256
+DRAW_CANVAS = (1280, 720)
+#: Beyond this many boxes ``draw_boxes`` is skipped: PIL text rendering dominates.
+DRAW_MAX_BOXES = 5_000
+
+
+def _cases(frame: SyntheticFrame) -> Dict[str, Callable[[], object]]:
+    boxes, scores, labels = frame.boxes, frame.scores, frame.labels
+    box_list = boxes.to_boxes()
+    shifted = box_list[1:] + box_list[:1]
+    reference = boxes[: min(len(boxes), IOU_MATRIX_REFERENCE)]
+
+    scale = np.array([DRAW_CANVAS[0] / frame.width, DRAW_CANVAS[1] / frame.height] * 2)
+    draw_xyxy = type(boxes)(boxes.xyxy * scale)
+    canvas = Image.new("RGB", DRAW_CANVAS, color="white")
+
+    cases: Dict[str, Callable[[], object]] = {
+        "iou": lambda: [iou(a, b) for a, b in zip(box_list, shifted)],
+        "iou_matrix": lambda: iou_matrix(boxes, reference, chunk_size=4096),
+        "apply_threshold": lambda: apply_threshold(boxes, scores, labels, 0.3),
+        "nms": lambda: nms(boxes, scores, iou_threshold=0.5),
+    }
+    if len(boxes) <= DRAW_MAX_BOXES:
+        cases["draw_boxes"] = lambda: draw_boxes(
+            canvas, draw_xyxy, scores=scores, labels=labels, width=2, font_size=12
+        )
+    return cases
+
+
+def run(
+    sizes: List[int], generators: List[str], repeats: int, seed: int, only: List[str] | None
+) -> List[Measurement]:
+    """Run the sweep and return the measurements."""
+    results: List[Measurement] = []
+    for gen_name in generators:
+        for n in sizes:
+            frame = GENERATORS[gen_name](n, seed=seed)
+            for bench, fn in _cases(frame).items():
+                if only and bench not in only:
+                    continue
+                results.append(measure(bench, gen_name, n, fn, repeats=repeats))
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--generators", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS)
+    )
+    parser.add_argument("--only", nargs="+", help="Restrict to these benchmark names.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.generators, args.repeats, args.seed, args.only)
+    print_table(results)
+    write_report(args.out, "contracts", results)
+
+
+if __name__ == "__main__":
+    main()
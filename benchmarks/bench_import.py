@@ -0,0 +1,104 @@
+"""
+Cold import-time benchmark for the ``src.vision`` modules.
+
+Each module is imported in a fresh interpreter, several times, and the time
+spent inside the ``import`` statement (excluding interpreter startup) is
+recorded together with the child's peak RSS. The script also reports which
+heavy ML frameworks an import dragged in, and can fail when a module exceeds a
+time budget.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_import --out benchmarks/results/import.json
+    python -m benchmarks.bench_import --modules src.vision.contracts --budget-ms 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import List
+
+from .harness import Measurement, print_table, write_report
+
+DEFAULT_MODULES = [
+    "src.vision.boxes",
+    "src.vision.contracts",
+    "src.vision.viz",
+    "src.vision.segmentation",
+    "src.vision.torchvision_det",
+    "src.vision.tfhub_det",
+    "src.vision.yolo_ultralytics_det",
+]
+HEAVY_MODULES = ["torch", "torchvision", "tensorflow", "tensorflow_hub", "ultralytics"]
+
+_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "rss": rss, "heavy": heavy}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """Import ``module`` in a fresh interpreter and return its timing report."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def run(modules: List[str], repeats: int) -> tuple[List[Measurement], dict]:
+    """Probe every module ``repeats`` times; return measurements and heavy imports."""
+    results: List[Measurement] = []
+    heavy: dict = {}
+    for module in modules:
+        runs = [probe(module) for _ in range(repeats)]
+        times = [r["seconds"] for r in runs]
+        heavy[module] = runs[0]["heavy"]
+        results.append(
+            Measurement(
+                benchmark=f"import:{module}",
+                generator="cold",
+                n=1,
+                repeats=repeats,
+                seconds_min=min(times),
+                seconds_median=statistics.median(times),
+                peak_bytes=max(r["rss"] for r in runs),
+            )
+        )
+    return results, heavy
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, help="Fail if any module's min exceeds this.")
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results, heavy = run(args.modules, args.repeats)
+    print_table(results)
+    for module, loaded in heavy.items():
+        if loaded:
+            print(f"{module} imported heavy frameworks: {', '.join(loaded)}", file=sys.stderr)
+    write_report(args.out, "import", results)
+
+    if args.budget_ms is not None:
+        slow = [m for m in results if m.seconds_min * 1e3 > args.budget_ms]
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Overhead benchmark for ``src.vision.instrumentation``.
+
+Times calls in three configurations: the undecorated function (``__wrapped__``),
+instrumentation disabled (the default), and enabled with a
+:class:`HistogramSink`. Two cases are measured: a tiny ``nms`` call (10 boxes,
+so fixed per-call costs dominate) and an empty ``with stage(...)`` block,
+against an empty function call as baseline. The per-call overhead in
+nanoseconds is printed to stderr.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_instrumentation --calls 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Callable, List
+
+from src.vision import instrumentation as inst
+from src.vision.contracts import nms
+
+from .harness import Measurement, measure, print_table, write_report
+from .synthetic import clustered
+
+
+def _loop(fn: Callable[[], object], calls: int) -> Callable[[], None]:
+    def run() -> None:
+        for _ in range(calls):
+            fn()
+
+    return run
+
+
+def _noop() -> None:
+    pass
+
+
+def _empty_stage() -> None:
+    with inst.stage("bench.empty"):
+        pass
+
+
+def run(calls: int, repeats: int, seed: int) -> List[Measurement]:
+    """Measure each case with instrumentation off, then on."""
+    frame = clustered(10, seed=seed)
+    boxes, scores = frame.boxes, frame.scores
+    cases = {
+        "nms": lambda: nms(boxes, scores),
+        "stage": _empty_stage,
+    }
+    raw = nms.__wrapped__
+
+    def timed(name: str, fn: Callable[[], object]) -> Measurement:
+        return measure(name, "clustered_10", calls, _loop(fn, calls), repeats=repeats)
+
+    results = [timed("noop", _noop), timed("nms:raw", lambda: raw(boxes, scores))]
+    results += [timed(f"{name}:disabled", fn) for name, fn in cases.items()]
+    with inst.instrument(inst.HistogramSink()):
+        results += [timed(f"{name}:histogram", fn) for name, fn in cases.items()]
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000, help="Calls per timed run.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(args.calls, args.repeats, args.seed)
+    print_table(results)
+    per_call = {m.benchmark: m.seconds_min / m.n * 1e9 for m in results}
+    for name, ns in per_call.items():
+        print(f"{name:<20}{ns:>10.0f} ns/call", file=sys.stderr)
+    for label, case, base in (
+        ("nms, disabled", "nms:disabled", "nms:raw"),
+        ("nms, histogram", "nms:histogram", "nms:raw"),
+        ("stage, disabled", "stage:disabled", "noop"),
+        ("stage, histogram", "stage:histogram", "noop"),
+    ):
+        overhead = per_call[case] - per_call[base]
+        print(f"overhead {label:<18}{overhead:>10.0f} ns/call", file=sys.stderr)
+    write_report(args.out, "instrumentation", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Class-map storage benchmark: one file per mask versus a chunked ClassMapStore.
+
+Compares one ``save_class_map_npz`` file per mask with the chunked
+:class:`~src.vision.mask_store.ClassMapStore` (RLE and zlib codecs). For each
+backend it times a bulk write, reading every mask back, and reading a small
+window of every mask, and reports the bytes on disk.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_mask_store --out benchmarks/results/mask_store.json
+    python -m benchmarks.bench_mask_store --count 2000 --size 256 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.vision.mask_store import ClassMapStore
+from src.vision.segmentation import save_class_map_npz
+
+from .harness import Measurement, measure, print_table, write_report
+from .synthetic import class_maps
+
+#: Window read from every mask (rows, then columns), as a fraction of the mask size.
+WINDOW = (0.25, 0.375, 0.25, 0.375)
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _npz_case(root: Path, maps: List[np.ndarray], window) -> Dict[str, Callable[[], object]]:
+    def write() -> None:
+        shutil.rmtree(root, ignore_errors=True)
+        for i, m in enumerate(maps):
+            save_class_map_npz(m, root / f"{i:06d}.npz")
+
+    def read_all() -> None:
+        for i in range(len(maps)):
+            with np.load(root / f"{i:06d}.npz") as f:
+                f["class_map"]
+
+    def read_window() -> None:
+        y0, y1, x0, x1 = window
+        for i in range(len(maps)):
+            with np.load(root / f"{i:06d}.npz") as f:
+                f["class_map"][y0:y1, x0:x1]
+
+    return {"write": write, "read": read_all, "window": read_window}
+
+
+def _store_case(
+    root: Path, maps: List[np.ndarray], window, codec: str
+) -> Dict[str, Callable[[], object]]:
+    path = root / "masks.cms"
+
+    def write() -> None:
+        shutil.rmtree(root, ignore_errors=True)
+        with ClassMapStore(path, mode="a", codec=codec) as store:
+            store.append_many((f"{i:06d}", m) for i, m in enumerate(maps))
+
+    def read_all() -> None:
+        with ClassMapStore(path) as store:
+            for key in store:
+                store.read(key)
+
+    def read_window() -> None:
+        y0, y1, x0, x1 = window
+        with ClassMapStore(path) as store:
+            for key in store:
+                store.read_window(key, y0, y1, x0, x1)
+
+    return {"write": write, "read": read_all, "window": read_window}
+
+
+def run(
+    count: int, height: int, width: int, repeats: int, seed: int
+) -> tuple[List[Measurement], Dict[str, int]]:
+    """Run every backend; return the measurements and the bytes on disk per backend."""
+    maps = class_maps(count, height=height, width=width, seed=seed)
+    window = (
+        int(WINDOW[0] * height),
+        int(WINDOW[1] * height),
+        int(WINDOW[2] * width),
+        int(WINDOW[3] * width),
+    )
+    generator = f"blobs_{height}x{width}"
+    results: List[Measurement] = []
+    sizes: Dict[str, int] = {}
+    tmp = Path(tempfile.mkdtemp(prefix="bench_mask_store_"))
+    try:
+        backends = {
+            "npz": _npz_case(tmp / "npz", maps, window),
+            "store_rle": _store_case(tmp / "rle", maps, window, "rle"),
+            "store_zlib": _store_case(tmp / "zlib", maps, window, "zlib"),
+        }
+        for name, cases in backends.items():
+            for op in ("write", "read", "window"):
+                results.append(
+                    measure(f"{op}:{name}", generator, count, cases[op], repeats=repeats)
+                )
+            sizes[name] = _dir_bytes(tmp / name.replace("store_", ""))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results, sizes
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1000, help="Number of masks.")
+    parser.add_argument("--size", type=int, nargs=2, default=(512, 512), metavar=("H", "W"))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results, sizes = run(args.count, args.size[0], args.size[1], args.repeats, args.seed)
+    print_table(results)
+    for name, n_bytes in sizes.items():
+        print(f"{name:<12}{n_bytes / 2**20:>10.2f} MiB on disk", file=sys.stderr)
+    write_report(args.out, "mask_store", results)
+
+
+if __name__ == "__main__":
+    main()
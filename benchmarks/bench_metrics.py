@@ -0,0 +1,106 @@
+"""
+Throughput benchmark for the streaming evaluators in ``src.vision.metrics``.
+
+Detection: ``evaluate_detections`` over seeded synthetic images (clustered raw
+candidates as predictions, one jittered ground-truth box per cluster), with 0
+and N worker processes. Segmentation: ``ConfusionMatrix.update`` over seeded
+class-map pairs.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_metrics --images 10000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List
+
+import numpy as np
+
+from src.vision.metrics import ConfusionMatrix, DetectionEvaluator, evaluate_detections
+
+from .harness import Measurement, measure, print_table, write_report
+from .synthetic import class_maps, clustered
+
+
+def detection_images(count: int, candidates: int, seed: int) -> list:
+    """Per-image (pred_boxes, pred_scores, pred_labels, gt_boxes, gt_labels) tuples."""
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        frame = clustered(candidates, seed=seed + i)
+        gt_idx = rng.choice(len(frame.boxes), size=max(1, candidates // 8), replace=False)
+        images.append(
+            (
+                frame.boxes.xyxy,
+                frame.scores,
+                frame.labels,
+                frame.boxes.xyxy[gt_idx] + rng.normal(0, 2, size=(gt_idx.size, 4)),
+                frame.labels[gt_idx],
+            )
+        )
+    return images
+
+
+def run(count: int, candidates: int, workers: int, repeats: int, seed: int) -> List[Measurement]:
+    """Measure detection evaluation (in-process and pooled) and confusion-matrix updates."""
+    images = detection_images(count, candidates, seed)
+    generator = f"clustered_{candidates}"
+    results = [
+        measure(
+            "detection_map",
+            generator,
+            count,
+            lambda: evaluate_detections(images, DetectionEvaluator()).report(),
+            repeats=repeats,
+            max_seconds=60.0,
+        )
+    ]
+    if workers > 1:
+        results.append(
+            measure(
+                f"detection_map:workers={workers}",
+                generator,
+                count,
+                lambda: evaluate_detections(images, workers=workers).report(),
+                repeats=repeats,
+                max_seconds=60.0,
+            )
+        )
+
+    targets = class_maps(min(count, 200), seed=seed)
+    predictions = class_maps(len(targets), seed=seed + 1)
+
+    def confusion() -> None:
+        cm = ConfusionMatrix(21)
+        for t, p in zip(targets, predictions):
+            cm.update(t, p)
+        cm.report()
+
+    results.append(
+        measure("confusion_matrix", "blobs_512x512", len(targets), confusion, repeats=repeats)
+    )
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=2000)
+    parser.add_argument("--candidates", type=int, default=100, help="Predictions per image.")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(args.images, args.candidates, args.workers, args.repeats, args.seed)
+    print_table(results)
+    for m in results:
+        print(f"{m.benchmark:<28}{m.n / m.seconds_min:>10.0f} images/s", file=sys.stderr)
+    write_report(args.out, "metrics", results)
+
+
+if __name__ == "__main__":
+    main()
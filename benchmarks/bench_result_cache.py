@@ -0,0 +1,132 @@
+"""
+Result cache benchmark: storing, reading and re-post-processing cached results.
+
+Stores and reads raw detections and class maps with
+:class:`~src.vision.result_cache.ResultCache`, and runs a post-processing sweep
+served from the cache.
+
+Cases (per image): ``put``/``get`` of raw detections (float32 boxes, as backends
+return them), ``sweep`` (``get`` plus threshold and NMS, i.e. the whole cost of
+one configuration in a parameter sweep once the cache is warm), ``put``/``get``
+of class maps, and ``key`` (hashing a 480x640 frame and deriving its key). The
+bytes on disk per entry are printed to stderr.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_result_cache --images 1000 --detections 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from src.vision.batch import PostprocessConfig, postprocess_image
+from src.vision.contracts import DetectionResult
+from src.vision.model_cache import ModelKey
+from src.vision.result_cache import ResultCache, cache_key, image_digest
+
+from .harness import Measurement, measure, print_table, write_report
+from .synthetic import class_maps, clustered
+
+MODEL = ModelKey("torchvision", "ssdlite320_mobilenet_v3_large", "COCO_V1", "cpu")
+
+
+def _raw_results(images: int, detections: int, seed: int) -> List[DetectionResult]:
+    results = []
+    for i in range(images):
+        frame = clustered(detections, seed=seed + i)
+        result = DetectionResult.from_labels(
+            frame.boxes.xyxy.astype(np.float32), frame.scores.astype(np.float32), frame.labels
+        )
+        results.append(result)
+    return results
+
+
+def run(
+    images: int, detections: int, mask_size: int, repeats: int, seed: int
+) -> Tuple[List[Measurement], dict]:
+    """Measure every case; return the measurements and the bytes per entry."""
+    raw = _raw_results(images, detections, seed)
+    maps = class_maps(images, height=mask_size, width=mask_size, seed=seed)
+    det_keys = [cache_key(f"det{i}", MODEL) for i in range(images)]
+    map_keys = [cache_key(f"map{i}", MODEL) for i in range(images)]
+    frame = np.random.default_rng(seed).integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+    config = PostprocessConfig(threshold=0.3, iou_threshold=0.5)
+    root = Path(tempfile.mkdtemp(prefix="bench_result_cache_"))
+    try:
+        cache = ResultCache(root)
+
+        def put_detections() -> None:
+            for key, r in zip(det_keys, raw):
+                cache.put_detections(key, r)
+
+        def get_detections() -> None:
+            for key in det_keys:
+                cache.get_detections(key)
+
+        def sweep() -> None:
+            for key in det_keys:
+                r = cache.get_detections(key)
+                postprocess_image(r.boxes.xyxy, r.scores.astype(np.float64), r.labels, config)
+
+        def put_maps() -> None:
+            for key, m in zip(map_keys, maps):
+                cache.put_class_map(key, m)
+
+        def get_maps() -> None:
+            for key in map_keys:
+                cache.get_class_map(key)
+
+        def key_frames() -> None:
+            for _ in range(images):
+                cache_key(image_digest(frame), MODEL, {"max_detections": detections})
+
+        generator = f"clustered_{detections}"
+        results = [
+            measure("put:detections", generator, images, put_detections, repeats=repeats),
+            measure("get:detections", generator, images, get_detections, repeats=repeats),
+            measure("sweep:cache", generator, images, sweep, repeats=repeats),
+        ]
+        generator = f"blobs_{mask_size}x{mask_size}"
+        results += [
+            measure("put:class_map", generator, images, put_maps, repeats=repeats),
+            measure("get:class_map", generator, images, get_maps, repeats=repeats),
+            measure("key:frame", "uint8_480x640", images, key_frames, repeats=repeats),
+        ]
+        sizes = {
+            "detections": np.mean([cache.path(k).stat().st_size for k in det_keys]),
+            "class_map": np.mean([cache.path(k).stat().st_size for k in map_keys]),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results, sizes
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--detections", type=int, default=300, help="Raw detections per image.")
+    parser.add_argument("--mask-size", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results, sizes = run(args.images, args.detections, args.mask_size, args.repeats, args.seed)
+    print_table(results)
+    for m in results:
+        print(f"{m.benchmark:<18}{m.seconds_min / m.n * 1e6:>10.0f} us/image", file=sys.stderr)
+    for kind, n_bytes in sizes.items():
+        print(f"{kind:<18}{n_bytes / 1024:>10.1f} KiB/entry", file=sys.stderr)
+    write_report(args.out, "result_cache", results)
+
+
+if __name__ == "__main__":
+    main()
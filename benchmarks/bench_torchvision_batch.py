@@ -0,0 +1,107 @@
+"""
+Throughput benchmark for batched SSDlite MobileNet V3 inference (torchvision).
+
+A fixed set of seeded random images is run through
+``run_torchvision_ssd_mobilenet_batch`` at several batch sizes, and also through
+the single-image ``run_torchvision_ssd_mobilenet`` as a baseline. Requires
+``torch`` and ``torchvision``; the pretrained weights are downloaded on first use.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_torchvision_batch --device cpu \
+        --out benchmarks/results/torch_batch.json
+    python -m benchmarks.bench_torchvision_batch --batch-sizes 1 4 16 32 --images 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from src.vision.torchvision_det import (
+    load_torchvision_ssd_mobilenet,
+    run_torchvision_ssd_mobilenet,
+    run_torchvision_ssd_mobilenet_batch,
+)
+
+from .harness import Measurement, measure, print_table, write_report
+
+DEFAULT_BATCH_SIZES = [1, 4, 16, 32]
+DEFAULT_IMAGE_SIZE = (640, 480)
+
+
+def random_images(count: int, size: Tuple[int, int], seed: int) -> List[Image.Image]:
+    """Seeded RGB noise images of a single size."""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    return [
+        Image.fromarray(rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8), mode="RGB")
+        for _ in range(count)
+    ]
+
+
+def run(
+    batch_sizes: List[int], count: int, size: Tuple[int, int], repeats: int, seed: int, device: str
+) -> List[Measurement]:
+    """Measure the single-image loop and each batch size on the same images."""
+    images = random_images(count, size, seed)
+    generator = f"noise_{size[0]}x{size[1]}"
+    load_torchvision_ssd_mobilenet(device)  # keep loading out of the timings
+
+    results = [
+        measure(
+            "single",
+            generator,
+            count,
+            lambda: [run_torchvision_ssd_mobilenet(im, device=device) for im in images],
+            repeats=repeats,
+            max_seconds=60.0,
+        )
+    ]
+    for batch_size in batch_sizes:
+        results.append(
+            measure(
+                f"batch={batch_size}",
+                generator,
+                count,
+                lambda b=batch_size: run_torchvision_ssd_mobilenet_batch(
+                    images, batch_size=b, device=device
+                ),
+                repeats=repeats,
+                max_seconds=60.0,
+            )
+        )
+    return results
+
+
+def print_throughput(measurements: List[Measurement]) -> None:
+    """Print images/s (from the fastest run) for each measurement to stderr."""
+    for m in measurements:
+        print(f"{m.benchmark:<12}{m.n / m.seconds_min:>10.1f} images/s", file=sys.stderr)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--images", type=int, default=64, help="Images per timed run.")
+    parser.add_argument("--size", type=int, nargs=2, default=DEFAULT_IMAGE_SIZE, metavar=("W", "H"))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.batch_sizes, args.images, tuple(args.size), args.repeats, args.seed, args.device
+    )
+    print_table(results)
+    print_throughput(results)
+    write_report(args.out, "torchvision_batch", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Per-frame cost of ``src.vision.tracking.Tracker``.
+
+Simulates ``--objects`` boxes moving at constant velocity with positional noise,
+each missed in a random ``--miss-rate`` fraction of frames, and times a fresh
+tracker over ``--frames`` frames for every object count and assignment strategy
+(``hungarian`` is skipped when scipy is not installed). Milliseconds per frame and
+the mean number of track ids per object (1.0 means no identity switches) are
+printed to stderr.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_tracking --objects 100 300 1000 --frames 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import sys
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from src.vision.tracking import Tracker
+
+from .harness import Measurement, measure, print_table, write_report
+
+Frames = List[Tuple[np.ndarray, np.ndarray]]
+
+
+def moving_objects(n: int, frames: int, *, miss_rate: float, seed: int) -> Frames:
+    """Per-frame (boxes, object ids) of ``n`` objects on a canvas that grows with ``n``."""
+    rng = np.random.default_rng(seed)
+    side = 100.0 * np.sqrt(n)
+    start = rng.uniform(0, side, size=(n, 2))
+    velocity = rng.uniform(-4, 4, size=(n, 2))
+    size = rng.uniform(20, 60, size=(n, 2))
+    out: Frames = []
+    for f in range(frames):
+        xy = start + velocity * f
+        boxes = np.hstack([xy, xy + size]) + rng.normal(0, 1.0, size=(n, 4))
+        keep = np.flatnonzero(rng.random(n) >= miss_rate)
+        out.append((boxes[keep], keep))
+    return out
+
+
+def ids_per_object(tracker: Tracker, frames: Frames) -> float:
+    tracker.reset()
+    seen = {}
+    for boxes, objects in frames:
+        tracked = tracker.update(boxes)
+        matched = objects[tracked.detection_index]
+        for obj, track_id in zip(matched.tolist(), tracked.track_ids.tolist()):
+            seen.setdefault(obj, set()).add(track_id)
+    return float(np.mean([len(ids) for ids in seen.values()]))
+
+
+def run(
+    objects: Sequence[int], frames: int, miss_rate: float, repeats: int, seed: int
+) -> List[Tuple[Measurement, float]]:
+    """Measure every object count with each available assignment strategy."""
+    strategies = ["greedy"]
+    if importlib.util.find_spec("scipy") is not None:
+        strategies.append("hungarian")
+    results = []
+    for n in objects:
+        sequence = moving_objects(n, frames, miss_rate=miss_rate, seed=seed)
+        for strategy in strategies:
+            tracker = Tracker(assignment=strategy)
+
+            def replay() -> None:
+                tracker.reset()
+                for boxes, _ in sequence:
+                    tracker.update(boxes)
+
+            m = measure(f"tracker:{strategy}", f"moving_{n}", frames, replay, repeats=repeats)
+            results.append((m, ids_per_object(tracker, sequence)))
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--objects", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--miss-rate", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(args.objects, args.frames, args.miss_rate, args.repeats, args.seed)
+    measurements = [m for m, _ in results]
+    print_table(measurements)
+    for m, ids in results:
+        ms = m.seconds_min / m.n * 1e3
+        print(f"{m.benchmark:<20}{m.generator:<14}{ms:>8.2f} ms/frame  {ids:.3f} ids/object",
+              file=sys.stderr)
+    write_report(args.out, "tracking", measurements)
+
+
+if __name__ == "__main__":
+    main()
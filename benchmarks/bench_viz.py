@@ -0,0 +1,89 @@
+"""
+Frames-per-second benchmark for annotating a video stream.
+
+Each case draws the detections of a sequence of synthetic 1280×720 frames
+(seeded clustered boxes with scores and class names):
+
+- ``draw_boxes``: the one-shot API, copying every frame;
+- ``draw_boxes:inplace``: the same without the copy;
+- ``renderer:pil``: :class:`BoxRenderer` on PIL frames (cached label patches);
+- ``renderer:array``: :class:`BoxRenderer` on uint8 arrays (NumPy outlines).
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_viz --frames 60 --boxes 10 50 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Callable, Dict, List
+
+import numpy as np
+from PIL import Image
+
+from src.vision.boxes import BoxArray
+from src.vision.viz import BoxRenderer, draw_boxes
+
+from .harness import Measurement, measure, print_table, write_report
+from .synthetic import clustered
+
+FRAME_SIZE = (1280, 720)
+STYLE = dict(color="red", width=2)
+FONT_SIZE = 14
+
+
+def _detections(count: int, boxes: int, seed: int) -> list:
+    scale = np.array([FRAME_SIZE[0] / 1920, FRAME_SIZE[1] / 1080] * 2)
+    frames = []
+    for i in range(count):
+        f = clustered(boxes, seed=seed + i)
+        frames.append((BoxArray(f.boxes.xyxy * scale), f.scores, f.labels))
+    return frames
+
+
+def _cases(detections: list) -> Dict[str, Callable[[], object]]:
+    images = [Image.new("RGB", FRAME_SIZE, "white") for _ in detections]
+    arrays = [np.full((FRAME_SIZE[1], FRAME_SIZE[0], 3), 255, np.uint8) for _ in detections]
+    renderer = BoxRenderer(font_size=FONT_SIZE, **STYLE)
+
+    def one_shot(inplace: bool) -> None:
+        for image, (b, s, label) in zip(images, detections):
+            draw_boxes(image, b, s, label, font_size=FONT_SIZE, inplace=inplace, **STYLE)
+
+    return {
+        "draw_boxes": lambda: one_shot(False),
+        "draw_boxes:inplace": lambda: one_shot(True),
+        "renderer:pil": lambda: [renderer.draw(im, *d) for im, d in zip(images, detections)],
+        "renderer:array": lambda: [renderer.draw(a, *d) for a, d in zip(arrays, detections)],
+    }
+
+
+def run(frames: int, sizes: List[int], repeats: int, seed: int) -> List[Measurement]:
+    """Measure every case for each boxes-per-frame count."""
+    results: List[Measurement] = []
+    for n in sizes:
+        for bench, fn in _cases(_detections(frames, n, seed)).items():
+            results.append(measure(bench, f"clustered_{n}", frames, fn, repeats=repeats))
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--boxes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(args.frames, args.boxes, args.repeats, args.seed)
+    print_table(results)
+    for m in results:
+        print(f"{m.benchmark:<22}{m.generator:<16}{m.n / m.seconds_min:>8.0f} fps", file=sys.stderr)
+    write_report(args.out, "viz", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Throughput benchmark for the persistent, streaming YOLO predictor (ultralytics).
+
+A fixed set of seeded random frames is run through the per-call
+``run_yolo_ultralytics`` (one ``predict`` per image, the baseline) and through
+``YoloPredictor.stream`` at several batch sizes, as PIL images and as RGB arrays.
+Requires ``ultralytics``; the weights are downloaded on first use.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_yolo --device cpu --out benchmarks/results/yolo.json
+    python -m benchmarks.bench_yolo --batch-sizes 1 8 32 --images 64
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import List, Tuple
+
+import numpy as np
+
+from src.vision.yolo_ultralytics_det import YoloPredictor, load_yolo_model, run_yolo_ultralytics
+
+from .bench_torchvision_batch import print_throughput, random_images
+from .harness import Measurement, measure, print_table, write_report
+
+DEFAULT_BATCH_SIZES = [1, 8, 16]
+DEFAULT_IMAGE_SIZE = (640, 480)
+
+
+def run(
+    batch_sizes: List[int],
+    count: int,
+    size: Tuple[int, int],
+    repeats: int,
+    seed: int,
+    model_name: str,
+    device: str,
+) -> List[Measurement]:
+    """Measure the per-call baseline and the streaming predictor on the same frames."""
+    images = random_images(count, size, seed)
+    arrays = [np.asarray(im) for im in images]
+    generator = f"noise_{size[0]}x{size[1]}"
+    load_yolo_model(model_name)  # keep loading out of the timings
+
+    results = [
+        measure(
+            "per_call",
+            generator,
+            count,
+            lambda: [run_yolo_ultralytics(im, model_name=model_name) for im in images],
+            repeats=repeats,
+            max_seconds=60.0,
+        )
+    ]
+    for batch_size in batch_sizes:
+        predictor = YoloPredictor(model_name, batch_size=batch_size, device=device)
+        for kind, frames in (("pil", images), ("array", arrays)):
+            results.append(
+                measure(
+                    f"stream:{kind}:batch={batch_size}",
+                    generator,
+                    count,
+                    lambda p=predictor, f=frames: sum(1 for _ in p.stream(f)),
+                    repeats=repeats,
+                    max_seconds=60.0,
+                )
+            )
+    return results
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--images", type=int, default=64, help="Frames per timed run.")
+    parser.add_argument("--size", type=int, nargs=2, default=DEFAULT_IMAGE_SIZE, metavar=("W", "H"))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--out", help="JSON report path (default: print to stdout).")
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.batch_sizes,
+        args.images,
+        tuple(args.size),
+        args.repeats,
+        args.seed,
+        args.model,
+        args.device,
+    )
+    print_table(results)
+    print_throughput(results)
+    write_report(args.out, "yolo", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare two benchmark reports and flag regressions.
+
+Rows are matched on ``(benchmark, generator, n)``. A row regresses when the
+candidate's ``seconds_min`` exceeds the baseline's by more than ``--tolerance``
+(relative). The exit status is 1 if any row regresses, so the script can gate CI.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json candidate.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+Key = Tuple[str, str, int]
+
+
+def _load(path: str) -> Dict[Key, dict]:
+    report = json.loads(Path(path).read_text())
+    return {(r["benchmark"], r["generator"], r["n"]): r for r in report["results"]}
+
+
+def compare(baseline: str, candidate: str, tolerance: float) -> List[Tuple[Key, float, bool]]:
+    """
+    Compute the speed ratio (candidate / baseline) for every shared row.
+
+    :param baseline: Path to the reference report.
+    :param candidate: Path to the report under test.
+    :param tolerance: Allowed relative slowdown before a row counts as a regression.
+    :returns: ``(key, ratio, regressed)`` per shared row, sorted by key.
+    """
+    base = _load(baseline)
+    cand = _load(candidate)
+    rows = []
+    for key in sorted(base.keys() & cand.keys()):
+        ratio = cand[key]["seconds_min"] / max(base[key]["seconds_min"], 1e-12)
+        rows.append((key, ratio, ratio > 1.0 + tolerance))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    rows = compare(args.baseline, args.candidate, args.tolerance)
+    for (bench, gen, n), ratio, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{bench:<40}{gen:<14}{n:>8}{ratio:>9.2f}x  {flag}")
+    return 1 if any(r for _, _, r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Shared timing, memory and reporting helpers for the benchmark scripts.
+
+Timings use ``time.perf_counter`` over several repeats (the minimum is the most
+stable statistic, the median is reported alongside). Peak memory is measured in
+a separate, untimed run under ``tracemalloc``, which also sees NumPy buffers.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """
+    One benchmark data point.
+
+    :ivar benchmark: Name of the measured operation.
+    :ivar generator: Name of the input distribution.
+    :ivar n: Problem size (number of detections, frames, ...).
+    :ivar repeats: Number of timed runs.
+    :ivar seconds_min: Fastest run.
+    :ivar seconds_median: Median run.
+    :ivar peak_bytes: Peak traced allocation during one run.
+    """
+    benchmark: str
+    generator: str
+    n: int
+    repeats: int
+    seconds_min: float
+    seconds_median: float
+    peak_bytes: int
+
+
+def measure(
+    benchmark: str,
+    generator: str,
+    n: int,
+    fn: Callable[[], Any],
+    *,
+    repeats: int = 5,
+    max_seconds: float = 10.0,
+) -> Measurement:
+    """
+    Time ``fn`` and record its peak memory.
+
+    :param benchmark: Operation name.
+    :param generator: Input distribution name.
+    :param n: Problem size.
+    :param fn: Zero-argument callable running the operation once.
+    :param repeats: Maximum number of timed runs.
+    :param max_seconds: Stop repeating once this much time has been spent.
+    :returns: The measurement.
+    """
+    times: List[float] = []
+    spent = 0.0
+    while len(times) < repeats and (not times or spent < max_seconds):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        spent += times[-1]
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(
+        benchmark=benchmark,
+        generator=generator,
+        n=n,
+        repeats=len(times),
+        seconds_min=min(times),
+        seconds_median=statistics.median(times),
+        peak_bytes=int(peak),
+    )
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """Metadata identifying where and on which revision a report was produced."""
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_report(
+    path: Optional[str | Path], suite: str, measurements: List[Measurement]
+) -> Dict[str, Any]:
+    """
+    Write a machine-readable JSON report (or print it when ``path`` is None).
+
+    :param path: Destination file. Parent directories are created.
+    :param suite: Suite name recorded in the report.
+    :param measurements: Data points to record.
+    :returns: The report as a dict.
+    """
+    report = {
+        "suite": suite,
+        "environment": environment(),
+        "results": [asdict(m) for m in measurements],
+    }
+    text = json.dumps(report, indent=2)
+    if path is None:
+        print(text)
+    else:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text + "\n")
+    return report
+
+
+def print_table(measurements: List[Measurement]) -> None:
+    """Print a compact human-readable table to stderr."""
+    bw = max([len("benchmark")] + [len(m.benchmark) for m in measurements]) + 2
+    gw = max([len("generator")] + [len(m.generator) for m in measurements]) + 2
+    header = (
+        f"{'benchmark':<{bw}}{'generator':<{gw}}{'n':>8}"
+        f"{'min ms':>12}{'median ms':>12}{'peak KiB':>12}"
+    )
+    print(header, file=sys.stderr)
+    for m in measurements:
+        print(
+            f"{m.benchmark:<{bw}}{m.generator:<{gw}}{m.n:>8}"
+            f"{m.seconds_min * 1e3:>12.3f}{m.seconds_median * 1e3:>12.3f}"
+            f"{m.peak_bytes / 1024:>12.1f}",
+            file=sys.stderr,
+        )
@@ -0,0 +1,132 @@
+"""
+Seeded generators of realistic detection outputs for benchmarks.
+
+Every generator returns a :class:`SyntheticFrame` with exactly ``n`` raw
+(pre-threshold, pre-NMS) detections and is fully determined by its ``seed``,
+so timings from different versions of the code are measured on identical inputs.
+
+- ``clustered``: a few objects, each surrounded by many jittered, overlapping
+  candidates (the typical raw output of an anchor-based detector).
+- ``dense_small``: many small, mostly disjoint boxes at a fixed density, as in
+  high-resolution aerial frames; the canvas grows with ``n``.
+- ``many_classes``: clustered candidates spread over a large label set
+  (Open Images scale), which stresses class-aware stages.
+
+:func:`class_maps` generates seeded segmentation class maps (blob-shaped
+regions on a background) for the segmentation storage and evaluation benchmarks.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.vision.boxes import BoxArray
+
+
+@dataclass(frozen=True)
+class SyntheticFrame:
+    """
+    Raw detections of one synthetic frame.
+
+    :ivar boxes: Candidate boxes (N, 4) in pixel XYXY.
+    :ivar scores: Candidate scores in [0, 1].
+    :ivar labels: Candidate class names.
+    :ivar width: Canvas width in pixels.
+    :ivar height: Canvas height in pixels.
+    """
+    boxes: BoxArray
+    scores: np.ndarray
+    labels: np.ndarray
+    width: int
+    height: int
+
+
+def _class_names(num_classes: int) -> np.ndarray:
+    return np.array([f"class_{i}" for i in range(num_classes)])
+
+
+def _jittered_clusters(
+    n: int,
+    rng: np.random.Generator,
+    *,
+    width: int,
+    height: int,
+    boxes_per_cluster: int,
+    num_classes: int,
+) -> SyntheticFrame:
+    n_objects = max(1, math.ceil(n / boxes_per_cluster))
+    wh = np.exp(rng.normal(np.log(80.0), 0.6, size=(n_objects, 2)))
+    wh = np.clip(wh, 8.0, [width / 2, height / 2])
+    xy = rng.uniform(0.0, 1.0, size=(n_objects, 2)) * ([width, height] - wh)
+    obj_labels = rng.integers(0, num_classes, size=n_objects)
+
+    owner = rng.integers(0, n_objects, size=n)
+    jitter = rng.normal(0.0, 0.08, size=(n, 4)) * np.tile(wh[owner], 2)
+    xyxy = np.hstack([xy[owner], xy[owner] + wh[owner]]) + jitter
+    xyxy[:, 2:] = np.maximum(xyxy[:, 2:], xyxy[:, :2] + 1.0)
+
+    scores = rng.beta(2.0, 5.0, size=n)
+    labels = _class_names(num_classes)[obj_labels[owner]]
+    return SyntheticFrame(BoxArray(xyxy), scores, labels, width, height)
+
+
+def clustered(n: int, *, seed: int = 0) -> SyntheticFrame:
+    """~8 overlapping candidates per object on a 1920×1080 frame, 20 classes."""
+    rng = np.random.default_rng(seed)
+    return _jittered_clusters(
+        n, rng, width=1920, height=1080, boxes_per_cluster=8, num_classes=20
+    )
+
+
+def dense_small(n: int, *, seed: int = 0, density: float = 2e-4) -> SyntheticFrame:
+    """Small (4-24 px) boxes at ``density`` boxes per square pixel, 5 classes."""
+    rng = np.random.default_rng(seed)
+    side = int(math.ceil(math.sqrt(max(n, 1) / density)))
+    wh = rng.uniform(4.0, 24.0, size=(n, 2))
+    xy = rng.uniform(0.0, side, size=(n, 2))
+    scores = rng.beta(2.0, 2.0, size=n)
+    labels = _class_names(5)[rng.integers(0, 5, size=n)]
+    return SyntheticFrame(BoxArray(np.hstack([xy, xy + wh])), scores, labels, side, side)
+
+
+def many_classes(n: int, *, seed: int = 0) -> SyntheticFrame:
+    """Clustered candidates (4 per object) over 600 classes on a 1920×1080 frame."""
+    rng = np.random.default_rng(seed)
+    return _jittered_clusters(
+        n, rng, width=1920, height=1080, boxes_per_cluster=4, num_classes=600
+    )
+
+
+GENERATORS: Dict[str, Callable[..., SyntheticFrame]] = {
+    "clustered": clustered,
+    "dense_small": dense_small,
+    "many_classes": many_classes,
+}
+
+
+def class_maps(
+    n: int, *, height: int = 512, width: int = 512, num_classes: int = 21, seed: int = 0
+) -> List[np.ndarray]:
+    """
+    ``n`` uint8 class maps with a few rectangular and elliptical objects each on a
+    background of class 0, similar in run structure to real VOC predictions.
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    maps = []
+    for _ in range(n):
+        m = np.zeros((height, width), dtype=np.uint8)
+        for _ in range(int(rng.integers(2, 8))):
+            cy, cx = rng.uniform(0, height), rng.uniform(0, width)
+            ry, rx = rng.uniform(0.05, 0.3) * height, rng.uniform(0.05, 0.3) * width
+            label = int(rng.integers(1, num_classes))
+            if rng.uniform() < 0.5:
+                m[((yy - cy) / ry) ** 2 + ((xx - cx) / rx) ** 2 <= 1.0] = label
+            else:
+                m[int(max(cy - ry, 0)) : int(cy + ry), int(max(cx - rx, 0)) : int(cx + rx)] = label
+        maps.append(m)
+    return maps
@@ -0,0 +1,30 @@
+"""
+Deferred imports of optional ML frameworks.
+
+Backends call :func:`import_optional` at first use instead of importing torch,
+TensorFlow or ultralytics at module import time, so code that only needs the
+framework-agnostic modules (``boxes``, ``contracts``, ...) starts fast and works
+without any framework installed.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+
+
+def import_optional(name: str, install_hint: str) -> ModuleType:
+    """
+    Import ``name`` on demand, with an actionable error if it is missing.
+
+    After the first call this is a ``sys.modules`` lookup.
+
+    :param name: Dotted module name, e.g. "torchvision.models.detection".
+    :param install_hint: Message telling the user how to install the framework.
+    :returns: The imported module.
+    :raises RuntimeError: If the module cannot be imported.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError as exc:
+        raise RuntimeError(install_hint) from exc
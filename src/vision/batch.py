@@ -0,0 +1,224 @@
+"""
+Multi-image batching: grouping inputs for inference and applying the contract
+stages to many frames at once.
+
+Design goals
+------------
+- Same semantics as calling :func:`~src.vision.contracts.apply_threshold` and
+  :func:`~src.vision.contracts.nms` image by image; only the scheduling changes.
+- Deterministic: results come back in input order, identical for any worker
+  count or chunk size.
+- Low IPC overhead: images are shipped to worker processes as plain NumPy arrays,
+  grouped in chunks so each task carries many frames.
+- Framework-agnostic: size bucketing for inference batches works on any items
+  with a hashable shape key, so backends share it.
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+
+from .boxes import BoxArray, BoxesLike, as_xyxy
+from .contracts import apply_threshold, batched_nms, nms
+from .instrumentation import timed
+
+_CHUNKS_PER_WORKER = 4
+
+ImageDetections = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PostprocessConfig:
+    """
+    Parameters of the per-image contract stages.
+
+    :ivar threshold: Minimum score for a detection to be kept.
+    :ivar iou_threshold: IoU above which NMS suppresses a box.
+    :ivar top_k: Optional cap on candidates per image before NMS.
+    :ivar class_aware: If True, use :func:`batched_nms` (suppress within a label only).
+    :ivar max_output: Optional cap on kept detections per image after NMS.
+    """
+    threshold: float = 0.5
+    iou_threshold: float = 0.5
+    top_k: Optional[int] = None
+    class_aware: bool = False
+    max_output: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ImageResult:
+    """
+    Post-processed detections of a single image.
+
+    :ivar boxes: Kept boxes, in descending score order.
+    :ivar scores: Kept scores.
+    :ivar labels: Kept labels.
+    """
+    boxes: BoxArray
+    scores: np.ndarray
+    labels: np.ndarray
+
+
+@timed("batch.postprocess_image")
+def postprocess_image(
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    labels: np.ndarray,
+    config: PostprocessConfig,
+) -> ImageDetections:
+    """
+    Apply threshold and NMS to one image's detections.
+
+    :param xyxy: Array (N, 4) of boxes.
+    :param scores: Array (N,) of scores.
+    :param labels: Array (N,) of labels.
+    :param config: Stage parameters.
+    :returns: ``(xyxy, scores, labels)`` of the kept detections, in descending score order.
+    """
+    b, s, lb = apply_threshold(xyxy, scores, labels, config.threshold, top_k=config.top_k)
+    if config.class_aware:
+        keep = batched_nms(b, s, lb, config.iou_threshold, max_output=config.max_output)
+    else:
+        keep = nms(b, s, config.iou_threshold, max_output=config.max_output)
+    return b[keep], s[keep], lb[keep]
+
+
+def _postprocess_chunk(
+    chunk: Sequence[ImageDetections], config: PostprocessConfig
+) -> List[ImageDetections]:
+    """Worker entry point: post-process a chunk of images in order."""
+    return [postprocess_image(xyxy, s, lb, config) for xyxy, s, lb in chunk]
+
+
+def _default_chunk_size(n_images: int, workers: int) -> int:
+    return max(1, math.ceil(n_images / (workers * _CHUNKS_PER_WORKER)))
+
+
+def postprocess_batch(
+    boxes_per_image: Sequence[Union[BoxesLike, np.ndarray]],
+    scores_per_image: Sequence[Sequence[float]],
+    labels_per_image: Sequence[Sequence[Hashable]],
+    config: Optional[PostprocessConfig] = None,
+    *,
+    workers: int = 0,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> List[ImageResult]:
+    """
+    Apply threshold and NMS to the ragged detections of many images.
+
+    Work is split into contiguous chunks of images. With ``workers`` of 0 or 1
+    (and no ``executor``), chunks run in the calling process; otherwise they
+    are mapped over a process pool. ``Executor.map`` preserves chunk order, so
+    the output is identical whatever the worker count.
+
+    :param boxes_per_image: One box container (sequence of ``Box``, ``BoxArray``
+        or (N, 4) array) per image; N may differ per image.
+    :param scores_per_image: One score sequence per image.
+    :param labels_per_image: One label sequence per image.
+    :param config: Stage parameters. Defaults to :class:`PostprocessConfig`.
+    :param workers: Number of worker processes. 0 or 1 runs in-process.
+    :param chunk_size: Images per task. If None, about four chunks per worker are
+        used, which keeps the number of round-trips (and pickling overhead) low.
+    :param executor: Optional existing executor to reuse across calls. When
+        given, ``workers`` only affects the default chunk size.
+    :returns: One :class:`ImageResult` per image, in input order.
+    :raises ValueError: If the per-image sequences have different lengths, or if
+        ``workers`` or ``chunk_size`` are invalid.
+    """
+    if not (len(boxes_per_image) == len(scores_per_image) == len(labels_per_image)):
+        raise ValueError("boxes, scores, and labels must have one entry per image")
+    if workers < 0:
+        raise ValueError("workers must be non-negative")
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    cfg = PostprocessConfig() if config is None else config
+    images: List[ImageDetections] = [
+        (as_xyxy(b), np.asarray(s, dtype=np.float64), np.asarray(lb))
+        for b, s, lb in zip(boxes_per_image, scores_per_image, labels_per_image)
+    ]
+    size = chunk_size or _default_chunk_size(len(images), max(workers, 1))
+    chunks = [images[i : i + size] for i in range(0, len(images), size)]
+
+    if executor is None and workers <= 1:
+        outputs = [_postprocess_chunk(chunk, cfg) for chunk in chunks]
+    elif executor is not None:
+        outputs = list(executor.map(_postprocess_chunk, chunks, [cfg] * len(chunks)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_postprocess_chunk, chunks, [cfg] * len(chunks)))
+
+    return [
+        ImageResult(boxes=BoxArray(xyxy), scores=s, labels=lb)
+        for chunk in outputs
+        for xyxy, s, lb in chunk
+    ]
+
+
+def bucket_by_size(
+    items: Iterable[T],
+    batch_size: int,
+    size_of: Callable[[T], Hashable],
+    *,
+    max_pending: Optional[int] = None,
+) -> Iterator[List[Tuple[int, T]]]:
+    """
+    Group a stream of items into batches whose members share the same size key.
+
+    Items are buffered per key; a bucket is emitted as soon as it holds
+    ``batch_size`` items. To bound memory, when more than ``max_pending`` items
+    are buffered the fullest bucket is flushed early. Remaining partial buckets
+    are flushed at the end of the stream, in order of first appearance.
+
+    :param items: The input stream (e.g. PIL images or frames).
+    :param batch_size: Maximum items per batch.
+    :param size_of: Function returning the bucketing key of an item, e.g.
+        ``lambda im: im.size`` for PIL images.
+    :param max_pending: Maximum buffered items across buckets. Defaults to
+        ``4 * batch_size``.
+    :returns: An iterator of batches, each a list of ``(input_index, item)`` pairs.
+    :raises ValueError: If ``batch_size`` or ``max_pending`` is not positive.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    limit = 4 * batch_size if max_pending is None else max_pending
+    if limit <= 0:
+        raise ValueError("max_pending must be positive")
+
+    buckets: Dict[Hashable, List[Tuple[int, T]]] = {}
+    pending = 0
+    for index, item in enumerate(items):
+        key = size_of(item)
+        bucket = buckets.setdefault(key, [])
+        bucket.append((index, item))
+        pending += 1
+        if len(bucket) == batch_size:
+            pending -= len(bucket)
+            yield buckets.pop(key)
+        elif pending > limit:
+            fullest = max(buckets, key=lambda k: len(buckets[k]))
+            pending -= len(buckets[fullest])
+            yield buckets.pop(fullest)
+
+    for key in list(buckets):
+        yield buckets.pop(key)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -26,19 +29,190 @@ class Box:
         return w * h
 
 
-def iou(a: Box, b: Box) -> float:
+@dataclass(frozen=True, eq=False)
+class BoxArray:
+    """
+    Struct-of-arrays container holding N axis-aligned boxes in XYXY format.
+
+    A ``BoxArray`` keeps a whole frame's detections in one contiguous ``(N, 4)``
+    float64 buffer, so geometry (area, IoU) is computed with vectorized NumPy
+    operations instead of one Python object per detection. It behaves like a
+    read-only sequence of :class:`Box`: integer indexing returns a ``Box``, while
+    slices, index arrays and boolean masks return a new ``BoxArray``.
+
+    :param xyxy: Array-like of shape (N, 4) with columns ``x1, y1, x2, y2``.
+    :raises ValueError: If ``xyxy`` cannot be interpreted as an (N, 4) array.
+    """
+
+    xyxy: np.ndarray
+
+    def __post_init__(self) -> None:
+        arr = np.asarray(self.xyxy, dtype=np.float64)
+        if arr.size == 0:
+            arr = arr.reshape(0, 4)
+        if arr.ndim != 2 or arr.shape[1] != 4:
+            raise ValueError(f"BoxArray expects an (N, 4) array, got shape {arr.shape}")
+        object.__setattr__(self, "xyxy", arr)
+
+    @classmethod
+    def from_boxes(cls, boxes: Iterable[Box]) -> BoxArray:
+        """
+        Builds a ``BoxArray`` from an iterable of :class:`Box` objects.
+
+        :param boxes: The boxes to pack.
+        :type boxes: Iterable[Box]
+        :return: A new container holding the same coordinates.
+        :rtype: BoxArray
+        """
+        return cls(np.array([(b.x1, b.y1, b.x2, b.y2) for b in boxes], dtype=np.float64))
+
+    @classmethod
+    def concatenate(cls, arrays: Sequence[BoxArray]) -> BoxArray:
+        """
+        Concatenates several containers into a single contiguous one.
+
+        :param arrays: The containers to join, in order.
+        :type arrays: Sequence[BoxArray]
+        :return: A new container with ``sum(len(a) for a in arrays)`` boxes.
+        :rtype: BoxArray
+        """
+        if not arrays:
+            return cls(np.empty((0, 4), dtype=np.float64))
+        return cls(np.concatenate([a.xyxy for a in arrays], axis=0))
+
+    @classmethod
+    def from_normalized_yxyx(cls, yxyx: np.ndarray, width: float, height: float) -> BoxArray:
+        """
+        Builds a ``BoxArray`` from normalized ``[ymin, xmin, ymax, xmax]`` rows, as
+        returned by TensorFlow detectors, scaled to pixel coordinates.
+
+        :param yxyx: Array-like of shape (N, 4) with values in [0, 1].
+        :type yxyx: numpy.ndarray
+        :param width: Image width in pixels.
+        :type width: float
+        :param height: Image height in pixels.
+        :type height: float
+        :return: The boxes in pixel XYXY coordinates.
+        :rtype: BoxArray
+        """
+        arr = np.asarray(yxyx, dtype=np.float64).reshape(-1, 4)
+        return cls(arr[:, [1, 0, 3, 2]] * np.array([width, height, width, height]))
+
+    def to_boxes(self) -> List[Box]:
+        """
+        Materializes the container as a list of :class:`Box` objects.
+
+        :return: One ``Box`` per row, in order.
+        :rtype: List[Box]
+        """
+        return [Box(x1, y1, x2, y2) for x1, y1, x2, y2 in self.xyxy.tolist()]
+
+    @property
+    def x1(self) -> np.ndarray:
+        """The ``x1`` column as a view."""
+        return self.xyxy[:, 0]
+
+    @property
+    def y1(self) -> np.ndarray:
+        """The ``y1`` column as a view."""
+        return self.xyxy[:, 1]
+
+    @property
+    def x2(self) -> np.ndarray:
+        """The ``x2`` column as a view."""
+        return self.xyxy[:, 2]
+
+    @property
+    def y2(self) -> np.ndarray:
+        """The ``y2`` column as a view."""
+        return self.xyxy[:, 3]
+
+    def area(self) -> np.ndarray:
+        """Calculates the area of every box, clamping inverted extents to zero."""
+        w = np.maximum(0.0, self.x2 - self.x1)
+        h = np.maximum(0.0, self.y2 - self.y1)
+        return w * h
+
+    def __len__(self) -> int:
+        return self.xyxy.shape[0]
+
+    def __iter__(self) -> Iterator[Box]:
+        return iter(self.to_boxes())
+
+    @overload
+    def __getitem__(self, key: int) -> Box: ...
+
+    @overload
+    def __getitem__(self, key: Union[slice, np.ndarray, Sequence[int]]) -> BoxArray: ...
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            x1, y1, x2, y2 = self.xyxy[key].tolist()
+            return Box(x1, y1, x2, y2)
+        return BoxArray(self.xyxy[key])
+
+    def __repr__(self) -> str:
+        return f"BoxArray(n={len(self)})"
+
+
+BoxesLike = Union[Sequence[Box], BoxArray]
+
+
+def as_xyxy(boxes: Union[BoxesLike, np.ndarray]) -> np.ndarray:
+    """
+    Returns the coordinates of ``boxes`` as an ``(N, 4)`` float64 array.
+
+    ``BoxArray`` inputs are returned without copying; sequences of :class:`Box`
+    are packed once.
+
+    :param boxes: A ``BoxArray``, an (N, 4) array, or a sequence of ``Box``.
+    :type boxes: Union[Sequence[Box], BoxArray, numpy.ndarray]
+    :return: The coordinates in XYXY order.
+    :rtype: numpy.ndarray
+    """
+    if isinstance(boxes, BoxArray):
+        return boxes.xyxy
+    if isinstance(boxes, np.ndarray):
+        return BoxArray(boxes).xyxy
+    return BoxArray.from_boxes(boxes).xyxy
+
+
+def _iou_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Broadcasted IoU between XYXY rows, mirroring :func:`iou` operation by operation."""
+    inter_w = np.maximum(0.0, np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]))
+    inter_h = np.maximum(0.0, np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]))
+    inter_area = inter_w * inter_h
+
+    area_a = np.maximum(0.0, a[..., 2] - a[..., 0]) * np.maximum(0.0, a[..., 3] - a[..., 1])
+    area_b = np.maximum(0.0, b[..., 2] - b[..., 0]) * np.maximum(0.0, b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter_area
+
+    out = np.zeros(np.broadcast(inter_area, union).shape, dtype=np.float64)
+    np.divide(inter_area, union, out=out, where=union > 0.0)
+    return out
+
+
+def iou(a: Union[Box, BoxArray], b: Union[Box, BoxArray]) -> Union[float, np.ndarray]:
     """
     Calculate the Intersection over Union (IoU) of two bounding boxes.
 
-    IoU is a measure of the overlap between two bounding boxes.
+    IoU is a measure of the overlap between two bounding boxes. When either
+    argument is a :class:`BoxArray`, the IoU is computed element-wise with NumPy
+    broadcasting (a single ``Box`` is scored against every row) and an array
+    is returned.
 
-    :param a: The first bounding box.
-    :type a: Box
-    :param b: The second bounding box.
-    :type b: Box
-    :return: The IoU score, a float between 0.0 and 1.0.
-    :rtype: float
+    :param a: The first bounding box, or a container of boxes.
+    :type a: Union[Box, BoxArray]
+    :param b: The second bounding box, or a container of boxes.
+    :type b: Union[Box, BoxArray]
+    :return: The IoU score, a float between 0.0 and 1.0, or an array of scores.
+    :rtype: Union[float, numpy.ndarray]
     """
+    if isinstance(a, BoxArray) or isinstance(b, BoxArray):
+        a_xyxy = a.xyxy if isinstance(a, BoxArray) else np.array([a.x1, a.y1, a.x2, a.y2])
+        b_xyxy = b.xyxy if isinstance(b, BoxArray) else np.array([b.x1, b.y1, b.x2, b.y2])
+        return _iou_rows(a_xyxy, b_xyxy)
+
     inter_x1 = max(a.x1, b.x1)
     inter_y1 = max(a.y1, b.y1)
     inter_x2 = min(a.x2, b.x2)
@@ -52,3 +226,101 @@ def iou(a: Box, b: Box) -> float:
     if union <= 0.0:
         return 0.0
     return inter_area / union
+
+
+def _areas(xyxy: np.ndarray) -> np.ndarray:
+    """Per-row area of an (N, 4) XYXY array, clamping inverted extents to zero."""
+    return np.maximum(0.0, xyxy[:, 2] - xyxy[:, 0]) * np.maximum(0.0, xyxy[:, 3] - xyxy[:, 1])
+
+
+def _iou_block(
+    a: np.ndarray, b: np.ndarray, area_a: np.ndarray, area_b: np.ndarray
+) -> np.ndarray:
+    """Dense IoU block between the rows of ``a`` and ``b`` with precomputed areas."""
+    inter_w = np.minimum(a[:, None, 2], b[None, :, 2])
+    inter_w -= np.maximum(a[:, None, 0], b[None, :, 0])
+    np.maximum(inter_w, 0.0, out=inter_w)
+    inter_h = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter_h -= np.maximum(a[:, None, 1], b[None, :, 1])
+    np.maximum(inter_h, 0.0, out=inter_h)
+    inter = np.multiply(inter_w, inter_h, out=inter_w)
+
+    union = np.add(area_a[:, None], area_b[None, :], out=inter_h)
+    union -= inter
+    positive = union > 0.0
+    np.divide(inter, union, out=inter, where=positive)
+    inter[~positive] = 0.0
+    return inter
+
+
+def iter_iou_chunks(
+    a: Union[BoxesLike, np.ndarray],
+    b: Union[BoxesLike, np.ndarray],
+    chunk_size: int = 1024,
+) -> Iterator[Tuple[slice, np.ndarray]]:
+    """
+    Yields the pairwise IoU matrix between ``a`` and ``b`` one row block at a time.
+
+    Only one ``(chunk_size, M)`` block (plus a few temporaries of the same shape)
+    is alive at any moment, so callers that reduce each block, such as a
+    max-overlap search over dense anchors, never hold the full N×M matrix.
+
+    :param a: The N query boxes.
+    :type a: Union[Sequence[Box], BoxArray, numpy.ndarray]
+    :param b: The M reference boxes.
+    :type b: Union[Sequence[Box], BoxArray, numpy.ndarray]
+    :param chunk_size: The number of rows of ``a`` per block. Defaults to 1024.
+    :type chunk_size: int, optional
+    :return: An iterator of ``(rows, block)`` pairs, where ``block`` holds
+             ``iou_matrix(a, b)[rows]``.
+    :rtype: Iterator[Tuple[slice, numpy.ndarray]]
+    :raises ValueError: If ``chunk_size`` is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    a_xyxy = as_xyxy(a)
+    b_xyxy = as_xyxy(b)
+    area_a = _areas(a_xyxy)
+    area_b = _areas(b_xyxy)
+
+    for start in range(0, a_xyxy.shape[0], chunk_size):
+        rows = slice(start, min(start + chunk_size, a_xyxy.shape[0]))
+        yield rows, _iou_block(a_xyxy[rows], b_xyxy, area_a[rows], area_b)
+
+
+def iou_matrix(
+    a: Union[BoxesLike, np.ndarray],
+    b: Union[BoxesLike, np.ndarray],
+    *,
+    chunk_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Calculate the pairwise IoU matrix between two sets of boxes.
+
+    Entry ``[i, j]`` equals ``iou(a[i], b[j])`` exactly, including the degenerate
+    cases: zero-area boxes and pairs whose union is 0 or less score 0.0.
+
+    By default the matrix is computed in one broadcasted pass. With
+    ``chunk_size`` set, rows of ``a`` are processed in blocks so that the
+    intermediate arrays are bounded by ``chunk_size × M`` instead of ``N × M``;
+    only the float64 result itself scales with the full problem size.
+
+    :param a: The N query boxes.
+    :type a: Union[Sequence[Box], BoxArray, numpy.ndarray]
+    :param b: The M reference boxes.
+    :type b: Union[Sequence[Box], BoxArray, numpy.ndarray]
+    :param chunk_size: Optional number of rows of ``a`` per block.
+    :type chunk_size: Optional[int]
+    :return: An (N, M) float64 array of IoU scores.
+    :rtype: numpy.ndarray
+    :raises ValueError: If ``chunk_size`` is not positive.
+    """
+    a_xyxy = as_xyxy(a)
+    b_xyxy = as_xyxy(b)
+    if chunk_size is None:
+        return _iou_block(a_xyxy, b_xyxy, _areas(a_xyxy), _areas(b_xyxy))
+
+    out = np.empty((a_xyxy.shape[0], b_xyxy.shape[0]), dtype=np.float64)
+    for rows, block in iter_iou_chunks(a_xyxy, b_xyxy, chunk_size):
+        out[rows] = block
+    return out
@@ -1,55 +1,402 @@
 from __future__ import annotations
 
-from typing import List, Sequence, Tuple
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Hashable, List, Literal, Mapping, Optional, Sequence, Tuple, Union
 
-from .boxes import Box, iou
+import numpy as np
 
+from .boxes import Box, BoxArray, BoxesLike, _areas, _iou_block, as_xyxy, iou_matrix
+from .instrumentation import timed
+from .spatial import GridIndex
 
+NmsStrategy = Literal["auto", "dense", "grid"]
+SoftNmsMethod = Literal["linear", "gaussian"]
+
+#: Below this many candidates ``strategy="auto"`` uses the dense (brute-force) path.
+GRID_NMS_MIN_BOXES = 1024
+
+#: Up to this many candidates the dense path precomputes the full IoU matrix.
+DENSE_NMS_MATRIX_MAX_BOXES = 1024
+
+
+ClassNames = Union[Sequence[str], Mapping[Any, str]]
+
+
+def label_table(names: ClassNames) -> np.ndarray:
+    """
+    Builds a class id -> name lookup table usable with vectorized indexing.
+
+    :param names: Names indexed by class id (a list such as torchvision's
+                  ``weights.meta["categories"]``) or a mapping from id to name
+                  (ultralytics' ``model.names``, or the COCO table whose ids are
+                  strings).
+    :type names: Union[Sequence[str], Mapping[Any, str]]
+    :return: An object array where entry ``i`` is the name of class ``i``, or
+             None for ids missing from a mapping.
+    :rtype: numpy.ndarray
+    """
+    if isinstance(names, np.ndarray) and names.dtype == object:
+        return names
+    if not isinstance(names, Mapping):
+        table = np.empty(len(names), dtype=object)
+        table[:] = list(names)
+        return table
+    ids = {int(k): v for k, v in names.items()}
+    table = np.full(max(ids) + 1 if ids else 0, None, dtype=object)
+    for k, v in ids.items():
+        if k >= 0:
+            table[k] = v
+    return table
+
+
+@dataclass(frozen=True, eq=False)
+class DetectionResult:
+    """
+    Detections of one image, stored as arrays, shared by every detector backend.
+
+    Backends fill it straight from the framework output (one device-to-host copy
+    per field, no per-detection Python work). ``Box`` objects are only built
+    when ``boxes`` is iterated or indexed with an integer, and label strings
+    only on first access to :attr:`labels`, through a vectorized table lookup.
+
+    :param boxes: The detected boxes; an (N, 4) XYXY array is wrapped in a
+                  ``BoxArray``.
+    :type boxes: BoxArray
+    :param scores: Array (N,) of confidence scores, in the backend's dtype.
+    :type scores: numpy.ndarray
+    :param class_ids: Array (N,) of integer class ids.
+    :type class_ids: numpy.ndarray
+    :param names: Class names indexed by id, or a mapping from id to name
+                  (see :func:`label_table`).
+    :type names: Union[Sequence[str], Mapping[Any, str]]
+    :param fallback: Format of the label of ids without a name. Defaults to "class_{}".
+    :type fallback: str
+    :raises ValueError: If the fields do not have one entry per box.
+    """
+
+    boxes: BoxArray
+    scores: np.ndarray
+    class_ids: np.ndarray
+    names: ClassNames = ()
+    fallback: str = "class_{}"
+
+    def __post_init__(self) -> None:
+        boxes = self.boxes if isinstance(self.boxes, BoxArray) else BoxArray(as_xyxy(self.boxes))
+        scores = np.asarray(self.scores).reshape(-1)
+        class_ids = np.asarray(self.class_ids).reshape(-1).astype(np.int64, copy=False)
+        if not (len(boxes) == scores.shape[0] == class_ids.shape[0]):
+            raise ValueError("boxes, scores, and class_ids must have one entry per detection")
+        object.__setattr__(self, "boxes", boxes)
+        object.__setattr__(self, "scores", scores)
+        object.__setattr__(self, "class_ids", class_ids)
+
+    @classmethod
+    def from_labels(
+        cls, boxes: Union[BoxesLike, np.ndarray], scores: Sequence[float], labels: Sequence[Any]
+    ) -> DetectionResult:
+        """
+        Builds a result from per-detection labels (e.g. models returning class
+        names directly), encoding them as ids into the table of unique labels.
+
+        :param boxes: The boxes, as a ``BoxArray``, (N, 4) array or sequence of ``Box``.
+        :param scores: The confidence scores.
+        :param labels: One label per detection.
+        :return: The result.
+        :rtype: DetectionResult
+        """
+        names, class_ids = np.unique(np.asarray(labels), return_inverse=True)
+        return cls(boxes=boxes, scores=scores, class_ids=class_ids, names=names.tolist())
+
+    @cached_property
+    def labels(self) -> np.ndarray:
+        """Class names of the detections, as an object array of ``str`` (built on first access)."""
+        table = label_table(self.names)
+        ids = self.class_ids
+        valid = (ids >= 0) & (ids < table.shape[0])
+        out = np.empty(ids.shape[0], dtype=object)
+        out[valid] = table[ids[valid]]
+        for i in np.flatnonzero(np.equal(out, None)):
+            out[i] = self.fallback.format(int(ids[i]))
+        return out
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def select(self, index: Union[slice, np.ndarray, Sequence[int]]) -> DetectionResult:
+        """
+        Returns the detections at ``index`` (a slice, index array or boolean mask).
+
+        :param index: The rows to keep.
+        :return: A new result sharing the class name table.
+        :rtype: DetectionResult
+        """
+        return DetectionResult(
+            boxes=self.boxes[index],
+            scores=self.scores[index],
+            class_ids=self.class_ids[index],
+            names=self.names,
+            fallback=self.fallback,
+        )
+
+    def to_lists(self) -> Tuple[List[Box], List[float], List[str]]:
+        """
+        Materializes the detections as plain Python lists.
+
+        :return: ``(boxes, scores, labels)`` as lists of ``Box``, ``float`` and ``str``.
+        :rtype: Tuple[List[Box], List[float], List[str]]
+        """
+        return self.boxes.to_boxes(), self.scores.astype(float).tolist(), self.labels.tolist()
+
+
+def threshold_indices(
+    scores: Sequence[float],
+    labels: Sequence[Hashable],
+    threshold: Union[float, Mapping[Hashable, float]],
+    *,
+    top_k: Optional[int] = None,
+    default_threshold: float = 0.0,
+) -> Optional[np.ndarray]:
+    """
+    Selects the detections that pass a score threshold, without touching the boxes.
+
+    The selection is a single vectorized comparison. With a mapping, each label
+    gets its own threshold (labels not in the mapping use ``default_threshold``).
+    With ``top_k``, only the ``top_k`` highest-scoring survivors are kept, found
+    by partial selection (``numpy.argpartition``) rather than a full sort.
+
+    :param scores: A sequence of confidence scores.
+    :type scores: Sequence[float]
+    :param labels: A sequence of labels corresponding to each score.
+    :type labels: Sequence[Hashable]
+    :param threshold: A global minimum score, or a mapping from label to minimum score.
+    :type threshold: Union[float, Mapping[Hashable, float]]
+    :param top_k: Optional maximum number of detections to keep.
+    :type top_k: Optional[int]
+    :param default_threshold: Minimum score for labels missing from a mapping.
+                              Defaults to 0.0.
+    :type default_threshold: float, optional
+    :return: The kept indices in ascending (input) order, or None when every
+             detection is kept.
+    :rtype: Optional[numpy.ndarray]
+    :raises ValueError: If the sequences have different lengths or ``top_k`` is negative.
+    """
+    if len(scores) != len(labels):
+        raise ValueError("scores and labels must have the same length")
+    if top_k is not None and top_k < 0:
+        raise ValueError("top_k must be non-negative")
+
+    score_arr = np.asarray(scores, dtype=np.float64)
+    if isinstance(threshold, Mapping):
+        names, inverse = np.unique(np.asarray(labels), return_inverse=True)
+        table = np.array([threshold.get(name, default_threshold) for name in names.tolist()])
+        mask = score_arr >= table[inverse.reshape(-1)]
+    else:
+        mask = score_arr >= threshold
+
+    idx = np.flatnonzero(mask)
+    if top_k is not None and top_k < idx.size:
+        best = np.argpartition(-score_arr[idx], max(top_k - 1, 0))[:top_k]
+        idx = np.sort(idx[best])
+    if idx.size == score_arr.size:
+        return None
+    return idx
+
+
+@timed("contracts.apply_threshold")
 def apply_threshold(
-    boxes: Sequence[Box],
+    boxes: BoxesLike,
     scores: Sequence[float],
     labels: Sequence[str],
-    threshold: float,
-) -> Tuple[List[Box], List[float], List[str]]:
+    threshold: Union[float, Mapping[Hashable, float]],
+    *,
+    top_k: Optional[int] = None,
+    default_threshold: float = 0.0,
+) -> Tuple[Union[List[Box], BoxArray], Sequence[float], Sequence[str]]:
     """
     Filters detection results based on a confidence score threshold.
 
     This function takes sequences of bounding boxes, scores, and labels, and
     returns only those that have a score greater than or equal to the specified
-    threshold.
+    threshold. The threshold can be global or per label, and ``top_k`` can cap
+    the candidate set cheaply before NMS; see :func:`threshold_indices`.
 
-    :param boxes: A sequence of bounding box objects.
-    :type boxes: Sequence[Box]
+    When ``boxes`` is a :class:`~src.vision.boxes.BoxArray` (or an (N, 4)
+    array), the kept detections are returned as compressed arrays of the same
+    kind plus NumPy arrays of scores and labels, so the frame stays in
+    contiguous buffers. If nothing is filtered out, the inputs are returned
+    as-is, without copying.
+
+    :param boxes: A sequence of bounding box objects, a ``BoxArray`` or an (N, 4) array.
+    :type boxes: Union[Sequence[Box], BoxArray, numpy.ndarray]
     :param scores: A sequence of confidence scores corresponding to each box.
     :type scores: Sequence[float]
     :param labels: A sequence of labels corresponding to each box.
     :type labels: Sequence[str]
-    :param threshold: The minimum score for a detection to be kept.
-    :type threshold: float
-    :return: A tuple containing three lists: kept boxes, kept scores, and kept labels.
+    :param threshold: The minimum score for a detection to be kept, or a mapping
+                      from label to minimum score.
+    :type threshold: Union[float, Mapping[Hashable, float]]
+    :param top_k: Optional maximum number of detections to keep (highest scores).
+    :type top_k: Optional[int]
+    :param default_threshold: Minimum score for labels missing from a mapping.
+                              Defaults to 0.0.
+    :type default_threshold: float, optional
+    :return: A tuple containing three lists: kept boxes, kept scores, and kept labels,
+             in input order. For array input: a ``BoxArray`` (or array) and two
+             NumPy arrays.
     :rtype: Tuple[List[Box], List[float], List[str]]
     :raises ValueError: If the input sequences have different lengths.
     """
     if not (len(boxes) == len(scores) == len(labels)):
         raise ValueError("boxes, scores, and labels must have the same length")
 
-    kept_b: List[Box] = []
-    kept_s: List[float] = []
-    kept_l: List[str] = []
+    idx = threshold_indices(
+        scores, labels, threshold, top_k=top_k, default_threshold=default_threshold
+    )
+
+    if isinstance(boxes, (BoxArray, np.ndarray)):
+        score_arr = np.asarray(scores, dtype=np.float64)
+        label_arr = np.asarray(labels)
+        if idx is None:
+            return boxes, score_arr, label_arr
+        return boxes[idx], score_arr[idx], label_arr[idx]
+
+    if idx is None:
+        return list(boxes), [float(s) for s in scores], list(labels)
+    kept = idx.tolist()
+    return (
+        [boxes[i] for i in kept],
+        [float(scores[i]) for i in kept],
+        [labels[i] for i in kept],
+    )
+
+
+def _greedy_nms(
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float,
+    class_ids: Optional[np.ndarray] = None,
+    max_output: Optional[int] = None,
+) -> List[int]:
+    """
+    Greedy NMS over an (N, 4) array, suppressing with a mask over one IoU row per kept box.
+
+    Candidates are visited in descending score order (ties keep their input
+    order). Each kept box looks up its IoU against the surviving candidates only,
+    and the survivors are compacted with a boolean mask. When ``class_ids`` is
+    given, a box can only be suppressed by a kept box of the same class.
+
+    Up to ``DENSE_NMS_MATRIX_MAX_BOXES`` candidates, the IoU matrix is computed
+    once in a single broadcasted pass and each step is a row lookup; above that,
+    each kept box computes its own row to keep memory linear in N.
+    """
+    order = np.argsort(-scores, kind="stable")
+    xyxy = xyxy[order]
+    areas = _areas(xyxy)
+    if class_ids is not None:
+        class_ids = class_ids[order]
+
+    overlaps: Optional[np.ndarray] = None
+    if len(order) <= DENSE_NMS_MATRIX_MAX_BOXES:
+        overlaps = _iou_block(xyxy, xyxy, areas, areas)
+        if class_ids is not None:
+            # -inf never exceeds the threshold, so other classes always survive.
+            overlaps[class_ids[:, None] != class_ids[None, :]] = -np.inf
+
+    limit = len(order) if max_output is None else max_output
+    keep: List[int] = []
+    remaining = np.arange(len(order))
+
+    while remaining.size and len(keep) < limit:
+        i = remaining[0]
+        keep.append(i)
+
+        rest = remaining[1:]
+        if overlaps is not None:
+            survive = overlaps[i, rest] <= iou_threshold
+        else:
+            row = _iou_block(xyxy[i : i + 1], xyxy[rest], areas[i : i + 1], areas[rest])[0]
+            survive = row <= iou_threshold
+            if class_ids is not None:
+                survive |= class_ids[rest] != class_ids[i]
+        remaining = rest[survive]
+
+    return order[keep].tolist()
+
+
+def _grid_nms(
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float,
+    class_ids: Optional[np.ndarray] = None,
+    max_output: Optional[int] = None,
+) -> List[int]:
+    """
+    Greedy NMS that only IoU-tests the candidates a :class:`GridIndex` reports as nearby.
+
+    Produces the same keep list as :func:`_greedy_nms` for ``iou_threshold >= 0``:
+    boxes the index does not return have no intersection with the kept box, so
+    their IoU is 0 and they could not have been suppressed by it.
+    """
+    order = np.argsort(-scores, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    areas = _areas(xyxy)
+    index = GridIndex.build(xyxy)
+
+    limit = len(order) if max_output is None else max_output
+    alive = np.ones(len(order), dtype=bool)
+    keep: List[int] = []
+
+    for i in order.tolist():
+        if len(keep) >= limit:
+            break
+        if not alive[i]:
+            continue
+        keep.append(i)
+
+        cand = index.query(*xyxy[i].tolist())
+        cand = cand[alive[cand] & (rank[cand] > rank[i])]
+        if class_ids is not None:
+            cand = cand[class_ids[cand] == class_ids[i]]
+        if cand.size:
+            overlaps = _iou_block(xyxy[i : i + 1], xyxy[cand], areas[i : i + 1], areas[cand])[0]
+            alive[cand[overlaps > iou_threshold]] = False
+
+    return keep
+
+
+def _run_nms(
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float,
+    strategy: NmsStrategy,
+    class_ids: Optional[np.ndarray] = None,
+    max_output: Optional[int] = None,
+) -> List[int]:
+    """Dispatches to the dense or grid-indexed NMS implementation."""
+    if strategy not in ("auto", "dense", "grid"):
+        raise ValueError(f"Unsupported NMS strategy: {strategy}")
+    if max_output is not None and max_output < 0:
+        raise ValueError("max_output must be non-negative")
 
-    for b, s, l in zip(boxes, scores, labels):
-        score = float(s)
-        if score >= threshold:
-            kept_b.append(b)
-            kept_s.append(score)
-            kept_l.append(l)
-    return kept_b, kept_s, kept_l
+    use_grid = strategy == "grid" or (
+        strategy == "auto" and xyxy.shape[0] >= GRID_NMS_MIN_BOXES
+    )
+    # A negative threshold suppresses disjoint boxes too, which the index cannot see.
+    if use_grid and iou_threshold >= 0.0:
+        return _grid_nms(xyxy, scores, iou_threshold, class_ids, max_output)
+    return _greedy_nms(xyxy, scores, iou_threshold, class_ids, max_output)
 
 
+@timed("contracts.nms")
 def nms(
-    boxes: Sequence[Box],
+    boxes: BoxesLike,
     scores: Sequence[float],
     iou_threshold: float = 0.5,
+    *,
+    max_output: Optional[int] = None,
+    strategy: NmsStrategy = "auto",
 ) -> List[int]:
     """
     Performs Non-Maximum Suppression (NMS) to eliminate overlapping bounding boxes.
@@ -57,34 +404,275 @@ def nms(
     NMS is a conflict resolution algorithm that keeps the box with the highest
     score in a cluster of overlapping boxes and suppresses the others.
 
-    :param boxes: A sequence of bounding box objects.
-    :type boxes: Sequence[Box]
+    The suppression is vectorized: each kept box computes a single IoU row
+    against the remaining candidates and removes the overlapping ones with a
+    boolean mask, so the Python-level loop runs once per *kept* box.
+
+    For large candidate sets (``GRID_NMS_MIN_BOXES`` and up) the ``"auto"``
+    strategy buckets the boxes in a :class:`~src.vision.spatial.GridIndex` and
+    only IoU-tests spatially nearby survivors. For dense frames of small, mostly
+    disjoint boxes this makes the cost grow roughly linearly with N. Both
+    strategies return the same indices.
+
+    :param boxes: A sequence of bounding box objects, or a ``BoxArray``.
+    :type boxes: Union[Sequence[Box], BoxArray]
     :param scores: A sequence of confidence scores corresponding to each box.
     :type scores: Sequence[float]
     :param iou_threshold: The Intersection over Union (IoU) threshold. Boxes with
                           IoU greater than this value will be suppressed.
                           Defaults to 0.5.
     :type iou_threshold: float, optional
-    :return: A list of indices of the boxes to keep.
+    :param max_output: Optional cap on the number of kept boxes. Suppression stops
+                       as soon as this many boxes have been kept.
+    :type max_output: Optional[int]
+    :param strategy: ``"dense"`` compares every kept box with all survivors,
+                     ``"grid"`` uses the spatial index and ``"auto"`` (default)
+                     picks by candidate count.
+    :type strategy: str, optional
+    :return: A list of indices of the boxes to keep, in descending score order.
     :rtype: List[int]
-    :raises ValueError: If the input sequences have different lengths.
+    :raises ValueError: If the input sequences have different lengths, if
+                        ``max_output`` is negative, or if ``strategy`` is unknown.
     """
     if len(boxes) != len(scores):
         raise ValueError("boxes and scores must have the same length")
-    if not boxes:
+    if len(boxes) == 0:
         return []
 
-    order = sorted(range(len(boxes)), key=lambda i: scores[i], reverse=True)
-    keep: List[int] = []
+    return _run_nms(
+        as_xyxy(boxes),
+        np.asarray(scores, dtype=np.float64),
+        iou_threshold,
+        strategy,
+        max_output=max_output,
+    )
 
-    while order:
-        i = order.pop(0)
-        keep.append(i)
 
-        remaining: List[int] = []
-        for j in order:
-            if iou(boxes[i], boxes[j]) <= iou_threshold:
-                remaining.append(j)
-        order = remaining
+@timed("contracts.batched_nms")
+def batched_nms(
+    boxes: BoxesLike,
+    scores: Sequence[float],
+    labels: Sequence[Hashable],
+    iou_threshold: float = 0.5,
+    *,
+    max_output: Optional[int] = None,
+    strategy: NmsStrategy = "auto",
+) -> List[int]:
+    """
+    Performs class-aware Non-Maximum Suppression in a single pass.
 
-    return keep
+    Boxes only suppress boxes that share their label, which is equivalent to
+    running :func:`nms` separately per class and merging the kept indices by
+    score, but without splitting the inputs.
+
+    :param boxes: A sequence of bounding box objects, or a ``BoxArray``.
+    :type boxes: Union[Sequence[Box], BoxArray]
+    :param scores: A sequence of confidence scores corresponding to each box.
+    :type scores: Sequence[float]
+    :param labels: A sequence of class labels (names or ids) for each box.
+    :type labels: Sequence[Hashable]
+    :param iou_threshold: The IoU threshold above which a same-class box is
+                          suppressed. Defaults to 0.5.
+    :type iou_threshold: float, optional
+    :param max_output: Optional cap on the total number of kept boxes.
+    :type max_output: Optional[int]
+    :param strategy: The suppression strategy, as in :func:`nms`.
+    :type strategy: str, optional
+    :return: A list of indices of the boxes to keep, in descending score order.
+    :rtype: List[int]
+    :raises ValueError: If the input sequences have different lengths, if
+                        ``max_output`` is negative, or if ``strategy`` is unknown.
+    """
+    if not (len(boxes) == len(scores) == len(labels)):
+        raise ValueError("boxes, scores, and labels must have the same length")
+    if len(boxes) == 0:
+        return []
+
+    _, class_ids = np.unique(np.asarray(labels), return_inverse=True)
+    return _run_nms(
+        as_xyxy(boxes),
+        np.asarray(scores, dtype=np.float64),
+        iou_threshold,
+        strategy,
+        class_ids=class_ids.reshape(-1),
+        max_output=max_output,
+    )
+
+
+def _detections_like(
+    boxes: BoxesLike,
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    labels: np.ndarray,
+) -> Tuple[Union[List[Box], BoxArray], Sequence[float], Sequence[str]]:
+    """Packs a result triple in the container family of the ``boxes`` input."""
+    if isinstance(boxes, BoxArray):
+        return BoxArray(xyxy), scores, labels
+    return BoxArray(xyxy).to_boxes(), scores.tolist(), labels.tolist()
+
+
+@timed("contracts.soft_nms")
+def soft_nms(
+    boxes: BoxesLike,
+    scores: Sequence[float],
+    labels: Sequence[str],
+    *,
+    method: SoftNmsMethod = "gaussian",
+    sigma: float = 0.5,
+    iou_threshold: float = 0.3,
+    score_threshold: float = 0.001,
+    class_aware: bool = True,
+) -> Tuple[Union[List[Box], BoxArray], Sequence[float], Sequence[str]]:
+    """
+    Performs Soft-NMS: overlapping boxes have their scores decayed instead of removed.
+
+    At each step the highest-scoring remaining box is kept and the scores of
+    the other remaining boxes are multiplied by a decay that grows with their
+    IoU to it. Boxes whose decayed score falls below ``score_threshold`` are
+    dropped. The decay matrix is computed once up front, so each step is an
+    ``argmax`` and one in-place row multiply.
+
+    - ``"linear"``: scores of boxes with IoU above ``iou_threshold`` are scaled
+      by ``1 - IoU``.
+    - ``"gaussian"``: every score is scaled by ``exp(-IoU**2 / sigma)``.
+
+    :param boxes: A sequence of bounding box objects, or a ``BoxArray``.
+    :type boxes: Union[Sequence[Box], BoxArray]
+    :param scores: A sequence of confidence scores corresponding to each box.
+    :type scores: Sequence[float]
+    :param labels: A sequence of labels corresponding to each box.
+    :type labels: Sequence[str]
+    :param method: The decay function, ``"linear"`` or ``"gaussian"``.
+                   Defaults to ``"gaussian"``.
+    :type method: str, optional
+    :param sigma: Spread of the Gaussian decay. Defaults to 0.5.
+    :type sigma: float, optional
+    :param iou_threshold: IoU above which the linear decay applies. Defaults to 0.3.
+    :type iou_threshold: float, optional
+    :param score_threshold: Minimum decayed score for a box to survive.
+                            Defaults to 0.001.
+    :type score_threshold: float, optional
+    :param class_aware: If True (default), boxes only decay boxes with the same label.
+    :type class_aware: bool, optional
+    :return: The surviving boxes, their decayed scores and their labels, in
+             descending order of decayed score. Same container family as
+             :func:`apply_threshold`.
+    :rtype: Tuple[List[Box], List[float], List[str]]
+    :raises ValueError: If the input sequences have different lengths, if
+                        ``method`` is unknown or if ``sigma`` is not positive.
+    """
+    if not (len(boxes) == len(scores) == len(labels)):
+        raise ValueError("boxes, scores, and labels must have the same length")
+    if method not in ("linear", "gaussian"):
+        raise ValueError(f"Unsupported Soft-NMS method: {method}")
+    if sigma <= 0.0:
+        raise ValueError("sigma must be positive")
+
+    xyxy = as_xyxy(boxes)
+    label_arr = np.asarray(labels)
+    overlaps = iou_matrix(xyxy, xyxy)
+    if method == "linear":
+        decay = np.where(overlaps > iou_threshold, 1.0 - overlaps, 1.0)
+    else:
+        decay = np.exp(-(overlaps * overlaps) / sigma)
+    if class_aware:
+        decay[label_arr[:, None] != label_arr[None, :]] = 1.0
+    # Keep decays strictly positive so already-kept (-inf) entries never become NaN.
+    np.maximum(decay, np.finfo(np.float64).tiny, out=decay)
+
+    current = np.array(scores, dtype=np.float64)
+    kept: List[int] = []
+    kept_scores: List[float] = []
+
+    for _ in range(current.size):
+        top = int(current.argmax())
+        best = current[top]
+        if not best >= score_threshold:
+            break
+        kept.append(top)
+        kept_scores.append(best)
+        current *= decay[top]
+        current[top] = -np.inf
+
+    idx = np.asarray(kept, dtype=np.int64)
+    return _detections_like(boxes, xyxy[idx], np.asarray(kept_scores), label_arr[idx])
+
+
+@timed("contracts.weighted_box_fusion")
+def weighted_box_fusion(
+    boxes: BoxesLike,
+    scores: Sequence[float],
+    labels: Sequence[str],
+    *,
+    iou_threshold: float = 0.55,
+    skip_threshold: float = 0.0,
+    num_models: int = 1,
+) -> Tuple[Union[List[Box], BoxArray], Sequence[float], Sequence[str]]:
+    """
+    Merges overlapping same-label detections into score-weighted average boxes.
+
+    Intended for ensembles: concatenate the detections of every model (e.g. with
+    :meth:`BoxArray.concatenate`) and fuse them in one call. Clusters are formed
+    NMS-style: the highest-scoring box of each label seeds a cluster (via
+    :func:`batched_nms`), and every box joins the first seed, in score order,
+    whose IoU with it exceeds ``iou_threshold``. Each cluster is then reduced in
+    one vectorized pass:
+
+    - box = score-weighted mean of the member coordinates;
+    - score = mean member score × ``min(members, num_models) / num_models``,
+      so clusters that only some models agree on are down-weighted.
+
+    :param boxes: A sequence of bounding box objects, or a ``BoxArray``.
+    :type boxes: Union[Sequence[Box], BoxArray]
+    :param scores: A sequence of confidence scores corresponding to each box.
+    :type scores: Sequence[float]
+    :param labels: A sequence of labels corresponding to each box.
+    :type labels: Sequence[str]
+    :param iou_threshold: IoU above which a box joins a cluster. Defaults to 0.55.
+    :type iou_threshold: float, optional
+    :param skip_threshold: Boxes scoring below this are ignored. Defaults to 0.0.
+    :type skip_threshold: float, optional
+    :param num_models: The number of models whose outputs were concatenated.
+                       Defaults to 1.
+    :type num_models: int, optional
+    :return: The fused boxes, scores and labels, in descending score order.
+             Same container family as :func:`apply_threshold`.
+    :rtype: Tuple[List[Box], List[float], List[str]]
+    :raises ValueError: If the input sequences have different lengths or
+                        ``num_models`` is not positive.
+    """
+    if not (len(boxes) == len(scores) == len(labels)):
+        raise ValueError("boxes, scores, and labels must have the same length")
+    if num_models < 1:
+        raise ValueError("num_models must be positive")
+
+    score_arr = np.asarray(scores, dtype=np.float64)
+    mask = score_arr >= skip_threshold
+    xyxy = as_xyxy(boxes)[mask]
+    score_arr = score_arr[mask]
+    label_arr = np.asarray(labels)[mask]
+    if score_arr.size == 0:
+        return _detections_like(boxes, xyxy, score_arr, label_arr)
+
+    seeds = np.asarray(batched_nms(xyxy, score_arr, label_arr, iou_threshold, strategy="dense"))
+    joins = iou_matrix(xyxy, xyxy[seeds]) > iou_threshold
+    joins &= label_arr[:, None] == label_arr[seeds][None, :]
+    joins[seeds, np.arange(seeds.size)] = True
+    cluster = joins.argmax(axis=1)
+
+    weight = np.bincount(cluster, weights=score_arr, minlength=seeds.size)
+    members = np.bincount(cluster, minlength=seeds.size)
+    fused = np.stack(
+        [
+            np.bincount(cluster, weights=score_arr * xyxy[:, k], minlength=seeds.size)
+            for k in range(4)
+        ],
+        axis=1,
+    )
+    positive = weight > 0.0
+    fused[positive] /= weight[positive, None]
+    fused[~positive] = xyxy[seeds[~positive]]
+    fused_scores = weight / members * np.minimum(members, num_models) / num_models
+
+    order = np.argsort(-fused_scores, kind="stable")
+    return _detections_like(boxes, fused[order], fused_scores[order], label_arr[seeds][order])
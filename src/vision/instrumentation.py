@@ -0,0 +1,457 @@
+"""
+Opt-in per-stage latency instrumentation for the inference entry points.
+
+Design goals
+------------
+- Near-zero cost when off: instrumentation is disabled by default. A disabled
+  :func:`stage` returns a shared no-op context manager, and a disabled
+  :func:`timed` wrapper makes one global check before calling through.
+- Pluggable sinks: timings and counters go to every active :class:`Sink`. Three
+  are provided: :class:`HistogramSink` (in-memory, p50/p95/p99),
+  :class:`JsonLinesSink` (one JSON object per event) and
+  :class:`PrometheusSink` (text exposition written to a file, e.g. for the node
+  exporter's textfile collector).
+- Stable names: stages are dotted ``<component>.<stage>`` strings, e.g.
+  ``torchvision.forward`` or ``contracts.nms``; every backend uses the same
+  stage suffixes: ``load``, ``preprocess``, ``forward``, ``to_numpy``.
+
+Notes
+-----
+The active sinks are process-wide and shared by all threads; sinks lock
+internally. Timings use ``time.perf_counter`` and include any time the stage
+spends waiting (e.g. on a GPU synchronization triggered by ``.cpu()``).
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Protocol,
+    Sequence,
+    TextIO,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+
+FnT = TypeVar("FnT", bound=Callable[..., Any])
+
+#: Upper bounds (seconds) of the Prometheus histogram buckets, 100 µs to 60 s.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Sink(Protocol):
+    """Receives stage timings and counter increments."""
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Records one execution of ``stage`` that took ``seconds``."""
+
+    def increment(self, counter: str, value: float) -> None:
+        """Adds ``value`` to ``counter``."""
+
+    def flush(self) -> None:
+        """Persists buffered data, if the sink buffers."""
+
+
+#: Active sinks; empty means instrumentation is disabled.
+_sinks: Tuple[Sink, ...] = ()
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullStage:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "sinks", "start")
+
+    def __init__(self, name: str, sinks: Tuple[Sink, ...]) -> None:
+        self.name = name
+        self.sinks = sinks
+
+    def __enter__(self) -> _Stage:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        elapsed = time.perf_counter() - self.start
+        for sink in self.sinks:
+            sink.observe(self.name, elapsed)
+
+
+def stage(name: str) -> Any:
+    """
+    Times the enclosed block as ``name``.
+
+    Example::
+
+        with stage("torchvision.forward"):
+            out = model(x)
+
+    :param name: Dotted stage name.
+    :returns: A context manager (a shared no-op one when disabled).
+    """
+    sinks = _sinks
+    if not sinks:
+        return _NULL_STAGE
+    return _Stage(name, sinks)
+
+
+def timed(name: str) -> Callable[[FnT], FnT]:
+    """
+    Decorator timing every call of a function as stage ``name``.
+
+    :param name: Dotted stage name.
+    :returns: The decorator. The undecorated function stays available as
+        ``__wrapped__``.
+    """
+    def decorate(fn: FnT) -> FnT:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            sinks = _sinks
+            if not sinks:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                for sink in sinks:
+                    sink.observe(name, elapsed)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def count(name: str, value: float = 1) -> None:
+    """
+    Increments counter ``name`` (no-op when disabled).
+
+    :param name: Dotted counter name, e.g. ``model_cache.hit``.
+    :param value: Increment.
+    """
+    sinks = _sinks
+    for sink in sinks:
+        sink.increment(name, value)
+
+
+def enable(*sinks: Sink) -> None:
+    """
+    Turns instrumentation on, replacing the active sinks.
+
+    :param sinks: One or more sinks.
+    :raises ValueError: If no sink is given.
+    """
+    global _sinks
+    if not sinks:
+        raise ValueError("enable() needs at least one sink")
+    _sinks = tuple(sinks)
+
+
+def disable() -> None:
+    """Flushes the active sinks and turns instrumentation off."""
+    global _sinks
+    flush()
+    _sinks = ()
+
+
+def is_enabled() -> bool:
+    """Returns True if any sink is active."""
+    return bool(_sinks)
+
+
+def flush() -> None:
+    """Flushes every active sink."""
+    for sink in _sinks:
+        sink.flush()
+
+
+@contextmanager
+def instrument(*sinks: Sink) -> Iterator[None]:
+    """
+    Enables ``sinks`` for the duration of a block, then flushes them and
+    restores the previous sinks.
+
+    Example::
+
+        hist = HistogramSink()
+        with instrument(hist):
+            run_torchvision_ssd_mobilenet(image)
+        print(hist.summary()["torchvision.forward"].p95)
+
+    :param sinks: One or more sinks.
+    :raises ValueError: If no sink is given.
+    """
+    global _sinks
+    previous = _sinks
+    enable(*sinks)
+    try:
+        yield
+    finally:
+        flush()
+        _sinks = previous
+
+
+@dataclass(frozen=True)
+class StageSummary:
+    """
+    Latency statistics of one stage.
+
+    Percentiles are computed from a uniform reservoir sample when a stage has
+    more executions than the sink keeps; count, total, mean and max are exact.
+
+    :ivar count: Executions recorded.
+    :ivar total: Summed seconds.
+    :ivar mean: Mean seconds.
+    :ivar p50: Median seconds.
+    :ivar p95: 95th percentile, seconds.
+    :ivar p99: 99th percentile, seconds.
+    :ivar max: Slowest execution, seconds.
+    """
+    count: int
+    total: float
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+
+class HistogramSink:
+    """
+    In-memory latency distributions and counters.
+
+    :param max_samples: Samples kept per stage for the percentiles; beyond that,
+        reservoir sampling keeps a uniform subset.
+    :param seed: Seed of the reservoir sampling.
+    :raises ValueError: If ``max_samples`` is not positive.
+    """
+
+    def __init__(self, *, max_samples: int = 10_000, seed: int = 0) -> None:
+        if max_samples <= 0:
+            raise ValueError("max_samples must be positive")
+        self._max_samples = max_samples
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._series: Dict[str, _Series] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(stage)
+            if series is None:
+                series = self._series[stage] = _Series()
+            series.count += 1
+            series.total += seconds
+            series.max = max(series.max, seconds)
+            if len(series.samples) < self._max_samples:
+                series.samples.append(seconds)
+            else:
+                j = self._rng.randrange(series.count)
+                if j < self._max_samples:
+                    series.samples[j] = seconds
+
+    def increment(self, counter: str, value: float) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def flush(self) -> None:
+        pass
+
+    def summary(self) -> Dict[str, StageSummary]:
+        """Returns the statistics of every stage seen so far, by stage name."""
+        with self._lock:
+            series = {
+                name: (s.count, s.total, s.max, list(s.samples)) for name, s in self._series.items()
+            }
+        out = {}
+        for name, (n, total, slowest, samples) in sorted(series.items()):
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]).tolist()
+            out[name] = StageSummary(n, total, total / n, p50, p95, p99, slowest)
+        return out
+
+    def counters(self) -> Dict[str, float]:
+        """Returns the counter values, by counter name."""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        """Drops every recorded timing and counter."""
+        with self._lock:
+            self._series.clear()
+            self._counters.clear()
+
+
+class JsonLinesSink:
+    """
+    Appends one JSON object per event to a file.
+
+    Stage events look like ``{"ts": 1700000000.0, "stage": "contracts.nms",
+    "seconds": 0.0004}``, counter events like ``{"ts": ..., "counter":
+    "model_cache.hit", "value": 1}``.
+
+    :param target: File path (opened in append mode) or an open text stream.
+    """
+
+    def __init__(self, target: Union[str, Path, TextIO]) -> None:
+        if isinstance(target, (str, Path)):
+            self._file: TextIO = open(target, "a", encoding="utf-8")
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+        self._lock = threading.Lock()
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self._write({"ts": time.time(), "stage": stage, "seconds": seconds})
+
+    def increment(self, counter: str, value: float) -> None:
+        self._write({"ts": time.time(), "counter": counter, "value": value})
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flushes, and closes the file if this sink opened it."""
+        self.flush()
+        if self._owns_file:
+            self._file.close()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if math.isfinite(value) else ("+Inf" if value > 0 else "-Inf")
+
+
+class PrometheusSink:
+    """
+    Aggregates stage histograms and counters and writes them in the Prometheus
+    text exposition format on :meth:`flush`.
+
+    Stages become the ``<prefix>_stage_seconds`` histogram with a ``stage``
+    label, counters the ``<prefix>_events_total`` counter with a ``name`` label.
+    The file is replaced atomically, so a scraper never reads a partial file.
+
+    :param path: Output file, e.g. ``/var/lib/node_exporter/vision.prom``.
+    :param buckets: Increasing histogram bucket upper bounds, in seconds.
+    :param prefix: Metric name prefix.
+    :raises ValueError: If ``buckets`` is empty or not strictly increasing.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        prefix: str = "vision",
+    ) -> None:
+        bounds = [float(b) for b in buckets]
+        if not bounds or any(b >= c for b, c in zip(bounds, bounds[1:])):
+            raise ValueError("buckets must be non-empty and strictly increasing")
+        self.path = Path(path)
+        self._bounds = np.asarray(bounds)
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Tuple[np.ndarray, List[float]]] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        i = int(np.searchsorted(self._bounds, seconds))  # first bound >= seconds
+        with self._lock:
+            entry = self._histograms.get(stage)
+            if entry is None:
+                entry = self._histograms[stage] = (
+                    np.zeros(len(self._bounds) + 1, dtype=np.int64),
+                    [0.0],
+                )
+            entry[0][i] += 1
+            entry[1][0] += seconds
+
+    def increment(self, counter: str, value: float) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def render(self) -> str:
+        """Returns the current metrics in the text exposition format."""
+        name = f"{self._prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} Time spent per pipeline stage.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            histograms = {k: (c.copy(), s[0]) for k, (c, s) in self._histograms.items()}
+            counters = dict(self._counters)
+        for stage_name, (counts, total) in sorted(histograms.items()):
+            label = _label(stage_name)
+            cumulative = np.cumsum(counts)
+            for bound, n in zip(self._bounds.tolist() + [math.inf], cumulative.tolist()):
+                lines.append(f'{name}_bucket{{stage="{label}",le="{_number(bound)}"}} {n}')
+            lines.append(f'{name}_sum{{stage="{label}"}} {_number(total)}')
+            lines.append(f'{name}_count{{stage="{label}"}} {int(cumulative[-1])}')
+
+        events = f"{self._prefix}_events_total"
+        lines += [f"# HELP {events} Instrumentation counters.", f"# TYPE {events} counter"]
+        for counter, value in sorted(counters.items()):
+            lines.append(f'{events}{{name="{_label(counter)}"}} {_number(value)}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        text = self.render()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.chmod(tmp, 0o644)  # mkstemp creates 0o600; the scraper may run as another user
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,381 @@
+"""
+Append-only, chunked store packing many class maps into a single file.
+
+Design goals
+------------
+- Few files: masks are appended to one data file; a small JSON-lines index next
+  to it records where each mask's chunks live, so 100k masks are two files, not
+  100k, and opening the store reads only the index.
+- Random access: each mask is split into bands of ``chunk_rows`` rows that are
+  compressed independently, so a windowed read decodes only the bands it
+  touches. The data file is memory-mapped; uncompressed chunks are returned as
+  views without copying.
+- Cheap codecs for label images: run-length encoding (class maps are mostly
+  long runs of the same id) or zlib, both from NumPy and the standard library.
+- Crash-tolerant appends: data is written before its index line, so a torn
+  write leaves at most unreferenced bytes at the end of the data file and a
+  partial last index line, which is ignored on open and truncated by the next
+  ``mode="a"`` open.
+
+Notes
+-----
+The store is append-only and single-writer; readers in other processes see
+masks once their index line has been flushed (reopen the store to refresh).
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+Codec = Literal["rle", "zlib", "raw"]
+StoreMode = Literal["r", "a"]
+
+_MAGIC = b"CLSMAPS1"
+_INDEX_SUFFIX = ".index"
+
+
+@dataclass(frozen=True)
+class MaskEntry:
+    """
+    Index record of one stored mask.
+
+    :ivar key: Mask identifier, unique within the store.
+    :ivar shape: Mask shape ``(H, W)``.
+    :ivar dtype: NumPy dtype string of the mask.
+    :ivar codec: Chunk codec.
+    :ivar chunk_rows: Rows per chunk (the last chunk may be shorter).
+    :ivar chunks: ``(offset, length)`` of each chunk in the data file.
+    """
+    key: str
+    shape: Tuple[int, int]
+    dtype: str
+    codec: Codec
+    chunk_rows: int
+    chunks: Tuple[Tuple[int, int], ...]
+
+
+def rle_encode(values: np.ndarray) -> bytes:
+    """
+    Run-length encodes a flat integer array.
+
+    Layout: ``uint32`` run count, one byte giving the width of the run lengths
+    (2 when the array has fewer than 65536 elements, else 4), the run values
+    (in the array's dtype), then the run lengths.
+
+    :param values: 1-D array.
+    :returns: The encoded bytes.
+    """
+    flat = np.ascontiguousarray(values).reshape(-1)
+    length_dtype = np.uint16 if flat.size <= np.iinfo(np.uint16).max else np.uint32
+    header = np.uint8(np.dtype(length_dtype).itemsize).tobytes()
+    if flat.size == 0:
+        return np.uint32(0).tobytes() + header
+    starts = np.concatenate([[0], np.flatnonzero(flat[1:] != flat[:-1]) + 1])
+    lengths = np.diff(np.concatenate([starts, [flat.size]])).astype(length_dtype)
+    return np.uint32(starts.size).tobytes() + header + flat[starts].tobytes() + lengths.tobytes()
+
+
+def rle_decode(data: Union[bytes, memoryview], dtype: np.dtype) -> np.ndarray:
+    """
+    Decodes bytes produced by :func:`rle_encode`.
+
+    :param data: The encoded bytes.
+    :param dtype: Dtype of the encoded values.
+    :returns: The flat decoded array.
+    """
+    n = int(np.frombuffer(data, dtype=np.uint32, count=1)[0])
+    width = int(np.frombuffer(data, dtype=np.uint8, count=1, offset=4)[0])
+    length_dtype = np.uint16 if width == 2 else np.uint32
+    values = np.frombuffer(data, dtype=dtype, count=n, offset=5)
+    lengths = np.frombuffer(data, dtype=length_dtype, count=n, offset=5 + n * dtype.itemsize)
+    return np.repeat(values, lengths)
+
+
+def _encode(chunk: np.ndarray, codec: Codec, level: int) -> bytes:
+    if codec == "rle":
+        return rle_encode(chunk)
+    if codec == "zlib":
+        return zlib.compress(np.ascontiguousarray(chunk).tobytes(), level)
+    return np.ascontiguousarray(chunk).tobytes()
+
+
+class ClassMapStore:
+    """
+    Append-only file of many class maps with random-access, windowed reads.
+
+    Example::
+
+        with ClassMapStore("masks.cms", mode="a") as store:
+            store.append_many((f"frame_{i:06d}", m) for i, m in enumerate(maps))
+        with ClassMapStore("masks.cms") as store:
+            crop = store.read_window("frame_000042", 100, 200, 300, 400)
+
+    :param path: Data file path. The index lives at ``path + ".index"``.
+    :param mode: "r" to read an existing store, "a" to create or append.
+    :param codec: Codec for new masks: "rle" (default), "zlib" or "raw".
+    :param chunk_rows: Rows per independently compressed chunk for new masks.
+    :param level: zlib compression level (1 = fastest).
+    :raises ValueError: If ``mode``, ``codec`` or ``chunk_rows`` are invalid, or
+        the file is not a class-map store.
+    :raises FileNotFoundError: If ``mode="r"`` and the store does not exist.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: StoreMode = "r",
+        *,
+        codec: Codec = "rle",
+        chunk_rows: int = 64,
+        level: int = 1,
+    ) -> None:
+        if mode not in ("r", "a"):
+            raise ValueError(f"Unsupported mode: {mode}")
+        if codec not in ("rle", "zlib", "raw"):
+            raise ValueError(f"Unsupported codec: {codec}")
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be positive")
+
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + _INDEX_SUFFIX)
+        self.mode = mode
+        self.codec = codec
+        self.chunk_rows = chunk_rows
+        self.level = level
+        self._entries: Dict[str, MaskEntry] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._data = None
+        self._index = None
+
+        if mode == "a" and not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(_MAGIC)
+            self.index_path.write_text("")
+        with open(self.path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"Not a class-map store: {self.path}")
+        self._load_index()
+
+        if mode == "a":
+            self._data = open(self.path, "ab")
+            self._index = open(self.index_path, "a")
+            self._index.truncate(self._index_bytes)  # drop a torn last line
+
+    def __enter__(self) -> ClassMapStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flushes pending writes and releases the files and the memory map."""
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+        if self._mmap is not None:
+            self._release_mmap()
+
+    def keys(self) -> List[str]:
+        """Stored keys, in insertion order."""
+        return list(self._entries)
+
+    def entry(self, key: str) -> MaskEntry:
+        """
+        Returns the index record of a mask.
+
+        :param key: Mask identifier.
+        :returns: The record.
+        :raises KeyError: If ``key`` is not stored.
+        """
+        return self._entries[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def append(self, key: str, class_map: np.ndarray) -> MaskEntry:
+        """
+        Appends one mask.
+
+        :param key: Unique mask identifier.
+        :param class_map: Integer array (H, W).
+        :returns: The index record written.
+        :raises ValueError: If the store is read-only, the key exists or the mask
+            is not a 2-D integer array.
+        """
+        return self.append_many([(key, class_map)])[0]
+
+    def append_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> List[MaskEntry]:
+        """
+        Appends many masks with one data write and one index write per call.
+
+        Masks are encoded first, so nothing is written if one of them is invalid.
+
+        :param items: ``(key, class_map)`` pairs.
+        :returns: The index records written, in order.
+        :raises ValueError: As for :meth:`append`.
+        """
+        if self._data is None:
+            raise ValueError("Store is open read-only; use mode='a' to append")
+
+        offset = self._data.seek(0, os.SEEK_END)
+        blobs: List[bytes] = []
+        entries: List[MaskEntry] = []
+        seen = set()
+        for key, class_map in items:
+            arr = np.asarray(class_map)
+            if arr.ndim != 2 or arr.dtype.kind not in "iub":
+                raise ValueError(f"class map {key!r} must be a 2-D integer array")
+            if key in self._entries or key in seen:
+                raise ValueError(f"Key already stored: {key!r}")
+            seen.add(key)
+
+            chunks = []
+            for y0 in range(0, max(arr.shape[0], 1), self.chunk_rows):
+                blob = _encode(arr[y0 : y0 + self.chunk_rows], self.codec, self.level)
+                chunks.append((offset, len(blob)))
+                blobs.append(blob)
+                offset += len(blob)
+            entries.append(
+                MaskEntry(
+                    key=key,
+                    shape=(int(arr.shape[0]), int(arr.shape[1])),
+                    dtype=arr.dtype.str,
+                    codec=self.codec,
+                    chunk_rows=self.chunk_rows,
+                    chunks=tuple(chunks),
+                )
+            )
+
+        self._data.write(b"".join(blobs))
+        self._data.flush()
+        self._index.write("".join(json.dumps(_entry_to_json(e)) + "\n" for e in entries))
+        self._index.flush()
+        for e in entries:
+            self._entries[e.key] = e
+        return entries
+
+    def read(self, key: str) -> np.ndarray:
+        """
+        Reads a whole mask.
+
+        :param key: Mask identifier.
+        :returns: The mask (H, W).
+        :raises KeyError: If ``key`` is not stored.
+        """
+        e = self._entries[key]
+        return self.read_window(key, 0, e.shape[0], 0, e.shape[1])
+
+    def read_window(self, key: str, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """
+        Reads the region ``[y0:y1, x0:x1]`` of a mask, decoding only the chunks
+        that overlap rows ``y0:y1``. Bounds are clipped to the mask like slicing.
+
+        :param key: Mask identifier.
+        :param y0: First row.
+        :param y1: End row (exclusive).
+        :param x0: First column.
+        :param x1: End column (exclusive).
+        :returns: The region. For the "raw" codec and a single chunk, this is a
+            read-only view of the memory map.
+        :raises KeyError: If ``key`` is not stored.
+        """
+        e = self._entries[key]
+        h, w = e.shape
+        rows = slice(*slice(y0, y1).indices(h))
+        cols = slice(*slice(x0, x1).indices(w))
+        dtype = np.dtype(e.dtype)
+        if rows.stop <= rows.start:
+            return np.empty((0, max(cols.stop - cols.start, 0)), dtype=dtype)
+
+        buf = self._buffer()
+        first = rows.start // e.chunk_rows
+        last = (rows.stop - 1) // e.chunk_rows
+        parts = []
+        for k in range(first, last + 1):
+            offset, length = e.chunks[k]
+            n_rows = min(e.chunk_rows, h - k * e.chunk_rows)
+            raw = memoryview(buf)[offset : offset + length]
+            if e.codec == "rle":
+                chunk = rle_decode(raw, dtype)
+            elif e.codec == "zlib":
+                chunk = np.frombuffer(zlib.decompress(raw), dtype=dtype)
+            else:
+                chunk = np.frombuffer(raw, dtype=dtype)
+            parts.append(chunk.reshape(n_rows, w))
+
+        block = parts[0] if len(parts) == 1 else np.concatenate(parts, axis=0)
+        lo = rows.start - first * e.chunk_rows
+        return block[lo : lo + (rows.stop - rows.start), cols]
+
+    def _buffer(self) -> mmap.mmap:
+        size = os.path.getsize(self.path)
+        if self._mmap is None or self._mmap.size() < size:
+            if self._mmap is not None:
+                self._release_mmap()
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def _release_mmap(self) -> None:
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # "raw" views still reference it; it is unmapped once they are freed
+        self._mmap = None
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            raise FileNotFoundError(f"Missing index: {self.index_path}")
+        with open(self.index_path, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+        size = 0
+        for i, line in enumerate(lines):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated index line")
+                e = _entry_from_json(json.loads(line)) if line.strip() else None
+            except (ValueError, KeyError, TypeError, IndexError):
+                if i == len(lines) - 1:
+                    break  # torn by a crash mid-append; truncated by the next append open
+                raise ValueError(f"Corrupt index line {i + 1}: {self.index_path}") from None
+            if e is not None:
+                self._entries[e.key] = e
+            size += len(line)
+        self._index_bytes = size
+
+def _entry_to_json(e: MaskEntry) -> dict:
+    return {
+        "key": e.key,
+        "shape": list(e.shape),
+        "dtype": e.dtype,
+        "codec": e.codec,
+        "chunk_rows": e.chunk_rows,
+        "chunks": [list(c) for c in e.chunks],
+    }
+
+
+def _entry_from_json(d: dict) -> MaskEntry:
+    return MaskEntry(
+        key=d["key"],
+        shape=(int(d["shape"][0]), int(d["shape"][1])),
+        dtype=d["dtype"],
+        codec=d["codec"],
+        chunk_rows=int(d["chunk_rows"]),
+        chunks=tuple((int(o), int(n)) for o, n in d["chunks"]),
+    )
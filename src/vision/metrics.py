@@ -0,0 +1,473 @@
+"""
+Streaming evaluation metrics for model outputs against ground truth.
+
+Design goals
+------------
+- Streaming: accumulators are updated one image at a time. The segmentation
+  confusion matrix has fixed ``C x C`` state; the detection evaluator keeps only
+  one score and one match flag per IoU threshold for each prediction, never boxes.
+- Vectorized: per-image work is a handful of NumPy calls (a single ``bincount``
+  for the confusion matrix, one :func:`~src.vision.boxes.iou_matrix` per class
+  for detection), never per-pixel or per-box-pair Python.
+- Parallel-friendly: accumulators are small picklable objects; workers each fill
+  their own and the parent combines them with ``merge``
+  (see :func:`evaluate_detections`).
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .boxes import BoxesLike, as_xyxy, iou_matrix
+
+#: IoU thresholds of the COCO ``AP@[.50:.95]`` metric.
+COCO_IOU_THRESHOLDS = tuple(np.round(np.linspace(0.5, 0.95, 10), 2).tolist())
+
+_CHUNKS_PER_WORKER = 4
+
+
+@dataclass(frozen=True)
+class SegmentationReport:
+    """
+    Summary of a segmentation evaluation.
+
+    :ivar per_class_iou: IoU per class id (NaN for classes absent from both the
+        ground truth and the predictions).
+    :ivar mean_iou: Mean of the defined per-class IoUs.
+    :ivar pixel_accuracy: Fraction of evaluated pixels predicted correctly.
+    :ivar per_class_accuracy: Recall per class id (NaN for classes absent from
+        the ground truth).
+    :ivar pixels: Number of evaluated (non-ignored) pixels.
+    """
+    per_class_iou: np.ndarray
+    mean_iou: float
+    pixel_accuracy: float
+    per_class_accuracy: np.ndarray
+    pixels: int
+
+    def named_iou(self, names: Sequence[str]) -> Dict[str, float]:
+        """
+        Maps class names to their IoU, skipping undefined classes.
+
+        :param names: Class names indexed by id (e.g. ``loaded.categories``).
+        :returns: ``{name: iou}``.
+        """
+        return {
+            names[i]: float(v) for i, v in enumerate(self.per_class_iou) if not np.isnan(v)
+        }
+
+
+class ConfusionMatrix:
+    """
+    Incremental confusion matrix for semantic segmentation.
+
+    Rows are ground-truth classes, columns are predicted classes.
+
+    :param num_classes: Number of classes; valid ids are ``0 .. num_classes - 1``.
+    :param ignore_index: Ground-truth id whose pixels are skipped (e.g. 255 for
+        VOC boundaries). None disables ignoring.
+    :raises ValueError: If ``num_classes`` is not positive.
+    """
+
+    def __init__(self, num_classes: int, ignore_index: Optional[int] = 255) -> None:
+        if num_classes <= 0:
+            raise ValueError("num_classes must be positive")
+        self.num_classes = num_classes
+        self.ignore_index = ignore_index
+        self.matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+
+    def update(self, target: np.ndarray, prediction: np.ndarray) -> None:
+        """
+        Adds one (ground truth, prediction) pair of class maps.
+
+        :param target: Ground-truth class ids, any shape.
+        :param prediction: Predicted class ids, same shape as ``target``.
+        :raises ValueError: If the shapes differ, or a non-ignored id is outside
+            ``0 .. num_classes - 1``.
+        """
+        t = np.asarray(target).reshape(-1)
+        p = np.asarray(prediction).reshape(-1)
+        if t.shape != p.shape:
+            raise ValueError(
+                f"target and prediction must have the same shape, got {np.shape(target)} "
+                f"and {np.shape(prediction)}"
+            )
+        if self.ignore_index is not None:
+            keep = t != self.ignore_index
+            if not keep.all():
+                t, p = t[keep], p[keep]
+        if t.size == 0:
+            return
+
+        c = self.num_classes
+        if min(t.min(), p.min()) < 0 or max(t.max(), p.max()) >= c:
+            raise ValueError(f"class ids must be in [0, {c}) (or the ignore index)")
+        index = t.astype(np.intp) * c + p
+        self.matrix += np.bincount(index, minlength=c * c).reshape(c, c)
+
+    def merge(self, other: ConfusionMatrix) -> ConfusionMatrix:
+        """
+        Adds another accumulator's counts into this one (in place).
+
+        :param other: An accumulator with the same number of classes.
+        :returns: ``self``.
+        :raises ValueError: If the class counts differ.
+        """
+        if other.num_classes != self.num_classes:
+            raise ValueError("cannot merge confusion matrices with different class counts")
+        self.matrix += other.matrix
+        return self
+
+    @classmethod
+    def merge_all(cls, parts: Iterable[ConfusionMatrix]) -> ConfusionMatrix:
+        """
+        Combines the accumulators of several workers.
+
+        :param parts: At least one accumulator.
+        :returns: A new accumulator holding the summed counts.
+        :raises ValueError: If ``parts`` is empty or the class counts differ.
+        """
+        it = iter(parts)
+        try:
+            first = next(it)
+        except StopIteration:
+            raise ValueError("merge_all needs at least one accumulator") from None
+        total = cls(first.num_classes, first.ignore_index)
+        total.merge(first)
+        for part in it:
+            total.merge(part)
+        return total
+
+    def reset(self) -> None:
+        """Clears the counts."""
+        self.matrix[:] = 0
+
+    def iou(self) -> np.ndarray:
+        """Per-class IoU, ``TP / (TP + FP + FN)``; NaN where the class never occurs."""
+        tp = np.diag(self.matrix).astype(np.float64)
+        union = self.matrix.sum(axis=0) + self.matrix.sum(axis=1) - tp
+        out = np.full(self.num_classes, np.nan)
+        np.divide(tp, union, out=out, where=union > 0)
+        return out
+
+    def report(self) -> SegmentationReport:
+        """
+        Computes the summary metrics from the accumulated counts.
+
+        :returns: The report.
+        """
+        per_class_iou = self.iou()
+        tp = np.diag(self.matrix).astype(np.float64)
+        gt = self.matrix.sum(axis=1)
+        per_class_acc = np.full(self.num_classes, np.nan)
+        np.divide(tp, gt, out=per_class_acc, where=gt > 0)
+        total = int(self.matrix.sum())
+        defined = ~np.isnan(per_class_iou)
+        return SegmentationReport(
+            per_class_iou=per_class_iou,
+            mean_iou=float(per_class_iou[defined].mean()) if defined.any() else float("nan"),
+            pixel_accuracy=float(tp.sum() / total) if total else float("nan"),
+            per_class_accuracy=per_class_acc,
+            pixels=total,
+        )
+
+
+@dataclass(frozen=True)
+class DetectionReport:
+    """
+    Summary of a detection evaluation.
+
+    :ivar iou_thresholds: The IoU thresholds, in order.
+    :ivar classes: Evaluated labels, in sorted order (the rows of ``ap``/``recall``).
+    :ivar ap: Array (K, T) of average precision per class and threshold (NaN for
+        classes without ground truth).
+    :ivar recall: Array (K, T) of the maximum recall reached per class and threshold.
+    :ivar num_ground_truth: Ground-truth box count per class.
+    :ivar mean_ap: Mean of ``ap`` over classes and thresholds (COCO ``AP``).
+    """
+    iou_thresholds: Tuple[float, ...]
+    classes: Tuple[Hashable, ...]
+    ap: np.ndarray
+    recall: np.ndarray
+    num_ground_truth: np.ndarray
+    mean_ap: float
+
+    def mean_ap_at(self, iou_threshold: float) -> float:
+        """
+        Mean AP over classes at one threshold (e.g. 0.5 for ``AP50``).
+
+        :param iou_threshold: One of :attr:`iou_thresholds`.
+        :returns: The mean AP.
+        :raises ValueError: If the threshold was not evaluated.
+        """
+        matches = np.flatnonzero(np.isclose(self.iou_thresholds, iou_threshold))
+        if matches.size == 0:
+            raise ValueError(f"IoU threshold {iou_threshold} was not evaluated")
+        column = self.ap[:, matches[0]]
+        defined = ~np.isnan(column)
+        return float(column[defined].mean()) if defined.any() else float("nan")
+
+    def per_class_ap(self) -> Dict[Hashable, float]:
+        """AP averaged over thresholds for each class with ground truth."""
+        return {
+            c: float(np.mean(row)) for c, row in zip(self.classes, self.ap) if not np.isnan(row[0])
+        }
+
+
+class DetectionEvaluator:
+    """
+    Streaming COCO-style average precision for object detection.
+
+    Matching follows COCO: within an image and class, predictions are visited in
+    descending score order and each one is matched to the unmatched ground-truth
+    box it overlaps most, if that IoU reaches the threshold. AP is the mean of
+    the interpolated precision at ``recall_points`` evenly spaced recall levels.
+    Crowd regions and area ranges are not modelled.
+
+    :param iou_thresholds: IoU thresholds to evaluate. Defaults to 0.50:0.05:0.95.
+    :param max_detections: Highest-scoring predictions kept per image (COCO uses 100).
+        None keeps all of them.
+    :param recall_points: Number of recall levels of the interpolated PR curve.
+    :raises ValueError: If a threshold is outside [0, 1] or a count is not positive.
+    """
+
+    def __init__(
+        self,
+        iou_thresholds: Sequence[float] = COCO_IOU_THRESHOLDS,
+        *,
+        max_detections: Optional[int] = 100,
+        recall_points: int = 101,
+    ) -> None:
+        thresholds = np.asarray(iou_thresholds, dtype=np.float64).reshape(-1)
+        if thresholds.size == 0 or thresholds.min() < 0.0 or thresholds.max() > 1.0:
+            raise ValueError("iou_thresholds must be non-empty values in [0, 1]")
+        if max_detections is not None and max_detections <= 0:
+            raise ValueError("max_detections must be positive")
+        if recall_points <= 1:
+            raise ValueError("recall_points must be at least 2")
+        self.iou_thresholds = tuple(thresholds.tolist())
+        self.max_detections = max_detections
+        self.recall_points = recall_points
+        self._thresholds = thresholds
+        self._scores: Dict[Hashable, List[np.ndarray]] = {}
+        self._matched: Dict[Hashable, List[np.ndarray]] = {}
+        self._num_gt: Dict[Hashable, int] = {}
+
+    def update(
+        self,
+        pred_boxes: Union[BoxesLike, np.ndarray],
+        pred_scores: Sequence[float],
+        pred_labels: Sequence[Hashable],
+        gt_boxes: Union[BoxesLike, np.ndarray],
+        gt_labels: Sequence[Hashable],
+    ) -> None:
+        """
+        Adds the predictions and ground truth of one image.
+
+        :param pred_boxes: Predicted boxes (N, 4) XYXY.
+        :param pred_scores: Predicted scores (N,).
+        :param pred_labels: Predicted labels (N,).
+        :param gt_boxes: Ground-truth boxes (M, 4) XYXY.
+        :param gt_labels: Ground-truth labels (M,).
+        :raises ValueError: If the per-image sequences have inconsistent lengths.
+        """
+        p_xyxy = as_xyxy(pred_boxes)
+        p_scores = np.asarray(pred_scores, dtype=np.float64).reshape(-1)
+        p_labels = np.asarray(pred_labels).reshape(-1)
+        g_xyxy = as_xyxy(gt_boxes)
+        g_labels = np.asarray(gt_labels).reshape(-1)
+        if not (p_xyxy.shape[0] == p_scores.shape[0] == p_labels.shape[0]):
+            raise ValueError("pred boxes, scores, and labels must have the same length")
+        if g_xyxy.shape[0] != g_labels.shape[0]:
+            raise ValueError("gt boxes and labels must have the same length")
+
+        order = np.argsort(-p_scores, kind="stable")
+        if self.max_detections is not None:
+            order = order[: self.max_detections]
+        p_xyxy, p_scores, p_labels = p_xyxy[order], p_scores[order], p_labels[order]
+
+        if p_labels.size == 0 and g_labels.size == 0:
+            return
+        names, inverse = np.unique(np.concatenate([p_labels, g_labels]), return_inverse=True)
+        p_ids, g_ids = inverse[: p_labels.size], inverse[p_labels.size :]
+
+        for k, name in enumerate(names.tolist()):
+            p_idx = np.flatnonzero(p_ids == k)
+            g_idx = np.flatnonzero(g_ids == k)
+            if g_idx.size:
+                self._num_gt[name] = self._num_gt.get(name, 0) + int(g_idx.size)
+            if p_idx.size == 0:
+                continue
+            if g_idx.size:
+                matched = self._match(iou_matrix(p_xyxy[p_idx], g_xyxy[g_idx]))
+            else:
+                matched = np.zeros((self._thresholds.size, p_idx.size), dtype=bool)
+            self._scores.setdefault(name, []).append(p_scores[p_idx])
+            self._matched.setdefault(name, []).append(matched)
+
+    def _match(self, ious: np.ndarray) -> np.ndarray:
+        """Greedy score-ordered matching at every threshold at once; returns (T, P) hits."""
+        n_thr = self._thresholds.size
+        n_pred, n_gt = ious.shape
+        hits = np.zeros((n_thr, n_pred), dtype=bool)
+        taken = np.zeros((n_thr, n_gt), dtype=bool)
+        rows = np.arange(n_thr)
+        for i in range(n_pred):
+            cand = np.where(taken, -1.0, ious[i])
+            best = cand.argmax(axis=1)
+            hit = cand[rows, best] >= self._thresholds
+            if hit.any():
+                hits[hit, i] = True
+                taken[rows[hit], best[hit]] = True
+        return hits
+
+    def merge(self, other: DetectionEvaluator) -> DetectionEvaluator:
+        """
+        Adds another evaluator's accumulated results into this one (in place).
+
+        :param other: An evaluator with the same settings.
+        :returns: ``self``.
+        :raises ValueError: If the settings differ.
+        """
+        if (other.iou_thresholds, other.max_detections, other.recall_points) != (
+            self.iou_thresholds,
+            self.max_detections,
+            self.recall_points,
+        ):
+            raise ValueError("cannot merge evaluators with different settings")
+        for name, parts in other._scores.items():
+            self._scores.setdefault(name, []).extend(parts)
+            self._matched.setdefault(name, []).extend(other._matched[name])
+        for name, n in other._num_gt.items():
+            self._num_gt[name] = self._num_gt.get(name, 0) + n
+        return self
+
+    def __getstate__(self) -> dict:
+        # Ship one array per class instead of one per image between processes.
+        state = self.__dict__.copy()
+        state["_scores"] = {k: [np.concatenate(v)] for k, v in self._scores.items()}
+        state["_matched"] = {k: [np.concatenate(v, axis=1)] for k, v in self._matched.items()}
+        return state
+
+    def report(self) -> DetectionReport:
+        """
+        Computes AP and recall per class and threshold from the accumulated results.
+
+        :returns: The report.
+        """
+        classes = tuple(sorted(set(self._num_gt) | set(self._scores)))
+        n_thr = self._thresholds.size
+        ap = np.full((len(classes), n_thr), np.nan)
+        recall = np.full((len(classes), n_thr), np.nan)
+        num_gt = np.array([self._num_gt.get(c, 0) for c in classes], dtype=np.int64)
+        levels = np.linspace(0.0, 1.0, self.recall_points)
+
+        for k, name in enumerate(classes):
+            if num_gt[k] == 0:
+                continue
+            if name not in self._scores:
+                ap[k] = 0.0
+                recall[k] = 0.0
+                continue
+            scores = np.concatenate(self._scores[name])
+            matched = np.concatenate(self._matched[name], axis=1)
+            order = np.argsort(-scores, kind="mergesort")
+            tp = np.cumsum(matched[:, order], axis=1)
+            fp = np.cumsum(~matched[:, order], axis=1)
+            rec = tp / num_gt[k]
+            prec = tp / np.maximum(tp + fp, np.finfo(np.float64).eps)
+            # Precision envelope: best precision at any recall at least this high.
+            prec = np.maximum.accumulate(prec[:, ::-1], axis=1)[:, ::-1]
+            for t in range(n_thr):
+                idx = np.searchsorted(rec[t], levels, side="left")
+                q = np.zeros(levels.size)
+                valid = idx < rec.shape[1]
+                q[valid] = prec[t, idx[valid]]
+                ap[k, t] = q.mean()
+                recall[k, t] = rec[t, -1]
+
+        defined = ~np.isnan(ap)
+        return DetectionReport(
+            iou_thresholds=self.iou_thresholds,
+            classes=classes,
+            ap=ap,
+            recall=recall,
+            num_ground_truth=num_gt,
+            mean_ap=float(ap[defined].mean()) if defined.any() else float("nan"),
+        )
+
+
+#: One image's ``(pred_boxes, pred_scores, pred_labels, gt_boxes, gt_labels)``.
+ImageEvaluation = Tuple[
+    np.ndarray, Sequence[float], Sequence[Hashable], np.ndarray, Sequence[Hashable]
+]
+
+
+def _evaluate_chunk(
+    chunk: Sequence[ImageEvaluation], settings: Tuple[Tuple[float, ...], Optional[int], int]
+) -> DetectionEvaluator:
+    """Worker entry point: evaluate a chunk of images into a fresh evaluator."""
+    thresholds, max_detections, recall_points = settings
+    evaluator = DetectionEvaluator(
+        thresholds, max_detections=max_detections, recall_points=recall_points
+    )
+    for image in chunk:
+        evaluator.update(*image)
+    return evaluator
+
+
+def evaluate_detections(
+    images: Sequence[ImageEvaluation],
+    evaluator: Optional[DetectionEvaluator] = None,
+    *,
+    workers: int = 0,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> DetectionEvaluator:
+    """
+    Evaluates many images, optionally in parallel, merging the workers' results.
+
+    Images are split into contiguous chunks; each chunk is evaluated into its own
+    :class:`DetectionEvaluator` (in-process when ``workers`` is 0 or 1 and no
+    ``executor`` is given, otherwise on a process pool), and the partial
+    evaluators are merged into ``evaluator``. The result is identical for any
+    worker count.
+
+    :param images: Per-image ``(pred_boxes, pred_scores, pred_labels, gt_boxes,
+        gt_labels)`` tuples.
+    :param evaluator: Evaluator to merge into (defines the settings). Defaults to
+        a new COCO-style :class:`DetectionEvaluator`.
+    :param workers: Number of worker processes. 0 or 1 runs in-process.
+    :param chunk_size: Images per task. If None, about four chunks per worker.
+    :param executor: Optional existing executor to reuse across calls.
+    :returns: ``evaluator``, updated with every image; call ``report()`` on it.
+    :raises ValueError: If ``workers`` or ``chunk_size`` are invalid.
+    """
+    if workers < 0:
+        raise ValueError("workers must be non-negative")
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    target = DetectionEvaluator() if evaluator is None else evaluator
+    settings = (target.iou_thresholds, target.max_detections, target.recall_points)
+    size = chunk_size or max(1, math.ceil(len(images) / (max(workers, 1) * _CHUNKS_PER_WORKER)))
+    chunks = [images[i : i + size] for i in range(0, len(images), size)]
+
+    if executor is None and workers <= 1:
+        parts = (_evaluate_chunk(chunk, settings) for chunk in chunks)
+        for part in parts:
+            target.merge(part)
+        return target
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        for part in pool.map(_evaluate_chunk, chunks, [settings] * len(chunks)):
+            target.merge(part)
+    finally:
+        if executor is None:
+            pool.shutdown()
+    return target
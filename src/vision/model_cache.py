@@ -0,0 +1,260 @@
+"""
+Process-wide registry of loaded models, shared by all inference backends.
+
+Design goals
+------------
+- Load once: a model is built the first time it is requested and reused by every
+  later call with the same (backend, model, weights, device) key.
+- Thread-safe: concurrent requests for the same key trigger a single load, while
+  different keys can load in parallel.
+- Bounded: least-recently-used models are evicted once the estimated memory of
+  the cached models exceeds a configurable budget.
+- Framework-agnostic: loaders are plain callables, and memory is estimated by duck
+  typing (torch modules, TF variables, wrappers exposing ``.model``), so this
+  module imports no ML framework.
+
+Notes
+-----
+Eviction only drops the registry's reference; callers that still hold a model
+keep it alive until they release it.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional, Tuple, TypeVar
+
+from .instrumentation import count, stage
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ModelKey:
+    """
+    Identity of a loaded model.
+
+    :ivar backend: Backend family, e.g. "torchvision", "tfhub", "ultralytics".
+    :ivar model: Model identifier (architecture name, hub handle or file name).
+    :ivar weights: Weights identifier (enum name, URL or checkpoint path).
+    :ivar device: Device the model is placed on, e.g. "cpu" or "cuda".
+    """
+    backend: str
+    model: str
+    weights: str
+    device: str
+
+
+def _tensor_bytes(tensor: object) -> int:
+    numel = getattr(tensor, "numel", None)
+    element_size = getattr(tensor, "element_size", None)
+    if callable(numel) and callable(element_size):
+        return int(numel()) * int(element_size())
+    shape = getattr(tensor, "shape", None)
+    dtype = getattr(tensor, "dtype", None)
+    size = getattr(dtype, "size", None)  # tf.DType
+    if not isinstance(size, int):
+        size = getattr(dtype, "itemsize", None)  # numpy dtype
+    if shape is None or not isinstance(size, int):
+        return 0
+    numel = 1
+    for dim in shape:
+        numel *= int(dim) if dim is not None else 0
+    return numel * size
+
+
+def estimate_model_bytes(model: object) -> int:
+    """
+    Best-effort estimate of the memory held by a model's parameters.
+
+    Supports torch modules (``parameters()``/``buffers()``), TensorFlow objects
+    (``variables``) and wrappers that expose the real model as ``.model``
+    (ultralytics ``YOLO``, :class:`~src.vision.segmentation.LoadedSegmentationModel`).
+
+    :param model: The loaded model.
+    :returns: Estimated size in bytes, 0 if unknown.
+    """
+    parameters = getattr(model, "parameters", None)
+    if callable(parameters):
+        total = sum(_tensor_bytes(p) for p in parameters())
+        buffers = getattr(model, "buffers", None)
+        if callable(buffers):
+            total += sum(_tensor_bytes(b) for b in buffers())
+        return total
+
+    variables = getattr(model, "variables", None)
+    if variables is not None and not callable(variables):
+        return sum(_tensor_bytes(v) for v in variables)
+
+    inner = getattr(model, "model", None)
+    if inner is not None and inner is not model:
+        return estimate_model_bytes(inner)
+    return 0
+
+
+@dataclass
+class _Entry:
+    value: object
+    size: int
+
+
+@dataclass
+class _Loading:
+    """A per-key load lock and the number of callers holding or waiting on it."""
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    users: int = 0
+
+
+class ModelRegistry:
+    """
+    Thread-safe LRU cache of loaded models with a memory budget.
+
+    :param max_bytes: Budget for the summed estimated size of cached models.
+        None means unbounded. The most recently loaded model is always kept, even
+        if it alone exceeds the budget.
+    :param size_of: Function estimating a model's size in bytes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        size_of: Callable[[object], int] = estimate_model_bytes,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._size_of = size_of
+        self._entries: OrderedDict[ModelKey, _Entry] = OrderedDict()
+        self._loading: dict[ModelKey, _Loading] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        """The current memory budget in bytes (None = unbounded)."""
+        return self._max_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        """The summed estimated size of the cached models."""
+        with self._lock:
+            return sum(e.size for e in self._entries.values())
+
+    def set_max_bytes(self, max_bytes: Optional[int]) -> None:
+        """
+        Change the memory budget, evicting least-recently-used models if needed.
+
+        :param max_bytes: New budget in bytes, or None for unbounded.
+        """
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict_locked(keep=None)
+
+    def get(self, key: ModelKey, loader: Callable[[], T]) -> T:
+        """
+        Return the model for ``key``, calling ``loader`` only if it is not cached.
+
+        Concurrent callers asking for the same missing key wait for a single load.
+        If ``loader`` raises, nothing is cached and the exception propagates; the
+        waiting callers then retry one at a time.
+
+        :param key: Model identity.
+        :param loader: Zero-argument callable building the model.
+        :returns: The cached or newly loaded model.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                count("model_cache.hit")
+                return entry.value  # type: ignore[return-value]
+            # The per-key lock stays registered while anyone holds or waits on it,
+            # so a caller arriving after a failed load queues behind the retry
+            # instead of starting a second, concurrent load.
+            loading = self._loading.setdefault(key, _Loading())
+            loading.users += 1
+
+        try:
+            with loading.lock:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        count("model_cache.hit")
+                        return entry.value  # type: ignore[return-value]
+                count("model_cache.miss")
+                with stage(f"model_cache.load.{key.backend}"):
+                    value = loader()
+                size = self._size_of(value)
+                with self._lock:
+                    self._entries[key] = _Entry(value=value, size=size)
+                    self._evict_locked(keep=key)
+        finally:
+            with self._lock:
+                loading.users -= 1
+                if not loading.users:
+                    del self._loading[key]
+        return value
+
+    def warmup(self, entries: Iterable[Tuple[ModelKey, Callable[[], object]]]) -> None:
+        """
+        Eagerly load models, e.g. at service startup, so the first request is fast.
+
+        :param entries: ``(key, loader)`` pairs, loaded in order.
+        """
+        for key, loader in entries:
+            self.get(key, loader)
+
+    def evict(self, key: ModelKey) -> bool:
+        """
+        Drop one model from the cache.
+
+        :param key: Model identity.
+        :returns: True if the model was cached.
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Drop every cached model."""
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self) -> list[ModelKey]:
+        """Cached keys, from least to most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict_locked(self, keep: Optional[ModelKey]) -> None:
+        if self._max_bytes is None:
+            return
+        total = sum(e.size for e in self._entries.values())
+        for key in list(self._entries):
+            if total <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).size
+            count("model_cache.evict")
+
+
+_DEFAULT_REGISTRY = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Return the process-wide registry used by the inference backends.
+
+    Use :meth:`ModelRegistry.set_max_bytes` on it to configure the memory budget.
+
+    :returns: The shared registry.
+    """
+    return _DEFAULT_REGISTRY
@@ -0,0 +1,246 @@
+"""
+Streaming detection pipeline: decode, inference and post-processing overlapped.
+
+Design goals
+------------
+- Overlap: images are decoded (and optionally preprocessed) in a thread pool
+  while the detector runs, and the contract stages of one batch run in a
+  background thread while the next batch is inferred.
+- Flat memory: at most ``prefetch`` decoded inputs, one batch in inference and
+  one batch in post-processing are alive at a time, however long the input is.
+- Backend-agnostic: the detector is any callable mapping a list of inputs to
+  per-image results exposing ``boxes``, ``scores`` and ``labels`` (every
+  ``run_*`` result type does).
+- Lazy and ordered: results are yielded one by one, in input order.
+
+Notes
+-----
+Decoding in threads helps because PIL releases the GIL while decompressing;
+so do the NumPy kernels behind :func:`~src.vision.contracts.nms` and the ML
+frameworks during inference.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .batch import ImageResult, PostprocessConfig, postprocess_image
+from .boxes import BoxArray, as_xyxy
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff", ".webp")
+
+#: A pipeline input: a file path, an already decoded image or an (H, W, 3) frame.
+Source = Union[str, Path, Image.Image, np.ndarray]
+#: Maps a batch of (preprocessed) inputs to one raw result per input.
+Detector = Callable[[List[Any]], Sequence[Any]]
+
+
+@dataclass(frozen=True)
+class StreamResult:
+    """
+    Post-processed detections of one pipeline input.
+
+    :ivar index: Position of the input in the source stream.
+    :ivar source: The input as given (path, image or frame).
+    :ivar image: The decoded RGB image, e.g. for :func:`~src.vision.viz.draw_boxes`;
+        None when the pipeline runs with ``keep_images=False``.
+    :ivar detections: Detections after thresholding and NMS.
+    """
+    index: int
+    source: Source
+    image: Optional[Image.Image]
+    detections: ImageResult
+
+
+def iter_image_files(
+    directory: Union[str, Path],
+    *,
+    extensions: Tuple[str, ...] = IMAGE_EXTENSIONS,
+    recursive: bool = False,
+) -> Iterator[Path]:
+    """
+    Lists the image files of a directory in sorted order.
+
+    :param directory: The directory to scan.
+    :param extensions: Accepted file suffixes (case-insensitive).
+    :param recursive: If True, also scan sub-directories.
+    :returns: An iterator over the image paths.
+    :raises ValueError: If ``directory`` is not a directory.
+    """
+    root = Path(directory)
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {root}")
+    pattern = "**/*" if recursive else "*"
+    allowed = {e.lower() for e in extensions}
+    for path in sorted(root.glob(pattern)):
+        if path.is_file() and path.suffix.lower() in allowed:
+            yield path
+
+
+def decode_image(source: Source) -> Image.Image:
+    """
+    Decodes a pipeline input into a fully loaded RGB image.
+
+    :param source: A file path, a PIL image or an (H, W, 3) uint8 frame.
+    :returns: The RGB image, with its pixel data loaded.
+    """
+    if isinstance(source, Image.Image):
+        image = source
+    elif isinstance(source, np.ndarray):
+        image = Image.fromarray(source)
+    else:
+        with Image.open(source) as f:
+            return f.convert("RGB")
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def per_image(run: Callable[[Image.Image], Any]) -> Detector:
+    """
+    Adapts a single-image ``run_*`` function to the pipeline's batch interface.
+
+    :param run: e.g. ``functools.partial(run_yolo_ultralytics, max_detections=100)``.
+    :returns: A detector calling ``run`` once per input.
+    """
+    return lambda inputs: [run(x) for x in inputs]
+
+
+def _postprocess_results(raw: Sequence[Any], config: PostprocessConfig) -> List[ImageResult]:
+    results = []
+    for r in raw:
+        xyxy, scores, labels = postprocess_image(
+            as_xyxy(r.boxes),
+            np.asarray(r.scores, dtype=np.float64),
+            np.asarray(r.labels),
+            config,
+        )
+        results.append(ImageResult(boxes=BoxArray(xyxy), scores=scores, labels=labels))
+    return results
+
+
+def _decode_and_prepare(
+    source: Source,
+    decode: Callable[[Source], Image.Image],
+    preprocess: Optional[Callable[[Image.Image], Any]],
+) -> Tuple[Image.Image, Any]:
+    image = decode(source)
+    return image, (image if preprocess is None else preprocess(image))
+
+
+def stream_detections(
+    sources: Iterable[Source],
+    detect: Detector,
+    config: Optional[PostprocessConfig] = None,
+    *,
+    batch_size: int = 8,
+    decode_workers: int = 4,
+    prefetch: Optional[int] = None,
+    decode: Callable[[Source], Image.Image] = decode_image,
+    preprocess: Optional[Callable[[Image.Image], Any]] = None,
+    keep_images: bool = True,
+) -> Iterator[StreamResult]:
+    """
+    Runs detection and the contract stages over a stream of images.
+
+    ``sources`` is consumed lazily: only up to ``prefetch`` inputs are decoded
+    ahead of the detector. Each batch of ``batch_size`` decoded inputs is passed
+    to ``detect`` in the calling thread; thresholding and NMS for that batch are
+    then handed to a background thread, so they overlap with decoding and
+    inference of the next batch.
+
+    Example::
+
+        detect = lambda ims: run_torchvision_ssd_mobilenet_batch(ims, batch_size=len(ims))
+        for res in stream_detections(iter_image_files("data/"), detect):
+            draw_boxes(res.image, res.detections.boxes, labels=res.detections.labels)
+
+    :param sources: Image paths, PIL images or video frames, e.g.
+        :func:`iter_image_files` or a frame generator.
+    :param detect: Callable mapping a list of inputs to one result per input,
+        each exposing ``boxes``, ``scores`` and ``labels``. See :func:`per_image`
+        to wrap a single-image ``run_*`` function.
+    :param config: Threshold and NMS parameters. Defaults to :class:`PostprocessConfig`.
+    :param batch_size: Inputs per ``detect`` call.
+    :param decode_workers: Threads decoding (and preprocessing) inputs.
+    :param prefetch: Maximum inputs decoded ahead of the detector. Defaults to
+        ``2 * batch_size``.
+    :param decode: Function turning a source into an RGB image.
+    :param preprocess: Optional function applied to each decoded image in the
+        decode threads (e.g. a framework transform); ``detect`` then receives
+        its outputs instead of the images.
+    :param keep_images: If False, decoded images are dropped once the detector
+        has run, and :attr:`StreamResult.image` is None.
+    :returns: An iterator of :class:`StreamResult`, in input order.
+    :raises ValueError: If ``batch_size``, ``decode_workers`` or ``prefetch`` is
+        not positive.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    if decode_workers <= 0:
+        raise ValueError("decode_workers must be positive")
+    depth = 2 * batch_size if prefetch is None else prefetch
+    if depth <= 0:
+        raise ValueError("prefetch must be positive")
+
+    cfg = PostprocessConfig() if config is None else config
+    source_iter = iter(sources)
+    index = 0
+
+    decoder = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="decode")
+    post = ThreadPoolExecutor(max_workers=1, thread_name_prefix="postprocess")
+    pending: Deque[Tuple[int, Source, Future]] = deque()
+
+    def fill() -> None:
+        nonlocal index
+        while len(pending) < depth:
+            try:
+                source = next(source_iter)
+            except StopIteration:
+                return
+            fut = decoder.submit(_decode_and_prepare, source, decode, preprocess)
+            pending.append((index, source, fut))
+            index += 1
+
+    def collect(
+        batch: List[Tuple[int, Source, Optional[Image.Image]]], fut: Future
+    ) -> Iterator[StreamResult]:
+        for (i, source, image), detections in zip(batch, fut.result()):
+            yield StreamResult(index=i, source=source, image=image, detections=detections)
+
+    previous: Optional[Tuple[List[Tuple[int, Source, Optional[Image.Image]]], Future]] = None
+    try:
+        fill()
+        while pending:
+            batch: List[Tuple[int, Source, Optional[Image.Image]]] = []
+            inputs: List[Any] = []
+            while pending and len(batch) < batch_size:
+                i, source, fut = pending.popleft()
+                image, prepared = fut.result()
+                batch.append((i, source, image if keep_images else None))
+                inputs.append(prepared)
+                fill()
+
+            raw = detect(inputs)
+            if len(raw) != len(inputs):
+                raise ValueError(
+                    f"detect returned {len(raw)} results for a batch of {len(inputs)} inputs"
+                )
+            del inputs
+            current = (batch, post.submit(_postprocess_results, raw, cfg))
+            if previous is not None:
+                yield from collect(*previous)
+            previous = current
+
+        if previous is not None:
+            yield from collect(*previous)
+    finally:
+        for _, _, fut in pending:
+            fut.cancel()
+        decoder.shutdown(wait=True)
+        post.shutdown(wait=True)
@@ -0,0 +1,444 @@
+"""
+Content-addressed on-disk cache of raw inference results.
+
+Design goals
+------------
+- Content-addressed: an entry's key is a SHA-256 over the image content and
+  everything that determines the model output (backend, model, weights and
+  the parameters passed to the backend), so renaming or copying files keeps
+  their hits, and changing any of those inputs misses instead of returning a
+  stale result.
+- Raw outputs only: detections are stored before thresholding and NMS, so a
+  sweep over :class:`~src.vision.batch.PostprocessConfig` values reads the
+  cache and runs only the contract stages, never the detector.
+- Compact and cheap to read: one small file per entry, a JSON header followed
+  by the raw array buffers, read with a single ``read`` and decoded with
+  ``np.frombuffer`` (an ``.npz`` costs a zip member and a header parse per
+  array, several times the whole read). Boxes are stored as float32 when that
+  is lossless (it is for torch and TF outputs) and class maps are run-length
+  encoded with :func:`~src.vision.mask_store.rle_encode`.
+- Safe for concurrent worker processes without locks: entries are written to
+  a temporary file in the same directory and renamed into place, so readers see
+  either nothing or a complete entry, and concurrent writers of the same key
+  write identical bytes.
+- Size-capped LRU: a hit refreshes the entry's modification time, and when the
+  cache grows past ``max_bytes`` the least recently used entries are deleted.
+
+Notes
+-----
+Each process tracks the bytes it has written and rescans the directory once they
+reach 1/16 of the cap, so the cap can be exceeded by that slack per writer
+process between scans. A file path is hashed by its bytes and a decoded image
+by its pixels, so the same picture given both ways yields two different keys.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .boxes import BoxArray, as_xyxy
+from .contracts import DetectionResult, label_table
+from .instrumentation import count, stage
+from .mask_store import rle_decode, rle_encode
+from .model_cache import ModelKey
+from .pipeline import Detector, Source, decode_image
+
+#: Bumped whenever the key derivation or the entry layout changes.
+CACHE_FORMAT_VERSION = 1
+
+_MAGIC = b"VRESULT1"
+_SUFFIX = ".res"
+_READ_BLOCK = 1 << 20
+_SLACK_FRACTION = 16
+
+
+def image_digest(source: Source) -> str:
+    """
+    Hashes the content of an image.
+
+    Files are hashed by their bytes, without decoding. PIL images and arrays
+    are hashed by their mode or dtype, shape and pixels.
+
+    :param source: A file path, a PIL image or an (H, W, C) array.
+    :returns: The hex SHA-256 digest.
+    """
+    h = hashlib.sha256()
+    if isinstance(source, Image.Image):
+        h.update(f"pil:{source.mode}:{source.size}:".encode())
+        h.update(source.tobytes())
+    elif isinstance(source, np.ndarray):
+        h.update(f"array:{source.dtype.str}:{source.shape}:".encode())
+        h.update(np.ascontiguousarray(source).data)
+    else:
+        h.update(b"file:")
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(_READ_BLOCK), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(
+    digest: str, model: ModelKey, params: Optional[Mapping[str, Any]] = None
+) -> str:
+    """
+    Derives the cache key of one image's result.
+
+    The model's ``device`` is not part of the key: the same weights give the same
+    detections on any device, up to floating-point noise.
+
+    :param digest: The image's :func:`image_digest`.
+    :param model: Backend, model and weights of the producer.
+    :param params: Backend parameters that change the raw output, e.g.
+        ``{"max_detections": 100}``. Values must be JSON-serializable.
+    :returns: The hex SHA-256 key.
+    :raises ValueError: If ``params`` is not JSON-serializable.
+    """
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "image": digest,
+        "backend": model.backend,
+        "model": model.model,
+        "weights": model.weights,
+        "params": dict(params or {}),
+    }
+    try:
+        text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    except TypeError as exc:
+        raise ValueError(f"params must be JSON-serializable: {exc}") from exc
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _encode_entry(header: Dict[str, Any], arrays: Mapping[str, np.ndarray]) -> bytes:
+    """
+    Serializes an entry.
+
+    Layout: the magic bytes, the ``uint32`` length of a JSON header listing each
+    array's name, dtype and shape, the header, then the arrays' bytes in order.
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    header = dict(header, arrays=[[n, a.dtype.str, list(a.shape)] for n, a in arrays.items()])
+    text = json.dumps(header, separators=(",", ":")).encode()
+    return b"".join(
+        [_MAGIC, struct.pack("<I", len(text)), text, *(a.tobytes() for a in arrays.values())]
+    )
+
+
+def _decode_entry(buf: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Inverse of :func:`_encode_entry`; arrays are read-only views of ``buf``."""
+    if buf[: len(_MAGIC)] != _MAGIC:
+        raise ValueError("Not a result cache entry")
+    (length,) = struct.unpack_from("<I", buf, len(_MAGIC))
+    offset = len(_MAGIC) + 4
+    header = json.loads(buf[offset : offset + length])
+    offset += length
+    arrays = {}
+    for name, dtype, shape in header["arrays"]:
+        dt = np.dtype(dtype)
+        n = int(np.prod(shape))
+        arrays[name] = np.frombuffer(buf, dtype=dt, count=n, offset=offset).reshape(shape)
+        offset += n * dt.itemsize
+    return header, arrays
+
+
+def _encode_detections(result: DetectionResult) -> bytes:
+    xyxy = result.boxes.xyxy
+    compact = xyxy.astype(np.float32)
+    if np.array_equal(compact, xyxy):
+        xyxy = compact
+    class_ids = result.class_ids
+    int32 = np.iinfo(np.int32)
+    if class_ids.size == 0 or (class_ids.min() >= int32.min and class_ids.max() <= int32.max):
+        class_ids = class_ids.astype(np.int32)
+    table = label_table(result.names)
+    names = [[i, str(table[i])] for i in np.flatnonzero(np.not_equal(table, None)).tolist()]
+    header = {"kind": "detections", "names": names, "fallback": result.fallback}
+    return _encode_entry(header, {"boxes": xyxy, "scores": result.scores, "class_ids": class_ids})
+
+
+def _decode_detections(
+    header: Mapping[str, Any], arrays: Mapping[str, np.ndarray]
+) -> DetectionResult:
+    ids = [i for i, _ in header["names"]]
+    names = [name for _, name in header["names"]]
+    return DetectionResult(
+        boxes=BoxArray(arrays["boxes"].astype(np.float64)),
+        scores=arrays["scores"].copy(),
+        class_ids=arrays["class_ids"],
+        names=names if ids == list(range(len(names))) else dict(zip(ids, names)),
+        fallback=header["fallback"],
+    )
+
+
+class ResultCache:
+    """
+    Directory of raw detection results and class maps keyed by :func:`cache_key`.
+
+    Example::
+
+        cache = ResultCache("~/.cache/vision-results", max_bytes=2 << 30)
+        model = ModelKey("torchvision", "ssdlite320_mobilenet_v3_large", "COCO_V1", "cpu")
+        detect = lambda ims: run_torchvision_ssd_mobilenet_batch(ims, max_detections=100)
+        raw = list(cache.detect_many(paths, detect, model, {"max_detections": 100}))
+        for config in configs:  # no inference after the first run
+            results = postprocess_batch(
+                [r.boxes for r in raw], [r.scores for r in raw], [r.labels for r in raw], config
+            )
+
+    Several processes may share one directory.
+
+    :param root: Cache directory, created if missing. Entries live at
+        ``root/<key[:2]>/<key>.res``.
+    :param max_bytes: Size cap of the cache on disk. None means unbounded.
+    :raises ValueError: If ``max_bytes`` is not positive.
+    """
+
+    def __init__(self, root: Union[str, Path], *, max_bytes: Optional[int] = None) -> None:
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._scanned_bytes = self.size_bytes() if max_bytes is not None else 0
+        self._written_bytes = 0
+
+    def path(self, key: str) -> Path:
+        """Path of the entry stored under ``key`` (which may not exist)."""
+        return self.root / key[:2] / (key + _SUFFIX)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.path(key).is_file()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(_SUFFIX) and not entry.name.startswith("."):
+                    yield entry
+
+    def _stats(self) -> List[Tuple[float, int, str]]:
+        stats = []
+        for entry in self._entries():
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue  # evicted by another process
+            stats.append((st.st_mtime, st.st_size, entry.path))
+        return stats
+
+    def size_bytes(self) -> int:
+        """Total size of the entries on disk, from a directory scan."""
+        return sum(size for _, size, _ in self._stats())
+
+    def get_detections(self, key: str) -> Optional[DetectionResult]:
+        """
+        Reads a cached detection result.
+
+        :param key: The entry's :func:`cache_key`.
+        :returns: The raw result, or None on a miss.
+        :raises ValueError: If the entry holds a class map.
+        """
+        entry = self._read(key, "detections")
+        return None if entry is None else _decode_detections(*entry)
+
+    def put_detections(self, key: str, result: DetectionResult) -> None:
+        """
+        Stores a raw (pre-threshold, pre-NMS) detection result.
+
+        :param key: The entry's :func:`cache_key`.
+        :param result: The backend's result.
+        """
+        self._write(key, _encode_detections(result))
+
+    def get_class_map(self, key: str) -> Optional[np.ndarray]:
+        """
+        Reads a cached class map.
+
+        :param key: The entry's :func:`cache_key`.
+        :returns: The class map (H, W), or None on a miss.
+        :raises ValueError: If the entry holds detections.
+        """
+        entry = self._read(key, "class_map")
+        if entry is None:
+            return None
+        header, arrays = entry
+        flat = rle_decode(arrays["rle"].data, np.dtype(header["dtype"]))
+        return flat.reshape(header["shape"])
+
+    def put_class_map(self, key: str, class_map: np.ndarray) -> None:
+        """
+        Stores a class map, run-length encoded.
+
+        :param key: The entry's :func:`cache_key`.
+        :param class_map: Integer array (H, W).
+        :raises ValueError: If ``class_map`` is not a 2-D integer array.
+        """
+        arr = np.asarray(class_map)
+        if arr.ndim != 2 or arr.dtype.kind not in "iub":
+            raise ValueError("class_map must be a 2-D integer array")
+        header = {"kind": "class_map", "shape": list(arr.shape), "dtype": arr.dtype.str}
+        rle = np.frombuffer(rle_encode(arr), dtype=np.uint8)
+        self._write(key, _encode_entry(header, {"rle": rle}))
+
+    def detect_many(
+        self,
+        sources: Iterable[Source],
+        detect: Detector,
+        model: ModelKey,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        batch_size: int = 8,
+        decode: Callable[[Source], Image.Image] = decode_image,
+    ) -> Iterator[DetectionResult]:
+        """
+        Yields the raw detections of every source, running ``detect`` on misses only.
+
+        Hits are never decoded and are yielded as soon as every earlier source
+        has its result. Misses are decoded and sent to ``detect`` once
+        ``batch_size`` sources are pending (or the input ends), and their results
+        are stored, so at most ``batch_size`` sources are held at a time.
+
+        :param sources: Image paths, PIL images or frames.
+        :param detect: Batch detector, as for
+            :func:`~src.vision.pipeline.stream_detections`. Results that are not
+            :class:`DetectionResult` are converted with
+            :meth:`DetectionResult.from_labels`.
+        :param model: Backend, model and weights of ``detect``.
+        :param params: Parameters of ``detect`` that change its raw output.
+        :param batch_size: Maximum sources pending, hence misses per ``detect`` call.
+        :param decode: Function turning a source into an RGB image.
+        :returns: An iterator of results, in input order.
+        :raises ValueError: If ``batch_size`` is not positive or ``detect``
+            returns the wrong number of results.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        window: List[Tuple[str, Optional[DetectionResult]]] = []
+        misses: List[Tuple[int, Source]] = []
+
+        def drain() -> Iterator[DetectionResult]:
+            if misses:
+                with stage("result_cache.decode"):
+                    images = [decode(src) for _, src in misses]
+                raw = detect(images)
+                if len(raw) != len(images):
+                    raise ValueError(
+                        f"detect returned {len(raw)} results for a batch of {len(images)} inputs"
+                    )
+                for (slot, _), r in zip(misses, raw):
+                    if not isinstance(r, DetectionResult):
+                        r = DetectionResult.from_labels(as_xyxy(r.boxes), r.scores, r.labels)
+                    self.put_detections(window[slot][0], r)
+                    window[slot] = (window[slot][0], r)
+                misses.clear()
+            for _, r in window:
+                yield r
+            window.clear()
+
+        for source in sources:
+            key = cache_key(image_digest(source), model, params)
+            hit = self.get_detections(key)
+            if hit is not None and not window:
+                yield hit  # nothing pending ahead of it: stream it right away
+                continue
+            if hit is None:
+                misses.append((len(window), source))
+            window.append((key, hit))
+            if len(window) == batch_size:
+                yield from drain()
+        yield from drain()
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Deletes least recently used entries until the cache fits ``max_bytes``.
+
+        :param max_bytes: Target size. Defaults to the cache's cap; with no cap
+            and no target nothing is deleted.
+        :returns: The number of entries deleted.
+        """
+        target = self.max_bytes if max_bytes is None else max_bytes
+        return self._evict(self._stats(), target)
+
+    def _evict(self, stats: List[Tuple[float, int, str]], target: Optional[int]) -> int:
+        total = sum(size for _, size, _ in stats)
+        evicted = 0
+        if target is not None and total > target:
+            for _, size, path in sorted(stats):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass  # another process evicted it first
+                except PermissionError:
+                    continue  # open by a reader (Windows)
+                total -= size
+                evicted += 1
+            count("result_cache.evict", evicted)
+        self._scanned_bytes, self._written_bytes = total, 0
+        return evicted
+
+    def clear(self) -> None:
+        """Deletes every entry."""
+        self.prune(0)
+
+    def _read(
+        self, key: str, kind: str
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                header, arrays = _decode_entry(f.read())
+        except (OSError, ValueError, KeyError):
+            # Missing, or unreadable: recompute, and the next put overwrites it.
+            count("result_cache.miss")
+            return None
+        if header.get("kind") != kind:
+            raise ValueError(f"Entry {key} holds a {header.get('kind')}, not a {kind}")
+        try:
+            os.utime(path)  # refresh recency for LRU eviction
+        except FileNotFoundError:
+            pass  # evicted since it was read
+        count("result_cache.hit")
+        return header, arrays
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        if self.max_bytes is None:
+            return
+        self._written_bytes += len(data)
+        slack = self.max_bytes // _SLACK_FRACTION
+        estimate = self._scanned_bytes + self._written_bytes
+        if self._written_bytes < slack and estimate <= self.max_bytes:
+            return
+        # Rescan to see other processes' writes; evict below the cap by the slack
+        # so that the next scans are not immediately followed by another eviction.
+        stats = self._stats()
+        if sum(size for _, size, _ in stats) > self.max_bytes:
+            self._evict(stats, self.max_bytes - slack)
+        else:
+            self._evict(stats, None)
@@ -6,6 +6,12 @@ Design goals
 - Minimal notebook boilerplate: notebook loads images, src does the rest.
 - Explicit I/O: inputs and outputs are clear, no hidden global state.
 - SRP: this module handles inference + safe preprocessing only (no visualization).
+- Compact outputs: class maps use the smallest integer dtype that holds the class
+  count (``uint8`` for PASCAL VOC), cast and optionally resized on the device,
+  so only the compact map crosses to host memory.
+- Bounded memory on large images: :func:`segment_semantic_tiled` runs
+  overlapping tiles at native resolution and stitches them incrementally
+  (see :mod:`src.vision.tiling`).
 
 Notes
 -----
@@ -16,20 +22,46 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal
+from types import ModuleType
+from typing import TYPE_CHECKING, List, Literal, Optional, Sequence, Union
 
 import numpy as np
-import torch
+from numpy.typing import DTypeLike
 from PIL import Image
-from torchvision.models.segmentation import (
-    DeepLabV3_ResNet50_Weights,
-    FCN_ResNet50_Weights,
-    deeplabv3_resnet50,
-    fcn_resnet50,
+
+from ._optional import import_optional
+from .batch import bucket_by_size
+from .instrumentation import stage
+from .model_cache import ModelKey, get_model_registry
+from .tiling import (
+    DEFAULT_MAX_CARRY_BYTES,
+    TileGrid,
+    array_region_reader,
+    iter_tile_batches,
+    pil_region_reader,
+    stitch_tiles,
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    import torch
+
 SegmentationModelName = Literal["deeplabv3_resnet50", "fcn_resnet50"]
 
+_TORCH_HINT = "Missing torch/torchvision. Install with: pip install -r requirements-torch.txt"
+
+# Class-map dtypes, smallest first; each has a torch counterpart of the same name.
+_CLASS_MAP_DTYPES = (np.uint8, np.int16, np.int32, np.int64)
+
+# Normalization used by the torchvision segmentation weights, if the transform hides it.
+_IMAGENET_MEAN = (0.485, 0.456, 0.406)
+_IMAGENET_STD = (0.229, 0.224, 0.225)
+
+# Model name -> (weights enum, builder) attribute names in torchvision.models.segmentation.
+_MODEL_BUILDERS: dict[str, tuple[str, str]] = {
+    "deeplabv3_resnet50": ("DeepLabV3_ResNet50_Weights", "deeplabv3_resnet50"),
+    "fcn_resnet50": ("FCN_ResNet50_Weights", "fcn_resnet50"),
+}
+
 
 @dataclass(frozen=True)
 class LoadedSegmentationModel:
@@ -51,88 +83,293 @@ class LoadedSegmentationModel:
     device: str
 
 
+def _torch() -> ModuleType:
+    """
+    Import torch on first use, so importing this module stays cheap.
+
+    :returns: The ``torch`` module.
+    """
+    return import_optional("torch", _TORCH_HINT)
+
+
 def _default_device() -> str:
     """
     Choose the best available device.
 
     :returns: "cuda" if available, else "cpu".
     """
-    return "cuda" if torch.cuda.is_available() else "cpu"
+    return "cuda" if _torch().cuda.is_available() else "cpu"
 
 
 def load_pretrained_segmentation_model(
     name: SegmentationModelName = "deeplabv3_resnet50",
-    device: str | None = None,
+    device: Optional[str] = None,
 ) -> LoadedSegmentationModel:
     """
     Load a pretrained semantic segmentation model from torchvision.
 
+    The model is built once per (name, device) and reused by every later call
+    through the shared registry in :mod:`src.vision.model_cache`.
+
     :param name: One of {"deeplabv3_resnet50", "fcn_resnet50"}.
     :param device: Torch device string. If None, uses CUDA when available.
     :returns: Loaded model container.
     """
+    if name not in _MODEL_BUILDERS:
+        raise ValueError(f"Unsupported model name: {name}")
+
     dev = _default_device() if device is None else device
+    segmentation = import_optional("torchvision.models.segmentation", _TORCH_HINT)
+    weights_attr, builder_attr = _MODEL_BUILDERS[name]
+    weights = getattr(segmentation, weights_attr).DEFAULT
+    builder = getattr(segmentation, builder_attr)
 
-    if name == "deeplabv3_resnet50":
-        weights = DeepLabV3_ResNet50_Weights.DEFAULT
-        model = deeplabv3_resnet50(weights=weights)
-    elif name == "fcn_resnet50":
-        weights = FCN_ResNet50_Weights.DEFAULT
-        model = fcn_resnet50(weights=weights)
-    else:
-        raise ValueError(f"Unsupported model name: {name}")
+    def _load() -> LoadedSegmentationModel:
+        model = builder(weights=weights)
+        model.eval()
+        model.to(dev)
 
-    model.eval()
-    model.to(dev)
+        preprocess = weights.transforms()
+        categories = list(weights.meta.get("categories", []))
 
-    preprocess = weights.transforms()
-    categories = list(weights.meta.get("categories", []))
+        return LoadedSegmentationModel(
+            name=name,
+            model=model,
+            weights_name=str(weights),
+            preprocess=preprocess,
+            categories=categories,
+            device=dev,
+        )
 
-    return LoadedSegmentationModel(
-        name=name,
-        model=model,
-        weights_name=str(weights),
-        preprocess=preprocess,
-        categories=categories,
-        device=dev,
-    )
+    key = ModelKey("torchvision-segmentation", name, str(weights), dev)
+    return get_model_registry().get(key, _load)
+
+
+def class_map_dtype(num_classes: int, dtype: Optional[DTypeLike] = None) -> np.dtype:
+    """
+    Choose the integer dtype of a class map.
+
+    :param num_classes: Number of classes the model predicts.
+    :param dtype: Requested dtype. If None, the smallest of uint8, int16, int32
+        that can hold every class id is used.
+    :returns: The class map dtype.
+    :raises ValueError: If ``dtype`` is unsupported or cannot hold ``num_classes`` ids.
+    """
+    if dtype is None:
+        for candidate in _CLASS_MAP_DTYPES:
+            if num_classes - 1 <= np.iinfo(candidate).max:
+                return np.dtype(candidate)
+    resolved = np.dtype(dtype)
+    if resolved.type not in _CLASS_MAP_DTYPES:
+        raise ValueError(
+            f"Unsupported class map dtype: {resolved} (use uint8, int16, int32 or int64)"
+        )
+    if num_classes - 1 > np.iinfo(resolved).max:
+        raise ValueError(f"dtype {resolved} cannot hold {num_classes} class ids")
+    return resolved
+
+
+def segment_semantic_batch(
+    images: Sequence[Image.Image],
+    loaded: Optional[LoadedSegmentationModel] = None,
+    model_name: SegmentationModelName = "deeplabv3_resnet50",
+    device: Optional[str] = None,
+    *,
+    batch_size: int = 4,
+    dtype: Optional[DTypeLike] = None,
+    resize_to_input: bool = False,
+    num_threads: Optional[int] = None,
+) -> List[np.ndarray]:
+    """
+    Run semantic segmentation on many images with batched forward passes.
+
+    Images are preprocessed, grouped into batches of identical input shape (see
+    :func:`~src.vision.batch.bucket_by_size`) and run under
+    ``torch.inference_mode()``, which skips autograd bookkeeping entirely. The
+    argmax, the optional resize and the dtype cast all happen on the model's
+    device; only the compact class maps are copied to the host.
+
+    :param images: PIL images in any mode. They are converted to RGB internally.
+    :param loaded: Pre-loaded model container. If None, the model is loaded on demand
+        using ``model_name`` and ``device``.
+    :param model_name: Model to load when ``loaded`` is None.
+    :param device: Device used when loading the model on demand.
+    :param batch_size: Maximum images per forward pass.
+    :param dtype: Class map dtype. If None, the smallest that holds the class count
+        (uint8 for the 21 PASCAL VOC classes). See :func:`class_map_dtype`.
+    :param resize_to_input: If True, logits are bilinearly resized to each input
+        image's size before the argmax, so maps align with the original pixels.
+        Otherwise maps have the preprocessed resolution.
+    :param num_threads: If given, sets torch's intra-op CPU thread count
+        (``torch.set_num_threads``, a process-wide setting) before running.
+    :returns: One class map of shape (H, W) per image, in input order.
+    :raises ValueError: If ``batch_size`` is not positive or ``dtype`` is unsupported.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    model_container = loaded
+    if model_container is None:
+        with stage("segmentation.load"):
+            model_container = load_pretrained_segmentation_model(model_name, device=device)
+
+    torch = _torch()
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
+    def prepared():
+        for image in images:
+            with stage("segmentation.preprocess"):
+                img_rgb = image.convert("RGB")
+                x = model_container.preprocess(img_rgb)
+            yield img_rgb.size, x
+
+    def bucket_key(item) -> tuple:
+        size, x = item
+        return (tuple(x.shape), size if resize_to_input else None)
+
+    results: dict[int, np.ndarray] = {}
+    with torch.inference_mode():
+        for batch in bucket_by_size(prepared(), batch_size, bucket_key):
+            with stage("segmentation.forward"):
+                x = torch.stack([x for _, (_, x) in batch]).to(model_container.device)
+                logits = model_container.model(x)["out"]  # (B, C, H, W)
+                if resize_to_input:
+                    w, h = batch[0][1][0]
+                    logits = torch.nn.functional.interpolate(
+                        logits, size=(h, w), mode="bilinear", align_corners=False
+                    )
+                out_dtype = class_map_dtype(int(logits.shape[1]), dtype)
+                maps = torch.argmax(logits, dim=1).to(getattr(torch, out_dtype.name))
+            with stage("segmentation.to_numpy"):
+                maps = maps.cpu().numpy()
+            for (index, _), class_map in zip(batch, maps):
+                results[index] = class_map
+
+    return [results[i] for i in range(len(results))]
 
 
 def segment_semantic(
     image: Image.Image,
-    loaded: LoadedSegmentationModel | None = None,
+    loaded: Optional[LoadedSegmentationModel] = None,
     model_name: SegmentationModelName = "deeplabv3_resnet50",
-    device: str | None = None,
+    device: Optional[str] = None,
+    *,
+    dtype: Optional[DTypeLike] = np.int64,
+    resize_to_input: bool = False,
 ) -> np.ndarray:
     """
     Run semantic segmentation on a single image.
 
     This function is notebook-friendly: it can lazy-load a default model if
-    ``loaded`` is not provided. It also guarantees RGB conversion.
+    ``loaded`` is not provided. It also guarantees RGB conversion. For many
+    images, use :func:`segment_semantic_batch`.
 
     :param image: PIL image in any mode. It will be converted to RGB internally.
     :param loaded: Pre-loaded model container. If None, the model is loaded on demand
         using ``model_name`` and ``device``.
     :param model_name: Model to load when ``loaded`` is None.
     :param device: Device used when loading the model on demand.
-    :returns: Integer class map of shape (H, W), dtype int64.
+    :param dtype: Class map dtype. Defaults to int64 for backwards compatibility;
+        pass None to get the smallest dtype that holds the class count (uint8 for
+        PASCAL VOC, 8x less memory).
+    :param resize_to_input: If True, resize on the device to the input image size.
+    :returns: Integer class map of shape (H, W).
+    """
+    return segment_semantic_batch(
+        [image],
+        loaded,
+        model_name,
+        device,
+        batch_size=1,
+        dtype=dtype,
+        resize_to_input=resize_to_input,
+    )[0]
+
+
+def segment_semantic_tiled(
+    image: Union[Image.Image, np.ndarray],
+    loaded: Optional[LoadedSegmentationModel] = None,
+    model_name: SegmentationModelName = "deeplabv3_resnet50",
+    device: Optional[str] = None,
+    *,
+    tile: int = 512,
+    overlap: int = 64,
+    batch_size: int = 4,
+    dtype: Optional[DTypeLike] = None,
+    out: Optional[np.ndarray] = None,
+    max_carry_bytes: Optional[int] = DEFAULT_MAX_CARRY_BYTES,
+) -> np.ndarray:
+    """
+    Run semantic segmentation on a large image with overlapping sliding windows.
+
+    The image is never resized: windows of ``tile`` x ``tile`` pixels are read,
+    normalized and pushed through the model ``batch_size`` at a time, and their
+    logits are blended in the overlaps and stitched into one class map as they
+    arrive (see :func:`~src.vision.tiling.stitch_tiles`). Peak memory is set by
+    the tile and batch size plus an ``overlap``-high logits strip of the image
+    width (capped by ``max_carry_bytes``), not by the image area.
+
+    For images that do not fit in memory, pass an ``np.memmap`` of the pixels
+    (only the windows being processed are paged in) and an ``np.memmap`` as
+    ``out``.
+
+    :param image: PIL image, or (H, W, 3) uint8 array (possibly memory-mapped).
+    :param loaded: Pre-loaded model container. If None, the model is loaded on demand
+        using ``model_name`` and ``device``.
+    :param model_name: Model to load when ``loaded`` is None.
+    :param device: Device used when loading the model on demand.
+    :param tile: Window side in pixels.
+    :param overlap: Overlap between neighbouring windows in pixels.
+    :param batch_size: Windows per forward pass.
+    :param dtype: Class map dtype. If None, the smallest that holds the class count.
+    :param out: Optional preallocated (H, W) output, e.g. an ``np.memmap``.
+    :param max_carry_bytes: Cap on the logits strip carried between tile rows;
+        None disables it.
+    :returns: Class map of shape (H, W), aligned with the input pixels.
+    :raises ValueError: If the tile geometry or ``batch_size`` is invalid, or the
+        strip would exceed ``max_carry_bytes``.
     """
     model_container = loaded
     if model_container is None:
-        model_container = load_pretrained_segmentation_model(model_name, device=device)
+        with stage("segmentation.load"):
+            model_container = load_pretrained_segmentation_model(model_name, device=device)
 
-    img_rgb = image.convert("RGB")
-    x = model_container.preprocess(img_rgb).unsqueeze(0).to(model_container.device)
+    torch = _torch()
+    if isinstance(image, Image.Image):
+        width, height = image.size
+        read = pil_region_reader(image)
+    else:
+        height, width = image.shape[:2]
+        read = array_region_reader(image)
+    grid = TileGrid.build(width, height, tile, overlap)
 
-    with torch.no_grad():
-        out = model_container.model(x)
+    n_classes = len(model_container.categories)
+    out_dtype = class_map_dtype(n_classes, dtype) if n_classes else np.dtype(dtype or np.int64)
 
-    logits = out["out"][0]  # (C, H, W)
-    class_map = torch.argmax(logits, dim=0).to("cpu").numpy().astype(np.int64)
-    return class_map
+    preprocess = model_container.preprocess
+    shape = (1, 3, 1, 1)
+    mean = torch.tensor(getattr(preprocess, "mean", _IMAGENET_MEAN)).view(shape)
+    std = torch.tensor(getattr(preprocess, "std", _IMAGENET_STD)).view(shape)
+    mean, std = mean.to(model_container.device), std.to(model_container.device)
+
+    def tile_logits():
+        for batch in iter_tile_batches(grid, read, batch_size):
+            with torch.inference_mode():
+                with stage("segmentation.preprocess"):
+                    x = torch.from_numpy(np.stack(batch)).to(model_container.device)
+                    x = (x.permute(0, 3, 1, 2).float().div_(255.0) - mean) / std
+                with stage("segmentation.forward"):
+                    logits = model_container.model(x)["out"].float()
+                with stage("segmentation.to_numpy"):
+                    logits = logits.cpu().numpy()
+            yield from logits
+
+    return stitch_tiles(
+        grid, tile_logits(), dtype=out_dtype, out=out, max_carry_bytes=max_carry_bytes
+    )
 
 
-def save_class_map_npz(class_map: np.ndarray, out_path: str | Path) -> Path:
+def save_class_map_npz(class_map: np.ndarray, out_path: Union[str, Path]) -> Path:
     """
     Save a class map to a compressed NPZ file.
 
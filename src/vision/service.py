@@ -0,0 +1,311 @@
+"""
+Asyncio micro-batching service: one-image requests, batched inference.
+
+Design goals
+------------
+- Use the batch dimension under concurrent load: requests that arrive within
+  ``max_wait_ms`` of each other are grouped, up to ``max_batch_size``, into one
+  call of the batched inference function.
+- Never block the event loop: inference runs in an executor (a dedicated thread
+  by default), and each caller awaits a future resolved with its own result.
+- Backpressure: the request queue is bounded. :meth:`DetectionService.submit`
+  waits for room, :meth:`DetectionService.submit_nowait` fails fast with
+  :class:`ServiceOverloadedError`.
+- Observable: counters for queue depth, batches run and batch fill ratio.
+
+Notes
+-----
+The knobs trade latency for throughput: ``max_wait_ms`` bounds the extra delay a
+request can spend waiting for companions, ``max_batch_size`` bounds the batch a
+model sees. With ``max_concurrent_batches > 1`` the next batch is collected and
+dispatched while the previous one is still running.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, Sequence, Set, Tuple, TypeVar
+
+R = TypeVar("R")
+
+_STOP = object()
+
+
+class ServiceOverloadedError(RuntimeError):
+    """Raised by :meth:`DetectionService.submit_nowait` when the queue is full."""
+
+
+@dataclass(frozen=True)
+class ServiceStats:
+    """
+    Snapshot of a service's counters.
+
+    :ivar submitted: Requests accepted into the queue.
+    :ivar completed: Requests resolved with a result.
+    :ivar failed: Requests resolved with an exception.
+    :ivar rejected: Requests refused because the queue was full.
+    :ivar batches: Inference calls made.
+    :ivar queue_depth: Requests currently waiting to be batched.
+    :ivar max_queue_depth: Largest queue depth observed.
+    :ivar batch_fill_ratio: Mean batch size divided by ``max_batch_size``
+        (1.0 means every batch was full).
+    """
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    batches: int
+    queue_depth: int
+    max_queue_depth: int
+    batch_fill_ratio: float
+
+
+class DetectionService(Generic[R]):
+    """
+    Collects single-image requests into micro-batches for a batched backend.
+
+    Example::
+
+        infer = lambda ims: run_torchvision_ssd_mobilenet_batch(ims, batch_size=len(ims))
+        async with DetectionService(infer, max_batch_size=16, max_wait_ms=5) as service:
+            result = await service.submit(image)
+
+    :param infer: Function mapping a list of inputs to one result per input, in
+        order. It runs in ``executor``, never on the event loop.
+    :param max_batch_size: Largest batch passed to ``infer``.
+    :param max_wait_ms: Longest time the first request of a batch waits for
+        more requests before the batch is dispatched.
+    :param max_queue_size: Bound of the request queue (backpressure).
+    :param max_concurrent_batches: Batches allowed in ``infer`` at the same time.
+    :param executor: Executor running ``infer``. If None, a private thread pool
+        with ``max_concurrent_batches`` threads is created and shut down by
+        :meth:`stop`.
+    :raises ValueError: If a size or time bound is not positive.
+    """
+
+    def __init__(
+        self,
+        infer: Callable[[List[Any]], Sequence[R]],
+        *,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 256,
+        max_concurrent_batches: int = 1,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be positive")
+        if max_concurrent_batches <= 0:
+            raise ValueError("max_concurrent_batches must be positive")
+
+        self._infer = infer
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000.0
+        self._max_queue_size = max_queue_size
+        self._max_concurrent = max_concurrent_batches
+        self._executor = executor
+        self._owns_executor = executor is None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._closed = False
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._batches = 0
+        self._batched_items = 0
+        self._max_depth = 0
+
+    async def start(self) -> None:
+        """Starts the batching task on the running event loop."""
+        if self._collector is not None:
+            return
+        if self._owns_executor:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrent, thread_name_prefix="detection-service"
+            )
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._slots = asyncio.Semaphore(self._max_concurrent)
+        self._closed = False
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        """
+        Stops accepting requests, finishes every queued and running batch, then
+        stops the batching task.
+
+        Requests that reach the queue after the stop marker (a :meth:`submit`
+        that was waiting for room when the service closed) fail with
+        ``RuntimeError`` instead of waiting forever.
+        """
+        if self._collector is None:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._collector
+        await self._fail_stranded()
+        if self._inflight:
+            await asyncio.gather(*self._inflight)
+        self._collector = None
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _fail_stranded(self) -> None:
+        while True:
+            await asyncio.sleep(0)  # let submitters woken by the last gets enqueue
+            if self._queue.empty():
+                return
+            while not self._queue.empty():
+                entry = self._queue.get_nowait()
+                if entry is _STOP or entry[1].done():
+                    continue
+                entry[1].set_exception(RuntimeError("service stopped"))
+                self._failed += 1
+
+    async def __aenter__(self) -> DetectionService[R]:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def submit(self, item: Any) -> R:
+        """
+        Queues one input and waits for its result.
+
+        If the queue is full, waits for room (backpressure propagates to the caller).
+
+        :param item: One input for ``infer`` (e.g. a PIL image).
+        :returns: The result computed for ``item``.
+        :raises RuntimeError: If the service is not running.
+        """
+        future = self._new_request()
+        await self._queue.put((item, future))
+        self._accepted()
+        return await future
+
+    async def submit_nowait(self, item: Any) -> R:
+        """
+        Like :meth:`submit`, but fails immediately if the queue is full.
+
+        :param item: One input for ``infer``.
+        :returns: The result computed for ``item``.
+        :raises ServiceOverloadedError: If the queue is full.
+        :raises RuntimeError: If the service is not running.
+        """
+        future = self._new_request()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise ServiceOverloadedError(
+                f"Request queue is full ({self._max_queue_size} pending)"
+            ) from None
+        self._accepted()
+        return await future
+
+    def stats(self) -> ServiceStats:
+        """Returns a snapshot of the service counters."""
+        fill = (
+            self._batched_items / (self._batches * self._max_batch_size) if self._batches else 0.0
+        )
+        return ServiceStats(
+            submitted=self._submitted,
+            completed=self._completed,
+            failed=self._failed,
+            rejected=self._rejected,
+            batches=self._batches,
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            max_queue_depth=self._max_depth,
+            batch_fill_ratio=fill,
+        )
+
+    def _new_request(self) -> asyncio.Future:
+        if self._collector is None or self._closed:
+            raise RuntimeError("DetectionService is not running; use start() or 'async with'")
+        return asyncio.get_running_loop().create_future()
+
+    def _accepted(self) -> None:
+        self._submitted += 1
+        self._max_depth = max(self._max_depth, self._queue.qsize())
+
+    async def _get_within(self, timeout: float) -> Any:
+        """Next queue entry, or None if nothing arrives within ``timeout`` seconds."""
+        queue = self._queue
+        if not queue.empty():
+            return queue.get_nowait()
+        if timeout <= 0:
+            return None
+        getter = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait({getter}, timeout=timeout)
+        if done:
+            return getter.result()
+        getter.cancel()
+        try:
+            # The entry may have arrived between the timeout and the cancellation.
+            return await getter
+        except asyncio.CancelledError:
+            return None
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch: List[Tuple[Any, asyncio.Future]] = [first]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                entry = await self._get_within(deadline - loop.time())
+                if entry is None:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            live = [(item, fut) for item, fut in batch if not fut.done()]
+            if not live:
+                return
+            self._batches += 1
+            self._batched_items += len(live)
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self._infer, [item for item, _ in live]
+                )
+                if len(results) != len(live):
+                    raise ValueError(
+                        f"infer returned {len(results)} results for a batch of {len(live)} inputs"
+                    )
+            except Exception as exc:  # resolved into every caller of the batch
+                for _, fut in live:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                        self._failed += 1
+                return
+            for (_, fut), result in zip(live, results):
+                if not fut.done():
+                    fut.set_result(result)
+                    self._completed += 1
+        finally:
+            self._slots.release()
@@ -0,0 +1,152 @@
+"""
+Uniform-grid spatial index over axis-aligned boxes.
+
+Design goals
+------------
+- Only spatially nearby boxes are returned as overlap candidates, so dense but
+  mostly disjoint candidate sets avoid all-pairs IoU work.
+- Exactness: every indexed box that could have a positive intersection with the
+  query is returned (a superset is fine, a miss is not).
+- Pure NumPy, no framework dependency; the index is immutable once built.
+
+Notes
+-----
+Each box is bucketed by the grid cell of its top-left corner. When the cell is at
+least as large as the box, any box intersecting a query lies in a bounded window
+of cells around the query, so a lookup touches a handful of contiguous slices.
+Boxes larger than the cell are kept in a separate "oversized" list that is
+returned with every query.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+from .boxes import BoxesLike, as_xyxy
+
+_CELL_SIZE_QUANTILE = 0.99
+_MAX_CELLS_PER_BOX = 4
+
+
+@dataclass(frozen=True, eq=False)
+class GridIndex:
+    """
+    Immutable grid-bucket index over an (N, 4) XYXY box array.
+
+    Cells are stored in compressed-row form: ``order`` lists box ids sorted by
+    cell key (row-major, ``cy * n_cols + cx``) and ``starts[k]:starts[k + 1]``
+    delimits the ids in cell ``k``.
+
+    :ivar cell_size: Side length of a square grid cell.
+    :ivar origin_x: x-coordinate of the left edge of column 0.
+    :ivar origin_y: y-coordinate of the top edge of row 0.
+    :ivar n_cols: Number of grid columns.
+    :ivar n_rows: Number of grid rows.
+    :ivar order: Indexed box ids sorted by cell key.
+    :ivar starts: Offsets into ``order`` per cell, of length ``n_cols * n_rows + 1``.
+    :ivar oversized: Ids of boxes larger than a cell, returned with every query.
+    """
+
+    cell_size: float
+    origin_x: float
+    origin_y: float
+    n_cols: int
+    n_rows: int
+    order: np.ndarray
+    starts: np.ndarray
+    oversized: np.ndarray
+
+    @classmethod
+    def build(
+        cls, boxes: Union[BoxesLike, np.ndarray], cell_size: Optional[float] = None
+    ) -> GridIndex:
+        """
+        Builds an index over ``boxes``.
+
+        :param boxes: The boxes to index, as a sequence of ``Box``, a ``BoxArray``
+            or an (N, 4) array. Row ``i`` is reported as id ``i``.
+        :param cell_size: Grid cell side. If None, the 99th percentile of the box
+            sides is used, so only a few outliers end up in the oversized list. The
+            cell is enlarged if needed to keep at most ~4 cells per box.
+        :returns: The built index.
+        :raises ValueError: If ``cell_size`` is not positive or a box coordinate
+            is not finite.
+        """
+        xyxy = as_xyxy(boxes)
+        sides = np.maximum(xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1])
+        sides = np.maximum(sides, 0.0)
+
+        if cell_size is None:
+            cell_size = float(np.quantile(sides, _CELL_SIZE_QUANTILE)) if sides.size else 1.0
+            if not cell_size > 0.0:
+                cell_size = 1.0
+        elif cell_size <= 0.0:
+            raise ValueError("cell_size must be positive")
+
+        n = xyxy.shape[0]
+        origin_x = float(xyxy[:, 0].min()) if n else 0.0
+        origin_y = float(xyxy[:, 1].min()) if n else 0.0
+        extent_x = float(xyxy[:, 0].max()) - origin_x if n else 0.0
+        extent_y = float(xyxy[:, 1].max()) - origin_y if n else 0.0
+        if not np.isfinite(extent_x + extent_y):
+            raise ValueError("boxes must have finite coordinates")
+
+        max_cells = max(1, _MAX_CELLS_PER_BOX * n)
+        while (extent_x // cell_size + 1) * (extent_y // cell_size + 1) > max_cells:
+            cell_size *= 2.0
+        n_cols = int(extent_x // cell_size) + 1
+        n_rows = int(extent_y // cell_size) + 1
+
+        fits = sides <= cell_size
+        ids = np.flatnonzero(fits)
+        cx = ((xyxy[ids, 0] - origin_x) // cell_size).astype(np.int64)
+        cy = ((xyxy[ids, 1] - origin_y) // cell_size).astype(np.int64)
+        keys = cy * n_cols + cx
+
+        sort = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=n_cols * n_rows)
+        starts = np.concatenate([[0], np.cumsum(counts)])
+
+        return cls(
+            cell_size=cell_size,
+            origin_x=origin_x,
+            origin_y=origin_y,
+            n_cols=n_cols,
+            n_rows=n_rows,
+            order=ids[sort],
+            starts=starts,
+            oversized=np.flatnonzero(~fits),
+        )
+
+    def query(self, x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+        """
+        Returns the ids of all indexed boxes that may intersect the query box.
+
+        The result is a superset: boxes that only touch the query's neighbourhood
+        can be included, but no box with a positive intersection is left out.
+
+        :param x1: Query top-left x.
+        :param y1: Query top-left y.
+        :param x2: Query bottom-right x.
+        :param y2: Query bottom-right y.
+        :returns: Candidate ids (unsorted, no duplicates).
+        """
+        cs = self.cell_size
+        cx0 = max(0, int((x1 - cs - self.origin_x) // cs))
+        cx1 = min(self.n_cols - 1, int((x2 - self.origin_x) // cs))
+        cy0 = max(0, int((y1 - cs - self.origin_y) // cs))
+        cy1 = min(self.n_rows - 1, int((y2 - self.origin_y) // cs))
+        if cx0 > cx1 or cy0 > cy1:
+            return self.oversized
+
+        starts = self.starts
+        parts = [
+            self.order[starts[cy * self.n_cols + cx0] : starts[cy * self.n_cols + cx1 + 1]]
+            for cy in range(cy0, cy1 + 1)
+        ]
+        if self.oversized.size:
+            parts.append(self.oversized)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
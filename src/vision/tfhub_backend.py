@@ -0,0 +1,310 @@
+"""
+Compiled TF Hub detection backend: fixed input shapes, warm graphs, grouped calls.
+
+Design goals
+------------
+- No retracing: every input is letterboxed (resized keeping its aspect ratio,
+  then zero-padded) to one of a few fixed shapes, and each shape has its own
+  ``tf.function`` with a fixed input signature, traced once.
+- Predictable latency: all shapes are traced and run once when the detector is
+  built, so the first real request does not pay for tracing.
+- Grouped calls: images that fall into the same shape are stacked and sent
+  through one graph call. The hub models only export a single-image signature,
+  so ``tf.map_fn`` runs it once per image inside that call: this is a series of
+  batch-of-1 forward passes, not a batched forward pass. It saves Python and
+  dispatch overhead per image, not model compute.
+- Tensor-side post-processing: normalized ``[ymin, xmin, ymax, xmax]`` boxes are
+  reordered, scaled back to each original image's pixels and clipped as one
+  tensor expression inside the compiled function.
+
+Notes
+-----
+Letterboxing changes the pixels the model sees compared to feeding the image at
+its native size, so detections can differ slightly from calling the hub model
+directly. The single-image ``run_tfhub_ssd_mobilenet`` functions go through this
+backend too. TensorFlow is imported when a detector is built, never at module
+import.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ._optional import import_optional
+from .batch import bucket_by_size
+from .boxes import BoxArray
+from .contracts import ClassNames, DetectionResult
+from .instrumentation import stage
+
+_TF_HINT = "Missing TensorFlow/TF Hub. Install: pip install -r requirements-tf.txt"
+
+#: (height, width) input shapes covering landscape, portrait and square images.
+DEFAULT_INPUT_SHAPES: Tuple[Tuple[int, int], ...] = ((480, 640), (640, 480), (640, 640))
+
+
+def choose_input_shape(
+    width: int, height: int, shapes: Sequence[Tuple[int, int]]
+) -> Tuple[int, int]:
+    """
+    Picks the fixed shape whose aspect ratio is closest to the image's, so the
+    letterbox padding is smallest. Ties go to the larger shape.
+
+    :param width: Image width.
+    :param height: Image height.
+    :param shapes: Candidate ``(height, width)`` shapes.
+    :returns: The chosen shape.
+    :raises ValueError: If ``shapes`` is empty.
+    """
+    if not shapes:
+        raise ValueError("shapes must not be empty")
+    aspect = math.log(width / height)
+    return min(shapes, key=lambda s: (abs(math.log(s[1] / s[0]) - aspect), -s[0] * s[1]))
+
+
+def letterbox(image: Image.Image, shape: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+    """
+    Resizes an image to fit ``shape`` keeping its aspect ratio, anchored at the
+    top-left corner and zero-padded on the right and bottom.
+
+    :param image: The input image.
+    :param shape: Target ``(height, width)``.
+    :returns: The (height, width, 3) uint8 canvas and the resize factor.
+    """
+    H, W = shape
+    w, h = image.size
+    scale = min(W / w, H / h)
+    nw, nh = min(W, max(1, round(w * scale))), min(H, max(1, round(h * scale)))
+    canvas = np.zeros((H, W, 3), dtype=np.uint8)
+    canvas[:nh, :nw] = np.asarray(image.convert("RGB").resize((nw, nh), Image.BILINEAR))
+    return canvas, scale
+
+
+def decode_entities(labels: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """
+    Turns per-detection class names (bytes or str) into a name table and ids,
+    decoding each distinct name once.
+
+    :param labels: Array (N,) of names.
+    :returns: The distinct names and the (N,) id of each detection in them.
+    """
+    names, class_ids = np.unique(labels, return_inverse=True)
+    decoded = [
+        lb.decode("ascii", errors="ignore") if isinstance(lb, (bytes, np.bytes_)) else str(lb)
+        for lb in names.tolist()
+    ]
+    return decoded, class_ids
+
+
+def _resolve_detector(model: Any, signature_names: Sequence[str]) -> Callable[..., Dict[str, Any]]:
+    signatures = getattr(model, "signatures", None) or {}
+    for name in signature_names:
+        fn = signatures.get(name)
+        if callable(fn):
+            return fn
+    if callable(model):
+        return model
+    raise RuntimeError("Could not get a callable detector function.")
+
+
+class TfHubDetector:
+    """
+    A loaded TF Hub detector compiled for a fixed set of input shapes.
+
+    Same-shape images share one graph call, but the model's single-image
+    signature is mapped over them with ``tf.map_fn``: each image still gets its
+    own batch-of-1 forward pass.
+
+    Example::
+
+        detector = load_tfhub_ssd_mobilenet_detector()  # traced and warm
+        results = detector(frames, batch_size=8)
+
+    :param model: The loaded TF Hub object (see ``load_tfhub_model``).
+    :param signature_names: Signatures to call, in order of preference; the
+        model itself is called if none exists and it is callable.
+    :param float_input: If True, pixels are passed as float32 in [0, 1],
+        otherwise as uint8.
+    :param class_key: Output holding each detection's class: numeric ids, or
+        byte-string names when ``class_dtype`` is "string".
+    :param class_dtype: TensorFlow dtype name of ``class_key``.
+    :param names: Class names indexed by id (numeric classes only).
+    :param fallback: Format for ids missing from ``names``.
+    :param input_shapes: Fixed ``(height, width)`` shapes inputs are letterboxed to.
+    :param max_detections: Detections kept per image.
+    :param warmup: If True, trace and run every shape once now.
+    :raises RuntimeError: If TensorFlow is not installed or the model has no
+        callable detector.
+    :raises ValueError: If ``input_shapes`` is empty or ``max_detections`` is
+        not positive.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        *,
+        signature_names: Sequence[str] = ("serving_default", "default"),
+        float_input: bool = False,
+        class_key: str = "detection_classes",
+        class_dtype: str = "float32",
+        names: ClassNames = (),
+        fallback: str = "class_{}",
+        input_shapes: Iterable[Tuple[int, int]] = DEFAULT_INPUT_SHAPES,
+        max_detections: int = 50,
+        warmup: bool = True,
+    ) -> None:
+        shapes = tuple((int(h), int(w)) for h, w in input_shapes)
+        if not shapes:
+            raise ValueError("input_shapes must not be empty")
+        if max_detections <= 0:
+            raise ValueError("max_detections must be positive")
+        self._tf = import_optional("tensorflow", _TF_HINT)
+        self._model = model  # keeps the module alive; not counted twice by the registry
+        self._detector = _resolve_detector(model, signature_names)
+        self._float_input = float_input
+        self._class_key = class_key
+        self._class_dtype = getattr(self._tf, class_dtype)
+        self._names = names
+        self._fallback = fallback
+        self.max_detections = max_detections
+        self._functions = {shape: self._compile(shape) for shape in shapes}
+        self._warmed = False
+        if warmup:
+            self.warmup()
+
+    @property
+    def input_shapes(self) -> Tuple[Tuple[int, int], ...]:
+        """The fixed ``(height, width)`` shapes, one compiled function each."""
+        return tuple(self._functions)
+
+    def _compile(self, shape: Tuple[int, int]) -> Callable[..., Any]:
+        tf = self._tf
+        H, W = shape
+        k = self.max_detections
+        detector, class_key, float_input = self._detector, self._class_key, self._float_input
+
+        def pad(t: Any) -> Any:
+            t = t[:k]
+            fill = tf.zeros(tf.concat([[k - tf.shape(t)[0]], tf.shape(t)[1:]], 0), t.dtype)
+            return tf.concat([t, fill], 0)
+
+        def one(image: Any) -> Tuple[Any, Any, Any, Any]:
+            x = tf.image.convert_image_dtype(image, tf.float32) if float_input else image
+            out = detector(x[tf.newaxis])
+            boxes = tf.reshape(out["detection_boxes"], [-1, 4])
+            scores = tf.reshape(out["detection_scores"], [-1])
+            classes = tf.reshape(out[class_key], [-1])
+            count = tf.minimum(tf.minimum(tf.shape(scores)[0], tf.shape(classes)[0]), k)
+            return pad(boxes), pad(scores), pad(classes), count
+
+        @tf.function(
+            input_signature=[
+                tf.TensorSpec([None, H, W, 3], tf.uint8),
+                tf.TensorSpec([None, 2], tf.float32),  # original (height, width)
+                tf.TensorSpec([None], tf.float32),  # letterbox scale
+            ]
+        )
+        def run(images: Any, sizes: Any, scales: Any) -> Tuple[Any, Any, Any, Any]:
+            boxes, scores, classes, counts = tf.map_fn(
+                one,
+                images,
+                fn_output_signature=(
+                    tf.TensorSpec([k, 4], tf.float32),
+                    tf.TensorSpec([k], tf.float32),
+                    tf.TensorSpec([k], self._class_dtype),
+                    tf.TensorSpec([], tf.int32),
+                ),
+            )
+            # Normalized yxyx on the canvas -> pixel xyxy on the original image.
+            xyxy = tf.gather(boxes, [1, 0, 3, 2], axis=-1)
+            xyxy = xyxy * tf.constant([W, H, W, H], tf.float32) / scales[:, None, None]
+            limit = tf.tile(tf.reverse(sizes, axis=[1]), [1, 2])[:, None, :]
+            return tf.minimum(tf.maximum(xyxy, 0.0), limit), scores, classes, counts
+
+        return run
+
+    def warmup(self) -> None:
+        """Traces and runs every compiled shape once on a blank image (only the first call)."""
+        if self._warmed:
+            return
+        for (H, W), fn in self._functions.items():
+            fn(
+                self._tf.zeros([1, H, W, 3], self._tf.uint8),
+                self._tf.constant([[H, W]], self._tf.float32),
+                self._tf.ones([1], self._tf.float32),
+            )
+        self._warmed = True
+
+    def _to_result(
+        self, boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray
+    ) -> DetectionResult:
+        if classes.dtype.kind in "OSU":
+            names, class_ids = decode_entities(classes)
+            return DetectionResult(
+                boxes=BoxArray(boxes), scores=scores, class_ids=class_ids, names=names
+            )
+        return DetectionResult(
+            boxes=BoxArray(boxes),
+            scores=scores,
+            class_ids=classes,
+            names=self._names,
+            fallback=self._fallback,
+        )
+
+    def __call__(
+        self, images: Iterable[Image.Image], *, batch_size: int = 8
+    ) -> List[DetectionResult]:
+        """
+        Detects objects in many images.
+
+        Images are letterboxed on the host to their closest fixed shape (see
+        :func:`choose_input_shape`) and grouped by shape into batches of up to
+        ``batch_size``, each one call of the compiled function.
+
+        :param images: The input images; may be a lazy iterable.
+        :param batch_size: Maximum images per call.
+        :returns: One result per image, in input order, with boxes in the
+            original image's pixels.
+        :raises ValueError: If ``batch_size`` is not positive.
+        """
+        tf = self._tf
+        shapes = self.input_shapes
+        prepared = (
+            (choose_input_shape(im.size[0], im.size[1], shapes), im) for im in images
+        )
+        results: Dict[int, DetectionResult] = {}
+        for batch in bucket_by_size(prepared, batch_size, lambda item: item[0]):
+            shape = batch[0][1][0]
+            with stage("tfhub.preprocess"):
+                canvases, sizes, scales = [], [], []
+                for _, (_, im) in batch:
+                    canvas, scale = letterbox(im, shape)
+                    canvases.append(canvas)
+                    sizes.append((im.size[1], im.size[0]))
+                    scales.append(scale)
+                inputs = (
+                    tf.convert_to_tensor(np.stack(canvases)),
+                    tf.constant(sizes, tf.float32),
+                    tf.constant(scales, tf.float32),
+                )
+            with stage("tfhub.forward"):
+                boxes, scores, classes, counts = self._functions[shape](*inputs)
+            with stage("tfhub.to_numpy"):
+                boxes, scores, classes = boxes.numpy(), scores.numpy(), classes.numpy()
+                for j, ((index, _), n) in enumerate(zip(batch, counts.numpy().tolist())):
+                    results[index] = self._to_result(
+                        boxes[j, :n], scores[j, :n], classes[j, :n]
+                    )
+        return [results[i] for i in range(len(results))]
+
+    def detect(self, image: Image.Image) -> DetectionResult:
+        """
+        Detects objects in one image through the compiled path.
+
+        :param image: The input image.
+        :returns: Its detections.
+        """
+        return self([image], batch_size=1)[0]
@@ -1,49 +1,95 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from typing import List
+from functools import cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
 
 import numpy as np
 from PIL import Image
 
-from .boxes import Box
+from ._optional import import_optional
+from .contracts import DetectionResult, label_table
+from .model_cache import ModelKey, get_model_registry
+from .tfhub_backend import DEFAULT_INPUT_SHAPES, TfHubDetector
 
-try:
-    import tensorflow as tf
-    import tensorflow_hub as hub
-except Exception:  # pragma: no cover
-    tf = None  # type: ignore
-    hub = None  # type: ignore
+_TF_HINT = "Missing TensorFlow/TF Hub. Install: pip install -r requirements-tf.txt"
 
 
-@dataclass(frozen=True)
-class TfDetResult:
+#: Backwards-compatible name of the shared result type.
+TfDetResult = DetectionResult
+
+
+#: COCO id -> name table shipped with the repository (``data/coco_labels.json``).
+COCO_LABELS_PATH = Path(__file__).resolve().parents[2] / "data" / "coco_labels.json"
+
+
+@cache
+def coco_id_to_name() -> Dict[str, str]:
     """
-    Holds the results of a TensorFlow Hub object detection.
-
-    :param boxes: A list of detected bounding boxes.
-    :type boxes: List[Box]
-    :param scores: A list of confidence scores for each detection.
-    :type scores: List[float]
-    :param labels: A list of class labels for each detection.
-    :type labels: List[str]
+    Returns the COCO class id -> name table, loading it on first use.
+
+    The file is resolved relative to this package, not the working directory,
+    so callers can run from anywhere.
+
+    :return: Mapping from stringified COCO id (e.g. "1") to class name.
+    :rtype: Dict[str, str]
+    """
+    with open(COCO_LABELS_PATH, "r") as f:
+        return json.load(f)
+
+
+@cache
+def coco_label_table() -> np.ndarray:
+    """
+    Returns the COCO names as a table indexed by integer class id.
+
+    :return: Object array of names (None for unused ids), see
+             :func:`~src.vision.contracts.label_table`.
+    :rtype: numpy.ndarray
+    """
+    return label_table(coco_id_to_name())
+
+
+def __getattr__(name: str) -> object:
+    # Backwards-compatible lazy module attribute (PEP 562).
+    if name == "COCO_ID_TO_NAME":
+        return coco_id_to_name()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+SSD_MOBILENET_V2_HANDLE = "https://tfhub.dev/tensorflow/ssd_mobilenet_v2/2"
+
+
+def load_tfhub_model(handle: str = SSD_MOBILENET_V2_HANDLE) -> object:
     """
-    boxes: List[Box]
-    scores: List[float]
-    labels: List[str]
+    Loads a TF Hub model through the shared model registry.
+
+    The module is loaded once per handle and reused by every later call (see
+    :mod:`src.vision.model_cache`).
 
+    :param handle: The TF Hub handle (URL or local path). Defaults to the COCO
+                   SSD MobileNet V2 detector.
+    :type handle: str, optional
+    :return: The loaded TF Hub object.
+    :rtype: object
+    :raises RuntimeError: If `tensorflow` or `tensorflow_hub` are not installed.
+    """
+    hub = import_optional("tensorflow_hub", _TF_HINT)
 
-with open("data/coco_labels.json", "r") as f:
-    COCO_ID_TO_NAME = json.load(f)
+    key = ModelKey("tfhub", handle, handle, "default")
+    return get_model_registry().get(key, lambda: hub.load(handle))
 
 
-def run_tfhub_ssd_mobilenet(image: Image.Image, *, max_detections: int = 50) -> TfDetResult:
+def run_tfhub_ssd_mobilenet(image: Image.Image, *, max_detections: int = 50) -> DetectionResult:
     """
     Runs object detection using a pre-trained SSD MobileNet V2 model from TensorFlow Hub.
 
     This function requires `tensorflow` and `tensorflow_hub` to be installed.
-    The model is trained on the COCO dataset.
+    The model is trained on the COCO dataset. The image goes through the
+    compiled, fixed-shape detector (see :func:`load_tfhub_ssd_mobilenet_detector`),
+    so new image sizes never trigger a retrace; it is letterboxed to the closest
+    of :data:`~src.vision.tfhub_backend.DEFAULT_INPUT_SHAPES` first.
 
     :param image: The input image to process.
     :type image: PIL.Image.Image
@@ -51,65 +97,86 @@ def run_tfhub_ssd_mobilenet(image: Image.Image, *, max_detections: int = 50) ->
                            Defaults to 50.
     :type max_detections: int, optional
     :return: An object containing the detected boxes, scores, and labels.
-    :rtype: TfDetResult
+    :rtype: DetectionResult
     :raises RuntimeError: If `tensorflow` or `tensorflow_hub` are not installed,
                           or if a callable detector function cannot be obtained from the model.
     """
-    if tf is None or hub is None:  # pragma: no cover
-        raise RuntimeError("Missing TensorFlow/TF Hub. Install: pip install -r requirements-tf.txt")
+    detector = load_tfhub_ssd_mobilenet_detector(max_detections=max_detections)
+    return detector.detect(image)
+
+
+def load_tfhub_ssd_mobilenet_detector(
+    *,
+    input_shapes: Iterable[Tuple[int, int]] = DEFAULT_INPUT_SHAPES,
+    max_detections: int = 50,
+    warmup: bool = True,
+) -> TfHubDetector:
+    """
+    Returns the COCO SSD MobileNet V2 detector compiled for fixed input shapes.
 
-    model = hub.load("https://tfhub.dev/tensorflow/ssd_mobilenet_v2/2")
+    The detector is built (traced and, by default, warmed up) once per
+    configuration and cached in the shared model registry; see
+    :class:`~src.vision.tfhub_backend.TfHubDetector`.
 
-    # Some TF Hub modules are callable; otherwise use a callable signature.
-    detector = model if callable(model) else (
-        model.signatures.get("serving_default") or model.signatures.get("default")
+    :param input_shapes: Fixed ``(height, width)`` shapes inputs are letterboxed to.
+    :type input_shapes: Iterable[Tuple[int, int]], optional
+    :param max_detections: The maximum number of detections per image. Defaults to 50.
+    :type max_detections: int, optional
+    :param warmup: If True, make sure every shape has run once. Defaults to True.
+    :type warmup: bool, optional
+    :return: The compiled detector.
+    :rtype: TfHubDetector
+    :raises RuntimeError: If `tensorflow` or `tensorflow_hub` are not installed.
+    """
+    shapes = tuple((int(h), int(w)) for h, w in input_shapes)
+    key = ModelKey(
+        "tfhub-compiled", SSD_MOBILENET_V2_HANDLE, f"{shapes}:{max_detections}", "default"
+    )
+    detector = get_model_registry().get(
+        key,
+        lambda: TfHubDetector(
+            load_tfhub_model(SSD_MOBILENET_V2_HANDLE),
+            names=coco_label_table(),
+            fallback="coco_{}",
+            input_shapes=shapes,
+            max_detections=max_detections,
+            warmup=warmup,
+        ),
+    )
+    if warmup:
+        detector.warmup()  # a cached detector may have been built with warmup=False
+    return detector
+
+
+def run_tfhub_ssd_mobilenet_batch(
+    images: Iterable[Image.Image],
+    *,
+    batch_size: int = 8,
+    max_detections: int = 50,
+    input_shapes: Iterable[Tuple[int, int]] = DEFAULT_INPUT_SHAPES,
+) -> List[DetectionResult]:
+    """
+    Runs COCO SSD MobileNet V2 on many images through the compiled, fixed-shape path.
+
+    Images are letterboxed to one of ``input_shapes`` and same-shape images share
+    one graph call (one forward pass per image, see
+    :class:`~src.vision.tfhub_backend.TfHubDetector`), so no call
+    ever sees a new input shape.
+
+    :param images: The input images; may be a lazy iterable.
+    :type images: Iterable[PIL.Image.Image]
+    :param batch_size: The maximum number of images per call. Defaults to 8.
+    :type batch_size: int, optional
+    :param max_detections: The maximum number of detections per image. Defaults to 50.
+    :type max_detections: int, optional
+    :param input_shapes: Fixed ``(height, width)`` shapes inputs are letterboxed to.
+    :type input_shapes: Iterable[Tuple[int, int]], optional
+    :return: One result per input image, in input order.
+    :rtype: List[DetectionResult]
+    :raises RuntimeError: If `tensorflow` or `tensorflow_hub` are not installed.
+    :raises ValueError: If `batch_size` is not positive.
+    """
+    detector = load_tfhub_ssd_mobilenet_detector(
+        input_shapes=input_shapes, max_detections=max_detections
     )
-    if detector is None or not callable(detector):
-        raise RuntimeError("Could not get a callable detector function.")
-
-    # Minimal input conversion: PIL -> uint8 tensor with batch dim
-    arr = np.array(image.convert("RGB"), dtype=np.uint8)
-    x = tf.convert_to_tensor(arr)[tf.newaxis, ...]
-
-    out = detector(x)
-
-    boxes = np.array(out["detection_boxes"].numpy())
-    scores = np.array(out["detection_scores"].numpy())
-    classes = np.array(out["detection_classes"].numpy())
-
-    # Remove batch dim if present
-    if boxes.ndim == 3:
-        boxes = boxes[0]
-    if scores.ndim == 2:
-        scores = scores[0]
-    if classes.ndim == 2:
-        classes = classes[0]
-
-    # Safety guard: sometimes boxes can come flattened
-    if boxes.ndim == 1:
-        if boxes.size % 4 != 0:
-            raise RuntimeError(f"Unexpected boxes shape {boxes.shape}")
-        boxes = boxes.reshape(-1, 4)
-    else:
-        boxes = boxes.reshape(-1, 4)
-
-    scores = scores.reshape(-1)
-    classes = classes.reshape(-1)
-
-    h, w = arr.shape[0], arr.shape[1]
-    n = min(max_detections, len(scores), len(classes), boxes.shape[0])
-
-    out_boxes: List[Box] = []
-    out_scores: List[float] = []
-    out_labels: List[str] = []
-
-    for i in range(n):
-        # TF returns normalized boxes: [ymin, xmin, ymax, xmax] in [0, 1]
-        ymin, xmin, ymax, xmax = [float(v) for v in boxes[i]]
-        out_boxes.append(Box(xmin * w, ymin * h, xmax * w, ymax * h))
-        out_scores.append(float(scores[i]))
-
-        cid = int(classes[i])
-        out_labels.append(COCO_ID_TO_NAME.get(str(cid), f"coco_{cid}"))
-
-    return TfDetResult(boxes=out_boxes, scores=out_scores, labels=out_labels)
+    return detector(images, batch_size=batch_size)
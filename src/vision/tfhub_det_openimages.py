@@ -1,104 +1,144 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from typing import Iterable, List, Tuple
 
-import numpy as np
 from PIL import Image
 
-from .boxes import Box
+from ._optional import import_optional
+from .contracts import DetectionResult
+from .model_cache import ModelKey, get_model_registry
+from .tfhub_backend import DEFAULT_INPUT_SHAPES, TfHubDetector
 
-try:
-    import tensorflow as tf
-    import tensorflow_hub as hub
-except Exception:  # pragma: no cover
-    tf = None  # type: ignore
-    hub = None  # type: ignore
+_TF_HINT = "Missing TensorFlow/TF Hub. Install: pip install -r requirements-tf.txt"
 
 
-@dataclass(frozen=True)
-class TfDetResult:
+#: Backwards-compatible name of the shared result type.
+TfDetResult = DetectionResult
+
+
+OPENIMAGES_SSD_MOBILENET_V2_HANDLE = "https://tfhub.dev/google/openimages_v4/ssd/mobilenet_v2/1"
+
+
+def load_tfhub_model(handle: str = OPENIMAGES_SSD_MOBILENET_V2_HANDLE) -> object:
     """
-    Holds the results of a TensorFlow Hub object detection.
+    Loads a TF Hub model through the shared model registry.
 
-    Note: This class is used by both COCO and Open Images models, but is defined
-    in both modules to keep them self-contained.
+    The module is loaded once per handle and reused by every later call (see
+    :mod:`src.vision.model_cache`).
 
-    :param boxes: A list of detected bounding boxes.
-    :type boxes: List[Box]
-    :param scores: A list of confidence scores for each detection.
-    :type scores: List[float]
-    :param labels: A list of class labels for each detection.
-    :type labels: List[str]
+    :param handle: The TF Hub handle (URL or local path). Defaults to the Open
+                   Images SSD MobileNet V2 detector.
+    :type handle: str, optional
+    :return: The loaded TF Hub object.
+    :rtype: object
+    :raises RuntimeError: If TensorFlow/TF Hub are not installed.
     """
-    boxes: List[Box]
-    scores: List[float]
-    labels: List[str]
+    hub = import_optional("tensorflow_hub", _TF_HINT)
+
+    key = ModelKey("tfhub", handle, handle, "default")
+    return get_model_registry().get(key, lambda: hub.load(handle))
 
 
-def run_tfhub_ssd_mobilenet(image: Image.Image, *, max_detections: int = 50) -> TfDetResult:
+def run_tfhub_ssd_mobilenet(image: Image.Image, *, max_detections: int = 50) -> DetectionResult:
     """
     Runs object detection using a TF Hub SSD MobileNet V2 model trained on Open Images.
 
     This model returns class labels directly as strings. This function requires
-    `tensorflow` and `tensorflow_hub` to be installed.
+    `tensorflow` and `tensorflow_hub` to be installed. The image goes through the
+    compiled, fixed-shape detector (see :func:`load_tfhub_ssd_mobilenet_detector`),
+    so new image sizes never trigger a retrace; it is letterboxed to the closest
+    of :data:`~src.vision.tfhub_backend.DEFAULT_INPUT_SHAPES` first.
 
     :param image: The input image to process.
     :type image: PIL.Image.Image
     :param max_detections: The maximum number of detections to return. Defaults to 50.
     :type max_detections: int, optional
     :return: An object containing the detected boxes, scores, and labels.
-    :rtype: TfDetResult
+    :rtype: DetectionResult
     :raises RuntimeError: If TensorFlow/TF Hub are not installed or a callable detector
                           cannot be obtained.
     """
-    if tf is None or hub is None:  # pragma: no cover
-        raise RuntimeError("Missing TensorFlow/TF Hub. Install: pip install -r requirements-tf.txt")
-
-    model = hub.load("https://tfhub.dev/google/openimages_v4/ssd/mobilenet_v2/1")
-    detector = model.signatures.get("default") or model.signatures.get("serving_default")
-    if detector is None or not callable(detector):
-        raise RuntimeError("Could not get a callable detector function.")
-
-    arr = np.array(image.convert("RGB"), dtype=np.uint8)
-    x = tf.image.convert_image_dtype(tf.convert_to_tensor(arr), tf.float32)[tf.newaxis, ...]
-
-    out = detector(x)
-
-    boxes = np.array(out["detection_boxes"].numpy())
-    scores = np.array(out["detection_scores"].numpy())
-    labels = np.array(out["detection_class_entities"].numpy())
-
-    if boxes.ndim == 3:
-        boxes = boxes[0]
-    if scores.ndim == 2:
-        scores = scores[0]
-    if labels.ndim == 2:
-        labels = labels[0]
+    detector = load_tfhub_ssd_mobilenet_detector(max_detections=max_detections)
+    return detector.detect(image)
 
-    if boxes.ndim == 1:
-        if boxes.size % 4 != 0:
-            raise RuntimeError(f"Unexpected boxes shape {boxes.shape}")
-        boxes = boxes.reshape(-1, 4)
-    else:
-        boxes = boxes.reshape(-1, 4)
 
-    scores = scores.reshape(-1)
-    labels = labels.reshape(-1)
-
-    h, w = arr.shape[0], arr.shape[1]
-    n = min(max_detections, len(scores), len(labels), boxes.shape[0])
-
-    out_boxes: List[Box] = []
-    out_scores: List[float] = []
-    out_labels: List[str] = []
-
-    for i in range(n):
-        ymin, xmin, ymax, xmax = [float(v) for v in boxes[i]]
-        out_boxes.append(Box(xmin * w, ymin * h, xmax * w, ymax * h))
-        out_scores.append(float(scores[i]))
+def load_tfhub_ssd_mobilenet_detector(
+    *,
+    input_shapes: Iterable[Tuple[int, int]] = DEFAULT_INPUT_SHAPES,
+    max_detections: int = 50,
+    warmup: bool = True,
+) -> TfHubDetector:
+    """
+    Returns the Open Images SSD MobileNet V2 detector compiled for fixed input shapes.
 
-        lb = labels[i]
-        out_labels.append(lb.decode("ascii", errors="ignore") if isinstance(lb, (bytes, np.bytes_)) else str(lb))
+    The detector is built (traced and, by default, warmed up) once per
+    configuration and cached in the shared model registry; see
+    :class:`~src.vision.tfhub_backend.TfHubDetector`.
 
-    return TfDetResult(boxes=out_boxes, scores=out_scores, labels=out_labels)
+    :param input_shapes: Fixed ``(height, width)`` shapes inputs are letterboxed to.
+    :type input_shapes: Iterable[Tuple[int, int]], optional
+    :param max_detections: The maximum number of detections per image. Defaults to 50.
+    :type max_detections: int, optional
+    :param warmup: If True, make sure every shape has run once. Defaults to True.
+    :type warmup: bool, optional
+    :return: The compiled detector.
+    :rtype: TfHubDetector
+    :raises RuntimeError: If TensorFlow/TF Hub are not installed.
+    """
+    shapes = tuple((int(h), int(w)) for h, w in input_shapes)
+    key = ModelKey(
+        "tfhub-compiled",
+        OPENIMAGES_SSD_MOBILENET_V2_HANDLE,
+        f"{shapes}:{max_detections}",
+        "default",
+    )
+    detector = get_model_registry().get(
+        key,
+        lambda: TfHubDetector(
+            load_tfhub_model(OPENIMAGES_SSD_MOBILENET_V2_HANDLE),
+            signature_names=("default", "serving_default"),
+            float_input=True,
+            class_key="detection_class_entities",
+            class_dtype="string",
+            input_shapes=shapes,
+            max_detections=max_detections,
+            warmup=warmup,
+        ),
+    )
+    if warmup:
+        detector.warmup()  # a cached detector may have been built with warmup=False
+    return detector
+
+
+def run_tfhub_ssd_mobilenet_batch(
+    images: Iterable[Image.Image],
+    *,
+    batch_size: int = 8,
+    max_detections: int = 50,
+    input_shapes: Iterable[Tuple[int, int]] = DEFAULT_INPUT_SHAPES,
+) -> List[DetectionResult]:
+    """
+    Runs the Open Images detector on many images through the compiled, fixed-shape path.
+
+    Images are letterboxed to one of ``input_shapes`` and same-shape images share
+    one graph call (one forward pass per image, see
+    :class:`~src.vision.tfhub_backend.TfHubDetector`), so no call
+    ever sees a new input shape.
+
+    :param images: The input images; may be a lazy iterable.
+    :type images: Iterable[PIL.Image.Image]
+    :param batch_size: The maximum number of images per call. Defaults to 8.
+    :type batch_size: int, optional
+    :param max_detections: The maximum number of detections per image. Defaults to 50.
+    :type max_detections: int, optional
+    :param input_shapes: Fixed ``(height, width)`` shapes inputs are letterboxed to.
+    :type input_shapes: Iterable[Tuple[int, int]], optional
+    :return: One result per input image, in input order.
+    :rtype: List[DetectionResult]
+    :raises RuntimeError: If TensorFlow/TF Hub are not installed.
+    :raises ValueError: If `batch_size` is not positive.
+    """
+    detector = load_tfhub_ssd_mobilenet_detector(
+        input_shapes=input_shapes, max_detections=max_detections
+    )
+    return detector(images, batch_size=batch_size)
@@ -1,91 +1,172 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from PIL import Image
 
-from .boxes import Box
+from ._optional import import_optional
+from .batch import bucket_by_size
+from .contracts import DetectionResult
+from .instrumentation import stage
+from .model_cache import ModelKey, get_model_registry
 
-try:
-    import torch
-    import torchvision
-except Exception:  # pragma: no cover
-    torch = None  # type: ignore
-    torchvision = None  # type: ignore
+_TORCH_HINT = "Missing torch/torchvision. Install with: pip install -r requirements-torch.txt"
+
+
+#: Backwards-compatible name of the shared result type.
+TorchDetResult = DetectionResult
 
 
 @dataclass(frozen=True)
-class TorchDetResult:
+class LoadedTorchDetector:
+    """
+    A loaded TorchVision detector and its preprocessing metadata.
+
+    :param model: The detection model, in eval mode.
+    :type model: torch.nn.Module
+    :param preprocess: The transform generated by ``weights.transforms()``.
+    :type preprocess: object
+    :param categories: Class names indexed by the model's integer labels.
+    :type categories: List[str]
+    :param device: The torch device string the model lives on.
+    :type device: str
     """
-    Holds the results of a TorchVision object detection.
-
-    :param boxes: A list of detected bounding boxes.
-    :type boxes: List[Box]
-    :param scores: A list of confidence scores for each detection.
-    :type scores: List[float]
-    :param labels: A list of class labels for each detection.
-    :type labels: List[str]
+    model: object
+    preprocess: object
+    categories: List[str]
+    device: str
+
+
+def load_torchvision_ssd_mobilenet(device: Optional[str] = None) -> LoadedTorchDetector:
     """
-    boxes: List[Box]
-    scores: List[float]
-    labels: List[str]
+    Loads the pre-trained SSDlite MobileNet V3 detector through the shared model registry.
+
+    The model is built once per device and reused by every later call (see
+    :mod:`src.vision.model_cache`). Call this at startup to warm the cache.
+
+    :param device: Torch device string. If None, uses CUDA when available.
+    :type device: Optional[str]
+    :return: The loaded detector.
+    :rtype: LoadedTorchDetector
+    :raises RuntimeError: If `torch` or `torchvision` are not installed.
+    """
+    torch = import_optional("torch", _TORCH_HINT)
+    detection = import_optional("torchvision.models.detection", _TORCH_HINT)
+
+    dev = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    weights = detection.SSDLite320_MobileNet_V3_Large_Weights.DEFAULT
+
+    def _load() -> LoadedTorchDetector:
+        model = detection.ssdlite320_mobilenet_v3_large(weights=weights)
+        model.to(dev)
+        model.eval()
+        return LoadedTorchDetector(
+            model=model,
+            preprocess=weights.transforms(),
+            # Get class names from the model's metadata
+            categories=list(weights.meta["categories"]),
+            device=dev,
+        )
+
+    key = ModelKey("torchvision", "ssdlite320_mobilenet_v3_large", str(weights), dev)
+    return get_model_registry().get(key, _load)
 
 
 def run_torchvision_ssd_mobilenet(
     image: Image.Image,
     *,
     max_detections: int = 50,
-) -> TorchDetResult:
+    device: Optional[str] = None,
+) -> DetectionResult:
     """
     Runs object detection using a pre-trained SSDlite MobileNet V3 model from TorchVision.
 
-    This function requires `torch` and `torchvision` to be installed.
+    This function requires `torch` and `torchvision` to be installed. The model
+    is loaded once and cached (see :func:`load_torchvision_ssd_mobilenet`).
 
     :param image: The input image to process.
     :type image: PIL.Image.Image
     :param max_detections: The maximum number of detections to return.
                            Defaults to 50.
     :type max_detections: int, optional
+    :param device: Torch device string. If None, uses CUDA when available.
+    :type device: Optional[str]
     :return: An object containing the detected boxes, scores, and labels.
-    :rtype: TorchDetResult
+    :rtype: DetectionResult
     :raises RuntimeError: If `torch` or `torchvision` are not installed.
     """
-    if torch is None or torchvision is None:  # pragma: no cover
-        raise RuntimeError(
-            "Missing torch/torchvision. Install with: pip install -r requirements-torch.txt"
-        )
-
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-    weights = torchvision.models.detection.SSDLite320_MobileNet_V3_Large_Weights.DEFAULT
-    model = torchvision.models.detection.ssdlite320_mobilenet_v3_large(weights=weights).to(device)
-    model.eval()
+    with stage("torchvision.load"):
+        loaded = load_torchvision_ssd_mobilenet(device)
+    torch = import_optional("torch", _TORCH_HINT)
 
-    # Get class names from the model's metadata
-    coco_classes = weights.meta["categories"]
+    with stage("torchvision.preprocess"):
+        x = loaded.preprocess(image).unsqueeze(0).to(loaded.device)
 
-    preprocess = weights.transforms()
-    x = preprocess(image).unsqueeze(0).to(device)
+    with torch.no_grad(), stage("torchvision.forward"):
+        out = loaded.model(x)[0]
 
-    with torch.no_grad():
-        out = model(x)[0]
+    with stage("torchvision.to_numpy"):
+        return _to_result(out, loaded.categories, max_detections)
 
-    boxes_xyxy = out["boxes"].detach().cpu().numpy().astype(float)
-    scores = out["scores"].detach().cpu().numpy().astype(float).tolist()
-    labels_int = out["labels"].detach().cpu().numpy().astype(int)
 
-    n = min(max_detections, boxes_xyxy.shape[0])
-    
-    boxes: List[Box] = [
-        Box(float(b[0]), float(b[1]), float(b[2]), float(b[3])) for b in boxes_xyxy[:n]
-    ]
-    
-    # Convert integer labels to string labels
-    labels_str = [coco_classes[i] for i in labels_int[:n]]
-
-    return TorchDetResult(
-        boxes=boxes,
-        scores=scores[:n],
-        labels=labels_str,
+def run_torchvision_ssd_mobilenet_batch(
+    images: Iterable[Image.Image],
+    *,
+    batch_size: int = 8,
+    max_detections: int = 50,
+    device: Optional[str] = None,
+) -> List[DetectionResult]:
+    """
+    Runs SSDlite MobileNet V3 detection on many images with batched forward passes.
+
+    Images are grouped by size (see :func:`~src.vision.batch.bucket_by_size`) so
+    each forward pass gets same-shaped inputs and the model's internal resize and
+    padding do no extra work. Each bucket is one call to the model, under
+    ``torch.inference_mode()``. Per-image results are identical to
+    :func:`run_torchvision_ssd_mobilenet`, and are returned in input order.
+
+    :param images: The input images. May be a lazy iterable (e.g. a generator
+                   decoding files); at most a few batches are held in memory.
+    :type images: Iterable[PIL.Image.Image]
+    :param batch_size: The maximum number of images per forward pass.
+                       Defaults to 8.
+    :type batch_size: int, optional
+    :param max_detections: The maximum number of detections to return per image.
+                           Defaults to 50.
+    :type max_detections: int, optional
+    :param device: Torch device string. If None, uses CUDA when available.
+    :type device: Optional[str]
+    :return: One result per input image, in input order.
+    :rtype: List[DetectionResult]
+    :raises RuntimeError: If `torch` or `torchvision` are not installed.
+    :raises ValueError: If `batch_size` is not positive.
+    """
+    with stage("torchvision.load"):
+        loaded = load_torchvision_ssd_mobilenet(device)
+    torch = import_optional("torch", _TORCH_HINT)
+
+    results: dict[int, DetectionResult] = {}
+    with torch.inference_mode():
+        for batch in bucket_by_size(images, batch_size, lambda im: im.size):
+            with stage("torchvision.preprocess"):
+                xs = [loaded.preprocess(im).to(loaded.device) for _, im in batch]
+            with stage("torchvision.forward"):
+                outs = loaded.model(xs)
+            with stage("torchvision.to_numpy"):
+                for (index, _), out in zip(batch, outs):
+                    results[index] = _to_result(out, loaded.categories, max_detections)
+
+    return [results[i] for i in range(len(results))]
+
+
+def _to_result(out: dict, categories: List[str], max_detections: int) -> DetectionResult:
+    """Converts one image's raw model output to a :class:`DetectionResult`."""
+    n = min(max_detections, int(out["boxes"].shape[0]))
+    return DetectionResult(
+        boxes=out["boxes"][:n].detach().cpu().numpy(),
+        scores=out["scores"][:n].detach().cpu().numpy(),
+        class_ids=out["labels"][:n].detach().cpu().numpy(),
+        # Integer labels index the model's category names
+        names=categories,
     )
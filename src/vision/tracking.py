@@ -0,0 +1,279 @@
+"""
+SORT-style multi-object tracking on top of the box/IoU primitives.
+
+Design goals
+------------
+- Vectorized: track state is a handful of NumPy arrays (struct-of-arrays, like
+  :class:`~src.vision.boxes.BoxArray`). Each frame costs one constant-velocity
+  prediction over all tracks, one :func:`~src.vision.boxes.iou_matrix` between
+  predicted tracks and detections, and one assignment.
+- Two assignment strategies: ``"greedy"`` matches pairs in descending IoU
+  order (NumPy only); ``"hungarian"`` solves the optimal assignment with
+  ``scipy.optimize.linear_sum_assignment`` (optional dependency).
+- Explicit lifecycle: tracks are born from unmatched detections, confirmed
+  after ``min_hits`` matches, and die after ``max_age`` frames without one.
+
+Notes
+-----
+Unlike SORT, no Kalman filter is used: the velocity of each box coordinate is
+an exponential moving average of its per-frame displacement, which is enough
+for the short gaps that ``max_age`` allows and keeps the update a few array
+operations.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ._optional import import_optional
+from .boxes import BoxArray, BoxesLike, as_xyxy, iou_matrix
+from .instrumentation import timed
+
+Assignment = Literal["greedy", "hungarian"]
+
+_SCIPY_HINT = (
+    "Missing scipy (Hungarian assignment). Install: pip install -r requirements-tracking.txt"
+)
+
+
+@dataclass(frozen=True)
+class TrackedFrame:
+    """
+    Confirmed tracks updated in one frame.
+
+    :ivar track_ids: Array (K,) of stable track ids.
+    :ivar boxes: Boxes of the tracks in this frame (the matched detections).
+    :ivar scores: Array (K,) of detection scores.
+    :ivar labels: Array (K,) of detection labels.
+    :ivar detection_index: Array (K,) of the index of each track's detection
+        in the frame's input.
+    """
+    track_ids: np.ndarray
+    boxes: BoxArray
+    scores: np.ndarray
+    labels: np.ndarray
+    detection_index: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.track_ids.shape[0])
+
+
+def greedy_assignment(iou: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Matches rows to columns in descending IoU order, each at most once.
+
+    :param iou: (N, M) IoU matrix.
+    :param threshold: Minimum IoU of a match.
+    :returns: Matched row and column indices, as two (K,) arrays.
+    """
+    rows, cols = np.nonzero(iou >= threshold)
+    if rows.size == 0:
+        return rows, cols
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    rows, cols = rows[order], cols[order]
+    row_used = np.zeros(iou.shape[0], dtype=bool)
+    col_used = np.zeros(iou.shape[1], dtype=bool)
+    keep = np.zeros(rows.size, dtype=bool)
+    for k, (r, c) in enumerate(zip(rows.tolist(), cols.tolist())):
+        if not row_used[r] and not col_used[c]:
+            row_used[r] = col_used[c] = keep[k] = True
+    return rows[keep], cols[keep]
+
+
+def hungarian_assignment(iou: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Matches rows to columns maximizing the total IoU, dropping pairs below
+    ``threshold``.
+
+    :param iou: (N, M) IoU matrix.
+    :param threshold: Minimum IoU of a match.
+    :returns: Matched row and column indices, as two (K,) arrays.
+    :raises RuntimeError: If `scipy` is not installed.
+    """
+    optimize = import_optional("scipy.optimize", _SCIPY_HINT)
+    rows, cols = optimize.linear_sum_assignment(iou, maximize=True)
+    keep = iou[rows, cols] >= threshold
+    return rows[keep], cols[keep]
+
+
+class Tracker:
+    """
+    Assigns stable ids to detections across the frames of a video.
+
+    Example::
+
+        tracker = Tracker(max_age=30, min_hits=3)
+        for frame in frames:
+            det = run_torchvision_ssd_mobilenet(frame)
+            tracked = tracker.update(det.boxes, det.scores, det.labels)
+            draw_boxes(frame, tracked.boxes, labels=[f"#{i}" for i in tracked.track_ids])
+
+    :param iou_threshold: Minimum IoU between a predicted track and a detection
+        for them to match.
+    :param max_age: Frames a track survives without a match.
+    :param min_hits: Matches needed before a track is reported. During the
+        first ``min_hits`` frames every matched track is reported, so objects
+        present at the start appear immediately.
+    :param assignment: ``"greedy"`` or ``"hungarian"`` (needs scipy).
+    :param class_aware: If True, tracks only match detections with the same label.
+    :param velocity_smoothing: Weight of the previous velocity in the moving
+        average, in [0, 1); 0 uses the last displacement only.
+    :raises ValueError: On an unknown assignment or out-of-range parameter.
+    """
+
+    def __init__(
+        self,
+        *,
+        iou_threshold: float = 0.3,
+        max_age: int = 30,
+        min_hits: int = 3,
+        assignment: Assignment = "greedy",
+        class_aware: bool = False,
+        velocity_smoothing: float = 0.5,
+    ) -> None:
+        if assignment not in ("greedy", "hungarian"):
+            raise ValueError(f"Unknown assignment: {assignment!r}")
+        if not 0.0 < iou_threshold <= 1.0:
+            raise ValueError("iou_threshold must be in (0, 1]")
+        if max_age < 0 or min_hits < 1:
+            raise ValueError("max_age must be >= 0 and min_hits >= 1")
+        if not 0.0 <= velocity_smoothing < 1.0:
+            raise ValueError("velocity_smoothing must be in [0, 1)")
+        if assignment == "hungarian":
+            import_optional("scipy.optimize", _SCIPY_HINT)  # fail at construction, not mid-stream
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.class_aware = class_aware
+        self.velocity_smoothing = velocity_smoothing
+        self._assign = greedy_assignment if assignment == "greedy" else hungarian_assignment
+        self.reset()
+
+    def reset(self) -> None:
+        """Drops every track and restarts ids and the frame count at zero."""
+        self.frame_count = 0
+        self._next_id = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._boxes = np.empty((0, 4))  # last matched box of each track
+        self._velocity = np.empty((0, 4))
+        self._labels = np.empty(0, dtype=object)
+        self._hits = np.empty(0, dtype=np.int64)
+        self._misses = np.empty(0, dtype=np.int64)  # frames since the last match
+
+    def __len__(self) -> int:
+        """Number of live tracks, confirmed or not."""
+        return int(self._ids.shape[0])
+
+    def predicted_boxes(self) -> BoxArray:
+        """Boxes of all live tracks extrapolated to the next frame."""
+        return BoxArray(self._predict())
+
+    def _predict(self) -> np.ndarray:
+        return self._boxes + self._velocity * (self._misses + 1)[:, None]
+
+    @timed("tracking.update")
+    def update(
+        self,
+        boxes: Union[BoxesLike, np.ndarray],
+        scores: Optional[Sequence[float]] = None,
+        labels: Optional[Sequence[Any]] = None,
+    ) -> TrackedFrame:
+        """
+        Advances the tracker by one frame.
+
+        Call it for every frame, with empty inputs when nothing was detected, so
+        unmatched tracks age correctly.
+
+        :param boxes: The frame's detections (``BoxArray``, (N, 4) array or ``Box`` list).
+        :param scores: Optional score per detection (1.0 if omitted).
+        :param labels: Optional label per detection (None if omitted).
+        :returns: The confirmed tracks matched in this frame.
+        :raises ValueError: If ``scores`` or ``labels`` do not match ``boxes``.
+        """
+        det = as_xyxy(boxes)
+        n = det.shape[0]
+        det_scores = np.ones(n) if scores is None else np.asarray(scores, dtype=np.float64)
+        det_labels = np.empty(n, dtype=object)
+        if labels is not None:
+            det_labels[:] = list(labels)
+        if det_scores.shape != (n,) or len(det_labels) != n:
+            raise ValueError("scores and labels must have one entry per box")
+        self.frame_count += 1
+
+        # Constant-velocity prediction, then matching against the predictions.
+        predicted = self._predict()
+        if len(self) and n:
+            iou = iou_matrix(predicted, det)
+            if self.class_aware:
+                iou[self._labels[:, None] != det_labels[None, :]] = 0.0
+            track_idx, det_idx = self._assign(iou, self.iou_threshold)
+        else:
+            track_idx = det_idx = np.empty(0, dtype=np.int64)
+
+        # Matched tracks: velocity update and snap to the detection.
+        step = self._misses[track_idx] + 1
+        displacement = (det[det_idx] - self._boxes[track_idx]) / step[:, None]
+        a = self.velocity_smoothing
+        self._velocity[track_idx] = a * self._velocity[track_idx] + (1.0 - a) * displacement
+        self._boxes[track_idx] = det[det_idx]
+        self._labels[track_idx] = det_labels[det_idx]
+        self._hits[track_idx] += 1
+        self._misses += 1
+        self._misses[track_idx] = 0
+
+        # Report confirmed tracks matched in this frame.
+        confirmed = (self._hits[track_idx] >= self.min_hits) | (self.frame_count <= self.min_hits)
+        out_tracks, out_dets = track_idx[confirmed], det_idx[confirmed]
+        order = np.argsort(out_dets, kind="stable")
+        out_tracks, out_dets = out_tracks[order], out_dets[order]
+        result = TrackedFrame(
+            track_ids=self._ids[out_tracks],
+            boxes=BoxArray(det[out_dets]),
+            scores=det_scores[out_dets],
+            labels=det_labels[out_dets],
+            detection_index=out_dets,
+        )
+
+        # Deaths, then births from unmatched detections.
+        alive = self._misses <= self.max_age
+        unmatched = np.ones(n, dtype=bool)
+        unmatched[det_idx] = False
+        born = np.flatnonzero(unmatched)
+        new_ids = np.arange(self._next_id, self._next_id + born.size, dtype=np.int64)
+        self._next_id += born.size
+        self._ids = np.concatenate([self._ids[alive], new_ids])
+        self._boxes = np.concatenate([self._boxes[alive], det[born]])
+        self._velocity = np.concatenate([self._velocity[alive], np.zeros((born.size, 4))])
+        self._labels = np.concatenate([self._labels[alive], det_labels[born]])
+        self._hits = np.concatenate([self._hits[alive], np.ones(born.size, dtype=np.int64)])
+        self._misses = np.concatenate([self._misses[alive], np.zeros(born.size, dtype=np.int64)])
+
+        if self.min_hits <= 1 or self.frame_count <= self.min_hits:
+            result = _with_births(result, new_ids, born, det, det_scores, det_labels)
+        return result
+
+
+def _with_births(
+    result: TrackedFrame,
+    new_ids: np.ndarray,
+    born: np.ndarray,
+    det: np.ndarray,
+    scores: np.ndarray,
+    labels: np.ndarray,
+) -> TrackedFrame:
+    """Adds tracks born this frame to ``result`` when they are already reportable."""
+    if born.size == 0:
+        return result
+    index = np.concatenate([result.detection_index, born])
+    order = np.argsort(index, kind="stable")
+    index = index[order]
+    return TrackedFrame(
+        track_ids=np.concatenate([result.track_ids, new_ids])[order],
+        boxes=BoxArray(det[index]),
+        scores=scores[index],
+        labels=labels[index],
+        detection_index=index,
+    )
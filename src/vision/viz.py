@@ -1,22 +1,107 @@
+"""
+Drawing detection results on images and video frames.
+
+Design goals
+------------
+- No per-call setup: fonts are loaded once per size and text extents are
+  memoized per (font, string), so annotating a stream does not touch the disk
+  or re-measure the same label on every frame.
+- No needless copies: :func:`draw_boxes` can draw in place, and
+  :func:`draw_boxes_array` writes box outlines straight into an (H, W[, C])
+  uint8 frame with NumPy slicing.
+- Reuse across frames: :class:`BoxRenderer` renders each distinct label string
+  (text on its background) once and pastes the cached patch afterwards, on PIL
+  images and NumPy frames alike.
+
+Notes
+-----
+Box corners are truncated to integers, like ``ImageDraw.rectangle`` does, so the
+NumPy and PIL paths draw the same pixels (see :func:`draw_boxes_array` for boxes
+thinner than the outline).
+"""
+
 from __future__ import annotations
 
-from typing import Optional, Sequence
+import warnings
+from collections import OrderedDict
+from functools import cache, lru_cache
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
 
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from .boxes import BoxesLike, as_xyxy
+from .instrumentation import timed
+
+FONT_PATH = "/usr/share/fonts/truetype/liberation/LiberationSansNarrow-Regular.ttf"
+
+#: A frame :class:`BoxRenderer` can draw on: a PIL image or an (H, W[, C]) uint8 array.
+F = TypeVar("F", Image.Image, np.ndarray)
+
+
+@cache
+def load_font(size: int) -> ImageFont.ImageFont:
+    """
+    Loads the label font at ``size``, once per size.
+
+    Falls back to PIL's default font (with a single warning) if :data:`FONT_PATH`
+    is not installed.
+
+    :param size: Font size in pixels.
+    :returns: The font.
+    """
+    try:
+        return ImageFont.truetype(FONT_PATH, size)
+    except OSError:
+        warnings.warn(
+            f"Font not found at {FONT_PATH}, using default font. Text may be small.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def _text_size(font: ImageFont.ImageFont, text: str) -> Tuple[int, int]:
+    left, top, right, bottom = font.getbbox(text)
+    return int(right - left), int(bottom - top)
+
+
+def _display_string(label: Any, score: Optional[float]) -> str:
+    if label and score is not None:
+        return f"{label}: {score:.0%}"
+    if label:
+        return str(label)
+    if score is not None:
+        return f"{score:.0%}"
+    return ""
 
-from .boxes import Box
 
+def _label_origin(x1: float, y1: float, text_height: int, margin: int) -> Tuple[float, float]:
+    # Above the box if there is room, else just inside it.
+    if y1 > text_height + 2 * margin:
+        return x1, y1 - text_height - 2 * margin
+    return x1, y1
 
+
+def _check_lengths(boxes: BoxesLike, scores: Any, labels: Any) -> None:
+    if scores is not None and len(scores) != len(boxes):
+        raise ValueError("scores must match the number of boxes")
+    if labels is not None and len(labels) != len(boxes):
+        raise ValueError("labels must match the number of boxes")
+
+
+@timed("viz.draw_boxes")
 def draw_boxes(
     image: Image.Image,
-    boxes: Sequence[Box],
+    boxes: BoxesLike,
     scores: Optional[Sequence[float]] = None,
     labels: Optional[Sequence[str]] = None,
     *,
     color: str = "red",
     width: int = 10,
     font_size: int = 75,
+    inplace: bool = False,
 ) -> Image.Image:
     """
     Draws bounding boxes, scores, and labels on a copy of an image.
@@ -25,13 +110,14 @@ def draw_boxes(
     bounding boxes and can optionally display class labels and confidence scores.
     Text is rendered with a contrasting background for improved legibility.
 
-    Note: The function attempts to load a specific Liberation Sans font. If not
-    found, it falls back to a default font, which may affect text appearance.
+    Note: The function uses the Liberation Sans Narrow font (see :func:`load_font`).
+    If it is not installed, it falls back to a default font, which may affect
+    text appearance.
 
     :param image: The base image (PIL.Image.Image) to draw on.
     :type image: PIL.Image.Image
-    :param boxes: A sequence of Box objects to draw.
-    :type boxes: Sequence[Box]
+    :param boxes: A sequence of Box objects, or a ``BoxArray``, to draw.
+    :type boxes: Union[Sequence[Box], BoxArray]
     :param scores: An optional sequence of confidence scores for each box.
     :type scores: Optional[Sequence[float]]
     :param labels: An optional sequence of string labels for each box.
@@ -43,61 +129,33 @@ def draw_boxes(
     :type width: int, optional
     :param font_size: The desired font size for labels and scores. Defaults to 75.
     :type font_size: int, optional
-    :return: A new PIL.Image.Image with the annotations drawn.
+    :param inplace: If True, draw on ``image`` itself instead of a copy.
+    :type inplace: bool, optional
+    :return: A PIL.Image.Image with the annotations drawn (``image`` if ``inplace``).
     :rtype: PIL.Image.Image
     :raises ValueError: If the length of `scores` or `labels` does not match
                         the length of `boxes`.
     """
-    if scores is not None and len(scores) != len(boxes):
-        raise ValueError("scores must match the number of boxes")
-    if labels is not None and len(labels) != len(boxes):
-        raise ValueError("labels must match the number of boxes")
+    _check_lengths(boxes, scores, labels)
 
-    out = image.copy()
+    out = image if inplace else image.copy()
     draw = ImageDraw.Draw(out)
-
-    # Load a reasonably-sized font, falling back to the default if not found.
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/liberation/LiberationSansNarrow-Regular.ttf", font_size)
-    except IOError:
-        print("Font not found, using default font. Text may be small.")
-        font = ImageFont.load_default()
+    font = load_font(font_size)
 
     for idx, b in enumerate(boxes):
         # Draw the bounding box itself
         draw.rectangle([b.x1, b.y1, b.x2, b.y2], outline=color, width=width)
 
-        # Prepare the text to display
-        display_str = ""
-        has_label = labels is not None and labels[idx]
-        has_score = scores is not None
-
-        if has_label and has_score:
-            display_str = f"{labels[idx]}: {scores[idx]:.0%}"
-        elif has_label:
-            display_str = labels[idx]
-        elif has_score:
-            display_str = f"{scores[idx]:.0%}"
+        display_str = _display_string(
+            labels[idx] if labels is not None else None,
+            scores[idx] if scores is not None else None,
+        )
 
         # If there is text, draw it with a background for readability
         if display_str:
-            # Calculate text size
-            try:  # Modern method
-                text_bbox = draw.textbbox((0, 0), display_str, font=font)
-                text_width = text_bbox[2] - text_bbox[0]
-                text_height = text_bbox[3] - text_bbox[1]
-            except AttributeError:  # Older method
-                text_width, text_height = draw.textsize(display_str, font=font)
-
+            text_width, text_height = _text_size(font, display_str)
             margin = int(np.ceil(0.05 * text_height))
-
-            # Position the text box: above the bounding box if there's space, else just inside.
-            if b.y1 > text_height + 2 * margin:
-                text_y_start = b.y1 - text_height - (2 * margin)
-            else:
-                text_y_start = b.y1
-            
-            text_x_start = b.x1
+            text_x_start, text_y_start = _label_origin(b.x1, b.y1, text_height, margin)
 
             # Draw a background rectangle for the text
             rect_coords = [
@@ -110,3 +168,200 @@ def draw_boxes(
             draw.text((text_x_start + margin, text_y_start + margin), display_str, fill="white", font=font)
 
     return out
+
+
+def _frame_mode(frame: np.ndarray) -> str:
+    if frame.dtype != np.uint8:
+        raise ValueError(f"frame must be uint8, got {frame.dtype}")
+    if frame.ndim == 2:
+        return "L"
+    if frame.ndim == 3 and frame.shape[2] in (3, 4):
+        return "RGB" if frame.shape[2] == 3 else "RGBA"
+    raise ValueError(f"frame must have shape (H, W), (H, W, 3) or (H, W, 4), got {frame.shape}")
+
+
+def _int_corners(boxes: BoxesLike) -> np.ndarray:
+    return np.trunc(as_xyxy(boxes)).astype(np.int64)
+
+
+@timed("viz.draw_boxes_array")
+def draw_boxes_array(
+    frame: np.ndarray,
+    boxes: BoxesLike,
+    *,
+    color: str = "red",
+    width: int = 10,
+) -> np.ndarray:
+    """
+    Draws box outlines into a uint8 frame in place, using NumPy slicing.
+
+    For boxes at least ``2 * width`` pixels wide and high this produces the same
+    pixels as ``ImageDraw.rectangle(..., outline=color, width=width)``: the
+    outline lies inside the box, corners inclusive. Thinner boxes are filled,
+    and boxes are clipped to the frame.
+
+    :param frame: (H, W), (H, W, 3) or (H, W, 4) uint8 array, e.g. a video frame.
+    :param boxes: Boxes in pixel coordinates.
+    :param color: Outline color (any PIL color string).
+    :param width: Outline width in pixels.
+    :returns: ``frame``.
+    :raises ValueError: If ``frame`` has an unsupported shape or dtype.
+    """
+    value = np.asarray(ImageColor.getcolor(color, _frame_mode(frame)), dtype=np.uint8)
+    corners = _int_corners(boxes)
+    if corners.size == 0:
+        return frame
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = corners.T
+    # Inner edge of each band, clamped so boxes thinner than the outline fill in.
+    ix1, iy1 = np.minimum(x1 + width, x2 + 1), np.minimum(y1 + width, y2 + 1)
+    ix2, iy2 = np.maximum(x2 + 1 - width, x1), np.maximum(y2 + 1 - width, y1)
+    x1, y1, ix1, ix2 = (np.clip(v, 0, w) for v in (x1, y1, ix1, ix2))
+    iy1, iy2 = np.clip(iy1, 0, h), np.clip(iy2, 0, h)
+    x2, y2 = np.clip(x2 + 1, 0, w), np.clip(y2 + 1, 0, h)
+    visible = (x2 > x1) & (y2 > y1)
+    bands = np.stack([x1, y1, x2, y2, ix1, iy1, ix2, iy2], axis=1)[visible]
+    for bx1, by1, bx2, by2, bix1, biy1, bix2, biy2 in bands.tolist():
+        frame[by1:biy1, bx1:bx2] = value
+        frame[biy2:by2, bx1:bx2] = value
+        frame[biy1:biy2, bx1:bix1] = value
+        frame[biy1:biy2, bix2:bx2] = value
+    return frame
+
+
+class _Patch(NamedTuple):
+    """A rendered label: text on its background, as a PIL image and its pixels."""
+    image: Image.Image
+    pixels: np.ndarray
+    text_height: int
+    margin: int
+
+
+class BoxRenderer:
+    """
+    Annotates a stream of frames with one fixed style.
+
+    Each distinct display string ("person: 87%") is laid out and rendered once
+    onto its background patch; later occurrences paste the cached patch. The
+    cache is bounded (least recently used strings are dropped), so scores that
+    change every frame cannot grow it without limit.
+
+    Example::
+
+        renderer = BoxRenderer(width=2, font_size=14)
+        for res in stream_detections(frames, detect, keep_images=True):
+            renderer.draw(res.image, res.detections.boxes, res.detections.scores,
+                          res.detections.labels)
+
+    :param color: Box and text background color.
+    :param width: Box outline width.
+    :param font_size: Label font size.
+    :param max_cached_labels: Number of rendered label patches kept.
+    :raises ValueError: If ``max_cached_labels`` is not positive.
+    """
+
+    def __init__(
+        self,
+        *,
+        color: str = "red",
+        width: int = 10,
+        font_size: int = 75,
+        max_cached_labels: int = 1024,
+    ) -> None:
+        if max_cached_labels <= 0:
+            raise ValueError("max_cached_labels must be positive")
+        self.color = color
+        self.width = width
+        self.font = load_font(font_size)
+        self._max_cached = max_cached_labels
+        self._patches: OrderedDict[Tuple[str, str], _Patch] = OrderedDict()
+
+    def _patch(self, text: str, mode: str) -> _Patch:
+        key = (text, mode)
+        patch = self._patches.get(key)
+        if patch is not None:
+            self._patches.move_to_end(key)
+            return patch
+        text_width, text_height = _text_size(self.font, text)
+        margin = int(np.ceil(0.05 * text_height))
+        image = Image.new(
+            mode,
+            (text_width + 2 * margin + 1, text_height + 2 * margin + 1),
+            ImageColor.getcolor(self.color, mode),
+        )
+        ImageDraw.Draw(image).text(
+            (margin, margin), text, fill=ImageColor.getcolor("white", mode), font=self.font
+        )
+        patch = _Patch(image, np.asarray(image), text_height, margin)
+        self._patches[key] = patch
+        if len(self._patches) > self._max_cached:
+            self._patches.popitem(last=False)
+        return patch
+
+    @timed("viz.render")
+    def draw(
+        self,
+        frame: F,
+        boxes: BoxesLike,
+        scores: Optional[Sequence[float]] = None,
+        labels: Optional[Sequence[str]] = None,
+    ) -> F:
+        """
+        Draws boxes and their labels on ``frame`` in place.
+
+        :param frame: A PIL image, or an (H, W[, C]) uint8 array drawn with
+            :func:`draw_boxes_array`.
+        :param boxes: Boxes in pixel coordinates.
+        :param scores: Optional score per box.
+        :param labels: Optional label per box.
+        :returns: ``frame``.
+        :raises ValueError: If ``scores`` or ``labels`` do not match ``boxes``, or
+            an array frame has an unsupported shape or dtype.
+        """
+        _check_lengths(boxes, scores, labels)
+        corners = _int_corners(boxes)
+        is_array = isinstance(frame, np.ndarray)
+        if is_array:
+            mode = _frame_mode(frame)
+            draw_boxes_array(frame, corners, color=self.color, width=self.width)
+        else:
+            mode = frame.mode
+            draw = ImageDraw.Draw(frame)
+            for x1, y1, x2, y2 in corners.tolist():
+                draw.rectangle([x1, y1, x2, y2], outline=self.color, width=self.width)
+
+        if scores is None and labels is None:
+            return frame
+        for idx, (x1, y1, _, _) in enumerate(corners.tolist()):
+            text = _display_string(
+                labels[idx] if labels is not None else None,
+                float(scores[idx]) if scores is not None else None,
+            )
+            if not text:
+                continue
+            patch = self._patch(text, mode)
+            x, y = _label_origin(x1, y1, patch.text_height, patch.margin)
+            if is_array:
+                _paste(frame, patch.pixels, x, y)
+            else:
+                frame.paste(patch.image, (x, y))
+        return frame
+
+    def draw_batch(self, frames: Iterable[F], results: Iterable[Any]) -> List[F]:
+        """
+        Draws one result per frame, sharing the label cache across the batch.
+
+        :param frames: PIL images or uint8 arrays.
+        :param results: Per-frame results exposing ``boxes``, ``scores`` and
+            ``labels`` (any ``run_*`` result or :class:`~src.vision.batch.ImageResult`).
+        :returns: The frames, drawn in place.
+        """
+        return [self.draw(f, r.boxes, r.scores, r.labels) for f, r in zip(frames, results)]
+
+
+def _paste(frame: np.ndarray, patch: np.ndarray, x: int, y: int) -> None:
+    h, w = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + patch.shape[1], w), min(y + patch.shape[0], h)
+    if x1 > x0 and y1 > y0:
+        frame[y0:y1, x0:x1] = patch[y0 - y : y1 - y, x0 - x : x1 - x]
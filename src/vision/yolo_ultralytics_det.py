@@ -1,30 +1,46 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Union
 
+import numpy as np
 from PIL import Image
 
-from .boxes import Box
+from ._optional import import_optional
+from .contracts import ClassNames, DetectionResult, label_table
+from .instrumentation import stage
+from .model_cache import ModelKey, get_model_registry
 
-try:
+if TYPE_CHECKING:  # pragma: no cover
     from ultralytics import YOLO
-except Exception:  # pragma: no cover
-    YOLO = None  # type: ignore
 
+_YOLO_HINT = "Missing ultralytics. Install: pip install -r requirements-yolo.txt"
 
-@dataclass(frozen=True)
-class YoloDetResult:
+
+#: Backwards-compatible name of the shared result type.
+YoloDetResult = DetectionResult
+
+#: A predictor input: a PIL image or an (H, W, 3) RGB uint8 frame.
+Frame = Union[Image.Image, np.ndarray]
+
+
+def load_yolo_model(model_name: str = "yolov8n.pt") -> YOLO:
     """
-    Holds the results of a YOLO detection.
+    Loads an ultralytics YOLO model through the shared model registry.
 
-    :param boxes: A list of detected bounding boxes.
-    :param scores: A list of confidence scores for each detection.
-    :param labels: A list of class labels for each detection.
+    The model is built once per ``model_name`` and reused by every later call
+    (see :mod:`src.vision.model_cache`). Device placement is left to ultralytics.
+
+    :param model_name: The name or path of the YOLO model file. Defaults to "yolov8n.pt".
+    :type model_name: str, optional
+    :return: The loaded model.
+    :rtype: ultralytics.YOLO
+    :raises RuntimeError: If the 'ultralytics' library is not installed.
     """
-    boxes: List[Box]
-    scores: List[float]
-    labels: List[str]
+    ultralytics = import_optional("ultralytics", _YOLO_HINT)
+
+    key = ModelKey("ultralytics", model_name, model_name, "auto")
+    return get_model_registry().get(key, lambda: ultralytics.YOLO(model_name))
 
 
 def run_yolo_ultralytics(
@@ -32,11 +48,12 @@ def run_yolo_ultralytics(
     *,
     model_name: str = "yolov8n.pt",
     max_detections: int = 50,
-) -> YoloDetResult:
+) -> DetectionResult:
     """
     Runs YOLO object detection on an image using the ultralytics library.
 
-    This function requires the 'ultralytics' package to be installed.
+    This function requires the 'ultralytics' package to be installed. The model
+    is loaded once and cached (see :func:`load_yolo_model`).
 
     :param image: The input image to process.
     :type image: PIL.Image.Image
@@ -47,37 +64,123 @@ def run_yolo_ultralytics(
                            Defaults to 50.
     :type max_detections: int, optional
     :return: An object containing the detected boxes, scores, and labels.
-    :rtype: YoloDetResult
+    :rtype: DetectionResult
     :raises RuntimeError: If the 'ultralytics' library is not installed.
     """
-    if YOLO is None:  # pragma: no cover
-        raise RuntimeError("Missing ultralytics. Install: pip install -r requirements-yolo.txt")
+    with stage("ultralytics.load"):
+        model = load_yolo_model(model_name)
+    # ultralytics accepts PIL images directly; predict() includes its preprocessing and NMS
+    with stage("ultralytics.forward"):
+        results = model.predict(image, verbose=False, max_det=max_detections)
 
-    model = YOLO(model_name)
-    # ultralytics accepts PIL images directly
-    results = model.predict(image, verbose=False, max_det=max_detections)
+    with stage("ultralytics.to_numpy"):
+        return _to_result(results[0], model.names, max_detections)
 
-    r = results[0]
-    boxes: List[Box] = []
-    scores: List[float] = []
-    labels: List[str] = []
 
+def _to_result(r: Any, names: ClassNames, max_detections: int) -> DetectionResult:
+    """Converts one ultralytics ``Results`` object to a :class:`DetectionResult`."""
     if r.boxes is None:
-        return YoloDetResult(boxes=[], scores=[], labels=[])
-
-    xyxy = r.boxes.xyxy.cpu().numpy().astype(float)
-    conf = r.boxes.conf.cpu().numpy().astype(float)
-    cls = r.boxes.cls.cpu().numpy().astype(int)
-
-    # Get the class names from the model
-    names = model.names
-
-    n = min(max_detections, xyxy.shape[0])
-    for i in range(n):
-        b = xyxy[i]
-        class_id = int(cls[i])
-        boxes.append(Box(float(b[0]), float(b[1]), float(b[2]), float(b[3])))
-        scores.append(float(conf[i]))
-        labels.append(names[class_id])
+        return DetectionResult(
+            boxes=np.empty((0, 4)),
+            scores=np.empty(0),
+            class_ids=np.empty(0, dtype=np.int64),
+            names=names,
+        )
+
+    n = min(max_detections, int(r.boxes.xyxy.shape[0]))
+    return DetectionResult(
+        boxes=r.boxes.xyxy[:n].cpu().numpy(),
+        scores=r.boxes.conf[:n].cpu().numpy(),
+        class_ids=r.boxes.cls[:n].cpu().numpy(),
+        names=names,
+    )
+
+
+class YoloPredictor:
+    """
+    Persistent YOLO predictor for batches and frame streams.
+
+    The model comes from the shared registry (see :func:`load_yolo_model`) and
+    its class names are turned into a lookup table once, so labels resolve with
+    one vectorized index per frame. Frames are consumed lazily in chunks of
+    ``batch_size``; each chunk is one batched ultralytics call in streaming mode
+    (``stream=True``), so at most one chunk of frames and results is alive.
+
+    Example::
+
+        predictor = YoloPredictor(batch_size=16, device="cpu")
+        for result in predictor.stream(video_frames):
+            ...
+        stream_detections(paths, predictor)  # usable as a pipeline detector
+
+    :param model_name: The name or path of the YOLO model file.
+    :param max_detections: The maximum number of detections per frame.
+    :param batch_size: Frames per ultralytics call.
+    :param device: Device passed to ultralytics (e.g. "cpu", "cuda:0"); None
+        lets ultralytics choose.
+    :param predict_args: Extra keyword arguments for ``YOLO.predict`` (e.g.
+        ``conf=0.25``, ``imgsz=640``, ``half=True``).
+    :raises RuntimeError: If the 'ultralytics' library is not installed.
+    :raises ValueError: If ``batch_size`` or ``max_detections`` is not positive.
+    """
 
-    return YoloDetResult(boxes=boxes, scores=scores, labels=labels)
+    def __init__(
+        self,
+        model_name: str = "yolov8n.pt",
+        *,
+        max_detections: int = 50,
+        batch_size: int = 8,
+        device: Optional[str] = None,
+        **predict_args: Any,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if max_detections <= 0:
+            raise ValueError("max_detections must be positive")
+        with stage("ultralytics.load"):
+            self.model = load_yolo_model(model_name)
+        self.names = label_table(self.model.names)
+        self.batch_size = batch_size
+        self.max_detections = max_detections
+        self._predict_args = dict(predict_args, verbose=False, max_det=max_detections)
+        if device is not None:
+            self._predict_args["device"] = device
+
+    def stream(self, frames: Iterable[Frame]) -> Iterator[DetectionResult]:
+        """
+        Detects objects in a stream of frames, yielding results as they are ready.
+
+        NumPy frames are taken as RGB, like everywhere else in this package, and
+        reordered to the BGR layout ultralytics expects for arrays.
+
+        :param frames: PIL images or (H, W, 3) RGB uint8 arrays; may be an
+            unbounded iterator (e.g. video frames).
+        :returns: An iterator of results, one per frame, in input order.
+        """
+        frames = iter(frames)
+        while True:
+            chunk = [
+                np.ascontiguousarray(f[..., ::-1]) if isinstance(f, np.ndarray) else f
+                for f in islice(frames, self.batch_size)
+            ]
+            if not chunk:
+                return
+            results = iter(self.model.predict(chunk, stream=True, **self._predict_args))
+            while True:
+                # In streaming mode inference runs lazily, inside next().
+                with stage("ultralytics.forward"):
+                    r = next(results, None)
+                if r is None:
+                    break
+                with stage("ultralytics.to_numpy"):
+                    result = _to_result(r, self.names, self.max_detections)
+                yield result
+
+    def __call__(self, frames: Iterable[Frame]) -> List[DetectionResult]:
+        """
+        Detects objects in a batch of frames (the pipeline detector interface).
+
+        :param frames: PIL images or (H, W, 3) RGB uint8 arrays.
+        :returns: One result per frame, in input order.
+        """
+        return list(self.stream(frames))
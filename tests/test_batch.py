@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.vision.batch import PostprocessConfig, bucket_by_size, postprocess_batch
+from src.vision.contracts import apply_threshold, nms
+
+
+def _ragged_images(n_images: int, seed: int):
+    rng = np.random.default_rng(seed)
+    boxes, scores, labels = [], [], []
+    for _ in range(n_images):
+        n = int(rng.integers(0, 40))
+        xy = rng.uniform(0, 200, size=(n, 2))
+        boxes.append(np.hstack([xy, xy + rng.uniform(5, 50, size=(n, 2))]))
+        scores.append(rng.uniform(size=n))
+        labels.append(rng.choice(["car", "person"], size=n))
+    return boxes, scores, labels
+
+
+def test_postprocess_batch_matches_per_image_contract() -> None:
+    boxes, scores, labels = _ragged_images(25, seed=0)
+    config = PostprocessConfig(threshold=0.3, iou_threshold=0.4)
+    results = postprocess_batch(boxes, scores, labels, config, chunk_size=4)
+    assert len(results) == 25
+    for res, b, s, lb in zip(results, boxes, scores, labels):
+        kb, ks, kl = apply_threshold(b, s, lb, 0.3)
+        keep = nms(kb, ks, 0.4)
+        assert np.array_equal(res.boxes.xyxy, kb[keep])
+        assert np.array_equal(res.scores, ks[keep])
+        assert res.labels.tolist() == kl[keep].tolist()
+
+
+def test_postprocess_batch_is_deterministic_across_workers() -> None:
+    boxes, scores, labels = _ragged_images(30, seed=1)
+    config = PostprocessConfig(threshold=0.2, class_aware=True, max_output=10)
+    serial = postprocess_batch(boxes, scores, labels, config)
+    parallel = postprocess_batch(boxes, scores, labels, config, workers=2, chunk_size=3)
+    for a, b in zip(serial, parallel):
+        assert np.array_equal(a.boxes.xyxy, b.boxes.xyxy)
+        assert np.array_equal(a.scores, b.scores)
+        assert np.array_equal(a.labels, b.labels)
+
+
+def test_bucket_by_size_groups_same_shapes_and_covers_every_item() -> None:
+    sizes = [(2, 2), (3, 3), (2, 2), (2, 2), (3, 3), (4, 4), (2, 2)]
+    batches = list(bucket_by_size(sizes, 2, lambda s: s))
+    assert all(len({item for _, item in batch}) == 1 for batch in batches)
+    assert all(len(batch) <= 2 for batch in batches)
+    assert sorted(i for batch in batches for i, _ in batch) == list(range(len(sizes)))
+    assert [i for i, _ in batches[0]] == [0, 2]
+
+
+def test_bucket_by_size_bounds_pending_items() -> None:
+    sizes = [(k, k) for k in range(10)]
+    batches = list(bucket_by_size(sizes, 4, lambda s: s, max_pending=3))
+    assert len(batches) == 10
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import numpy as np
 from PIL import Image
 
-from src.vision.boxes import Box, iou
-from src.vision.contracts import apply_threshold, nms
+from src.vision.boxes import Box, BoxArray, iou, iou_matrix
+from src.vision.contracts import (
+    DetectionResult,
+    apply_threshold,
+    batched_nms,
+    nms,
+    soft_nms,
+    threshold_indices,
+    weighted_box_fusion,
+)
 from src.vision.viz import draw_boxes
 
 
@@ -46,3 +55,182 @@ def test_draw_boxes_keeps_size() -> None:
     img = Image.new("RGB", (64, 64), color="white")
     out = draw_boxes(img, [Box(5, 5, 20, 20)], scores=[0.9])
     assert out.size == img.size
+
+
+def test_box_array_round_trip_and_area() -> None:
+    boxes = [Box(0, 0, 10, 10), Box(5, 5, 6, 8), Box(3, 3, 1, 1)]
+    arr = BoxArray.from_boxes(boxes)
+    assert arr.to_boxes() == boxes
+    assert arr.area().tolist() == [b.area() for b in boxes]
+
+
+def test_box_array_indexing_and_concatenate() -> None:
+    arr = BoxArray(np.array([[0, 0, 1, 1], [1, 1, 2, 2], [2, 2, 3, 3]]))
+    assert arr[1] == Box(1.0, 1.0, 2.0, 2.0)
+    assert len(arr[1:]) == 2
+    assert arr[np.array([True, False, True])].to_boxes() == [arr[0], arr[2]]
+    assert len(BoxArray.concatenate([arr, arr[:1]])) == 4
+
+
+def test_iou_broadcasts_over_box_array() -> None:
+    boxes = [Box(0, 0, 10, 10), Box(5, 5, 15, 15), Box(20, 20, 30, 30), Box(1, 1, 1, 1)]
+    ref = Box(2, 2, 12, 12)
+    scores = iou(ref, BoxArray.from_boxes(boxes))
+    assert scores.tolist() == [iou(ref, b) for b in boxes]
+
+
+def test_contract_stages_accept_box_array() -> None:
+    arr = BoxArray.from_boxes([Box(0, 0, 10, 10), Box(1, 1, 9, 9), Box(20, 20, 30, 30)])
+    b, s, lb = apply_threshold(arr, [0.9, 0.6, 0.1], ["a", "a", "b"], threshold=0.5)
+    assert isinstance(b, BoxArray)
+    assert lb.tolist() == ["a", "a"]
+    assert nms(b, s, iou_threshold=0.5) == [0]
+    img = Image.new("RGB", (64, 64), color="white")
+    assert draw_boxes(img, arr).size == img.size
+
+
+def test_iou_matrix_matches_pairwise_iou() -> None:
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 50, size=(40, 2))
+    wh = rng.choice([0.0, 5.0, 20.0], size=(40, 2))
+    xyxy = np.hstack([xy, xy + wh])
+    xyxy[0] = [10, 10, 5, 5]  # inverted box
+    boxes = BoxArray(xyxy).to_boxes()
+    expected = np.array([[iou(p, q) for q in boxes[:25]] for p in boxes])
+    assert np.array_equal(iou_matrix(boxes, boxes[:25]), expected)
+    assert np.array_equal(iou_matrix(xyxy, xyxy[:25], chunk_size=7), expected)
+
+
+def test_iou_matrix_empty_shapes() -> None:
+    assert iou_matrix(np.empty((0, 4)), BoxArray(np.ones((3, 4)))).shape == (0, 3)
+
+
+def _reference_nms(boxes, scores, iou_threshold):
+    order = sorted(range(len(boxes)), key=lambda i: scores[i], reverse=True)
+    keep = []
+    while order:
+        i = order.pop(0)
+        keep.append(i)
+        order = [j for j in order if iou(boxes[i], boxes[j]) <= iou_threshold]
+    return keep
+
+
+def _random_boxes(n: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 100, size=(n, 2))
+    wh = rng.uniform(0, 30, size=(n, 2))
+    return BoxArray(np.hstack([xy, xy + wh])).to_boxes()
+
+
+def test_nms_matches_reference_order_with_ties() -> None:
+    boxes = _random_boxes(200, seed=1)
+    scores = np.round(np.random.default_rng(2).uniform(size=200), 1).tolist()
+    for thr in (0.0, 0.3, 0.7):
+        assert nms(boxes, scores, iou_threshold=thr) == _reference_nms(boxes, scores, thr)
+
+
+def test_nms_max_output_stops_early() -> None:
+    boxes = _random_boxes(100, seed=3)
+    scores = np.random.default_rng(4).uniform(size=100).tolist()
+    full = nms(boxes, scores, iou_threshold=0.3)
+    assert nms(boxes, scores, iou_threshold=0.3, max_output=5) == full[:5]
+
+
+def test_batched_nms_suppresses_within_class_only() -> None:
+    boxes = _random_boxes(150, seed=5)
+    scores = np.random.default_rng(6).uniform(size=150).tolist()
+    labels = np.random.default_rng(7).choice(["car", "person", "dog"], size=150).tolist()
+    expected = []
+    for name in ("car", "person", "dog"):
+        idx = [i for i, lb in enumerate(labels) if lb == name]
+        keep = nms([boxes[i] for i in idx], [scores[i] for i in idx], iou_threshold=0.4)
+        expected.extend(idx[k] for k in keep)
+    expected.sort(key=lambda i: scores[i], reverse=True)
+    assert batched_nms(boxes, scores, labels, iou_threshold=0.4) == expected
+
+
+def test_soft_nms_gaussian_matches_reference_decay() -> None:
+    boxes = _random_boxes(60, seed=8)
+    scores = np.random.default_rng(9).uniform(size=60)
+    labels = ["a"] * 60
+    b, s, _ = soft_nms(boxes, scores, labels, method="gaussian", sigma=0.5, score_threshold=0.05)
+
+    remaining = {i: float(scores[i]) for i in range(60)}
+    expected_scores = []
+    while remaining:
+        top = max(remaining, key=remaining.get)
+        if remaining[top] < 0.05:
+            break
+        expected_scores.append(remaining.pop(top))
+        for j in remaining:
+            remaining[j] *= float(np.exp(-iou(boxes[top], boxes[j]) ** 2 / 0.5))
+    assert np.allclose(s, expected_scores)
+    assert len(b) == len(expected_scores)
+
+
+def test_soft_nms_linear_only_decays_overlaps_of_same_class() -> None:
+    boxes = [Box(0, 0, 10, 10), Box(0, 0, 10, 9), Box(0, 0, 10, 10), Box(50, 50, 60, 60)]
+    b, s, lb = soft_nms(boxes, [0.9, 0.8, 0.7, 0.6], ["a", "a", "b", "a"], method="linear")
+    assert b == [boxes[0], boxes[2], boxes[3], boxes[1]]
+    assert s[:3] == [0.9, 0.7, 0.6]
+    assert np.isclose(s[3], 0.8 * 0.1)
+    assert lb == ["a", "b", "a", "a"]
+
+
+def test_weighted_box_fusion_merges_models() -> None:
+    model_a = BoxArray(np.array([[0, 0, 10, 10], [50, 50, 60, 60]]))
+    model_b = BoxArray(np.array([[1, 1, 11, 11]]))
+    boxes = BoxArray.concatenate([model_a, model_b])
+    b, s, lb = weighted_box_fusion(
+        boxes, [0.9, 0.5, 0.3], ["car", "car", "car"], iou_threshold=0.5, num_models=2
+    )
+    assert isinstance(b, BoxArray)
+    assert np.allclose(b.xyxy[0], [0.25, 0.25, 10.25, 10.25])
+    assert np.allclose(s, [0.6, 0.25])
+    assert lb.tolist() == ["car", "car"]
+
+
+def test_threshold_per_class_and_top_k() -> None:
+    scores = [0.9, 0.4, 0.6, 0.3, 0.8, 0.7]
+    labels = ["car", "car", "dog", "dog", "cat", "car"]
+    idx = threshold_indices(scores, labels, {"car": 0.5, "dog": 0.25}, default_threshold=0.85)
+    assert idx.tolist() == [0, 2, 3, 5]
+    idx = threshold_indices(scores, labels, 0.5, top_k=2)
+    assert idx.tolist() == [0, 4]
+    assert threshold_indices(scores, labels, 0.0) is None
+    assert threshold_indices(scores, labels, 0.0, top_k=0).tolist() == []
+
+
+def test_apply_threshold_arrays_are_not_copied_when_all_kept() -> None:
+    arr = BoxArray(np.zeros((3, 4)))
+    scores = np.array([0.9, 0.8, 0.7])
+    b, s, _ = apply_threshold(arr, scores, ["a", "b", "c"], threshold=0.5)
+    assert b is arr
+    assert s is scores
+    b, s, lb = apply_threshold(arr, scores, ["a", "b", "c"], threshold=0.5, top_k=1)
+    assert len(b) == 1 and s.tolist() == [0.9] and lb.tolist() == ["a"]
+
+
+def test_detection_result_builds_labels_lazily_with_fallback() -> None:
+    res = DetectionResult(
+        boxes=np.array([[0, 0, 10, 10], [5, 5, 20, 20], [1, 1, 2, 2]], dtype=np.float32),
+        scores=np.array([0.9, 0.8, 0.1], dtype=np.float32),
+        class_ids=np.array([1.0, 3.0, 2.0]),
+        names={"1": "person", "3": "car"},
+        fallback="coco_{}",
+    )
+    assert "labels" not in res.__dict__
+    assert res.labels.tolist() == ["person", "car", "coco_2"]
+    assert res.boxes[1] == Box(5.0, 5.0, 20.0, 20.0)
+    boxes, scores, labels = res.select(res.scores > 0.5).to_lists()
+    assert boxes == [Box(0.0, 0.0, 10.0, 10.0), Box(5.0, 5.0, 20.0, 20.0)]
+    assert labels == ["person", "car"]
+    b, s, lb = apply_threshold(res.boxes, res.scores, res.labels, 0.5)
+    assert isinstance(b, BoxArray) and lb.tolist() == ["person", "car"]
+
+
+def test_detection_result_from_labels_and_normalized_yxyx() -> None:
+    boxes = BoxArray.from_normalized_yxyx(np.array([[0.1, 0.2, 0.5, 0.6]]), 100, 50)
+    assert boxes.xyxy.tolist() == [[20.0, 5.0, 60.0, 25.0]]
+    res = DetectionResult.from_labels(boxes, [0.7], ["Dog"])
+    assert res.labels.tolist() == ["Dog"] and len(res) == 1
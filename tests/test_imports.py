@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY = ["torch", "torchvision", "tensorflow", "tensorflow_hub", "ultralytics"]
+
+
+def _run(code: str, cwd: Path) -> str:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+    return out.stdout
+
+
+def test_backend_imports_do_not_load_frameworks(tmp_path: Path) -> None:
+    code = (
+        "import json, sys\n"
+        "import src.vision.contracts, src.vision.segmentation, src.vision.tfhub_det\n"
+        "import src.vision.tfhub_det_openimages, src.vision.tfhub_backend\n"
+        "import src.vision.torchvision_det, src.vision.yolo_ultralytics_det\n"
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))\n"
+    )
+    assert json.loads(_run(code, cwd=tmp_path)) == []
+
+
+def test_coco_labels_resolve_outside_repo_root(tmp_path: Path) -> None:
+    code = (
+        "import src.vision.tfhub_det as t\n"
+        "print(t.coco_id_to_name()['1'], t.COCO_ID_TO_NAME['3'])\n"
+    )
+    assert _run(code, cwd=tmp_path).split() == ["person", "car"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from src.vision import instrumentation as inst
+from src.vision.boxes import Box
+from src.vision.contracts import nms
+from src.vision.model_cache import ModelKey, ModelRegistry
+
+
+def test_disabled_instrumentation_records_nothing() -> None:
+    assert not inst.is_enabled()
+    assert inst.stage("a") is inst.stage("b")  # shared no-op context
+    hist = inst.HistogramSink()
+    with inst.instrument(hist):
+        pass
+    nms([Box(0, 0, 1, 1)], [0.5])
+    inst.count("x")
+    assert hist.summary() == {} and hist.counters() == {}
+    with pytest.raises(ValueError):
+        inst.enable()
+
+
+def test_histogram_sink_collects_stages_and_counters() -> None:
+    hist = inst.HistogramSink(max_samples=3)
+    registry = ModelRegistry()
+    key = ModelKey("fake", "m", "w", "cpu")
+    with inst.instrument(hist):
+        for _ in range(5):
+            nms([Box(0, 0, 10, 10), Box(1, 1, 9, 9)], [0.9, 0.8], iou_threshold=0.5)
+            registry.get(key, lambda: object())
+        with inst.stage("custom"):
+            pass
+    assert not inst.is_enabled()
+
+    summary = hist.summary()
+    assert summary["contracts.nms"].count == 5
+    assert summary["model_cache.load.fake"].count == 1
+    s = summary["contracts.nms"]
+    assert 0 < s.p50 <= s.p95 <= s.p99 <= s.max and s.mean == pytest.approx(s.total / 5)
+    assert hist.counters() == {"model_cache.hit": 4, "model_cache.miss": 1}
+
+
+def test_jsonl_and_prometheus_sinks(tmp_path: Path) -> None:
+    stream = io.StringIO()
+    prom = inst.PrometheusSink(tmp_path / "metrics" / "vision.prom", buckets=[0.5, 1.0])
+    with inst.instrument(inst.JsonLinesSink(stream), prom):
+        for seconds in (0.1, 0.7, 2.0):
+            for sink in inst._sinks:
+                sink.observe('stage "q"', seconds)
+        inst.count("frames", 3)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e.get("seconds") for e in events[:3]] == [0.1, 0.7, 2.0]
+    assert events[3]["counter"] == "frames" and events[3]["value"] == 3
+
+    text = (tmp_path / "metrics" / "vision.prom").read_text()
+    assert (tmp_path / "metrics" / "vision.prom").stat().st_mode & 0o777 == 0o644
+    assert 'vision_stage_seconds_bucket{stage="stage \\"q\\"",le="0.5"} 1' in text
+    assert 'vision_stage_seconds_bucket{stage="stage \\"q\\"",le="1.0"} 2' in text
+    assert 'vision_stage_seconds_bucket{stage="stage \\"q\\"",le="+Inf"} 3' in text
+    assert 'vision_stage_seconds_count{stage="stage \\"q\\""} 3' in text
+    assert 'vision_events_total{name="frames"} 3.0' in text
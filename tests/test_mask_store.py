@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.vision.mask_store import ClassMapStore, rle_decode, rle_encode
+
+
+def _blobs(h: int, w: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    m = np.zeros((h, w), dtype=np.uint8)
+    for _ in range(5):
+        y, x = rng.integers(0, h), rng.integers(0, w)
+        m[y : y + 20, x : x + 30] = rng.integers(1, 21)
+    return m
+
+
+def test_rle_roundtrip() -> None:
+    values = np.array([3, 3, 3, 0, 0, 7, 3, 3], dtype=np.int16)
+    assert np.array_equal(rle_decode(rle_encode(values), values.dtype), values)
+    assert rle_decode(rle_encode(values[:0]), values.dtype).size == 0
+
+
+@pytest.mark.parametrize("codec", ["rle", "zlib", "raw"])
+def test_store_roundtrip_windows_and_reopen(tmp_path, codec) -> None:
+    path = tmp_path / "masks.cms"
+    maps = {f"m{i}": _blobs(97, 61, seed=i) for i in range(4)}
+    with ClassMapStore(path, mode="a", codec=codec, chunk_rows=16) as store:
+        store.append("m0", maps["m0"])
+        store.append_many((k, v) for k, v in maps.items() if k != "m0")
+        assert np.array_equal(store.read("m2"), maps["m2"])
+
+    with ClassMapStore(path) as store:
+        assert store.keys() == list(maps)
+        for key, m in maps.items():
+            assert np.array_equal(store.read(key), m)
+            assert np.array_equal(store.read_window(key, 10, 50, 5, 40), m[10:50, 5:40])
+            assert np.array_equal(store.read_window(key, 90, 200, 0, 61), m[90:, :])
+
+
+def test_store_reopens_after_a_torn_index_line(tmp_path) -> None:
+    path = tmp_path / "masks.cms"
+    with ClassMapStore(path, mode="a") as store:
+        store.append("a", _blobs(10, 10, seed=0))
+    index = tmp_path / "masks.cms.index"
+    with open(index, "a") as f:
+        f.write('{"key": "b", "sha')
+    with ClassMapStore(path) as store:
+        assert store.keys() == ["a"]
+    with ClassMapStore(path, mode="a") as store:
+        store.append("b", _blobs(10, 10, seed=1))
+    with ClassMapStore(path) as store:
+        assert store.keys() == ["a", "b"]
+        assert np.array_equal(store.read("b"), _blobs(10, 10, seed=1))
+
+
+def test_store_rejects_duplicates_and_read_only_appends(tmp_path) -> None:
+    path = tmp_path / "masks.cms"
+    with ClassMapStore(path, mode="a") as store:
+        store.append("a", _blobs(10, 10, seed=0))
+        with pytest.raises(ValueError):
+            store.append_many([("b", _blobs(10, 10, seed=1)), ("a", _blobs(10, 10, seed=2))])
+        assert store.keys() == ["a"]
+    with ClassMapStore(path) as store:
+        with pytest.raises(ValueError):
+            store.append("c", _blobs(10, 10, seed=3))
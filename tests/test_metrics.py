@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import pickle
+
+import numpy as np
+import pytest
+
+from src.vision.metrics import ConfusionMatrix, DetectionEvaluator, evaluate_detections
+
+
+def _pairs(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        target = rng.integers(0, 4, size=(12, 9)).astype(np.uint8)
+        target[rng.uniform(size=target.shape) < 0.1] = 255
+        prediction = np.where(rng.uniform(size=target.shape) < 0.7, target % 4, 1).astype(np.uint8)
+        yield target, prediction
+
+
+def test_confusion_matrix_matches_pixel_loop() -> None:
+    cm = ConfusionMatrix(4, ignore_index=255)
+    expected = np.zeros((4, 4), dtype=np.int64)
+    for target, prediction in _pairs(5, seed=0):
+        cm.update(target, prediction)
+        for t, p in zip(target.ravel(), prediction.ravel()):
+            if t != 255:
+                expected[t, p] += 1
+    assert np.array_equal(cm.matrix, expected)
+
+    report = cm.report()
+    tp = np.diag(expected)
+    iou = tp / (expected.sum(0) + expected.sum(1) - tp)
+    assert np.allclose(report.per_class_iou, iou)
+    assert report.mean_iou == pytest.approx(iou.mean())
+    assert report.pixel_accuracy == pytest.approx(tp.sum() / expected.sum())
+    assert report.pixels == expected.sum()
+
+
+def test_confusion_matrix_merge_equals_single_pass() -> None:
+    pairs = list(_pairs(6, seed=1))
+    single = ConfusionMatrix(4)
+    for t, p in pairs:
+        single.update(t, p)
+
+    parts = [ConfusionMatrix(4), ConfusionMatrix(4)]
+    for i, (t, p) in enumerate(pairs):
+        parts[i % 2].update(t, p)
+    merged = ConfusionMatrix.merge_all(pickle.loads(pickle.dumps(part)) for part in parts)
+    assert np.array_equal(merged.matrix, single.matrix)
+
+
+def test_confusion_matrix_undefined_classes_and_bad_ids() -> None:
+    cm = ConfusionMatrix(3, ignore_index=None)
+    cm.update(np.array([0, 0, 1]), np.array([0, 1, 1]))
+    report = cm.report()
+    assert np.isnan(report.per_class_iou[2])
+    assert report.named_iou(["bg", "a", "b"]) == {"bg": 0.5, "a": 0.5}
+    with pytest.raises(ValueError):
+        cm.update(np.array([3]), np.array([0]))
+
+
+def test_detection_ap_matches_hand_computed_curve() -> None:
+    ev = DetectionEvaluator(iou_thresholds=[0.5])
+    gt = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=float)
+    preds = np.array([[0, 0, 10, 10], [50, 50, 60, 60], [21, 21, 30, 30]], dtype=float)
+    ev.update(preds, [0.9, 0.8, 0.7], ["a", "a", "a"], gt, ["a", "a"])
+    report = ev.report()
+    assert report.ap[0, 0] == pytest.approx((51 * 1.0 + 50 * 2 / 3) / 101)
+    assert report.recall[0, 0] == 1.0
+    assert report.mean_ap_at(0.5) == pytest.approx(report.mean_ap)
+
+
+def test_detection_matching_is_greedy_by_score_and_per_class() -> None:
+    ev = DetectionEvaluator(iou_thresholds=[0.5, 0.95])
+    gt = np.array([[0, 0, 10, 10]], dtype=float)
+    preds = np.array([[0, 0, 10, 10], [0, 0, 10, 9]], dtype=float)
+    # At 0.5 the higher-scored 0.9-IoU box takes the match; at 0.95 only the exact box can.
+    ev.update(preds[::-1], [0.9, 0.5], ["a", "a"], gt, ["a"])
+    ev.update(preds[:1], [0.9], ["b"], gt, ["a"])  # wrong class: a false positive for "b"
+    report = ev.report()
+    assert report.classes == ("a", "b")
+    assert report.num_ground_truth.tolist() == [2, 0]
+    assert report.recall[0].tolist() == [0.5, 0.5]
+    assert report.ap[0].tolist() == pytest.approx([51 / 101, 0.5 * 51 / 101])
+    assert np.isnan(report.ap[1]).all()
+
+
+def test_evaluate_detections_parallel_matches_sequential() -> None:
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(40):
+        g = int(rng.integers(0, 6))
+        gxy = rng.uniform(0, 100, size=(g, 2))
+        gt = np.hstack([gxy, gxy + rng.uniform(10, 30, size=(g, 2))])
+        noisy = gt + rng.normal(0, 2, size=gt.shape)
+        extra = rng.uniform(0, 100, size=(3, 2))
+        preds = np.vstack([noisy, np.hstack([extra, extra + 15])])
+        images.append(
+            (
+                preds,
+                rng.uniform(size=len(preds)),
+                rng.choice(["car", "dog"], size=len(preds)),
+                gt,
+                rng.choice(["car", "dog"], size=g),
+            )
+        )
+    sequential = DetectionEvaluator()
+    for image in images:
+        sequential.update(*image)
+    expected = sequential.report()
+
+    parallel = evaluate_detections(images, workers=2, chunk_size=7).report()
+    chunked = evaluate_detections(images, chunk_size=5).report()
+    for got in (parallel, chunked):
+        assert got.classes == expected.classes
+        assert np.array_equal(got.ap, expected.ap, equal_nan=True)
+        assert got.mean_ap == expected.mean_ap
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.vision.model_cache import ModelKey, ModelRegistry, estimate_model_bytes
+
+
+def _key(name: str) -> ModelKey:
+    return ModelKey("fake", name, "w", "cpu")
+
+
+def test_registry_loads_once_per_key() -> None:
+    registry = ModelRegistry()
+    calls = []
+    loader = lambda: calls.append(1) or object()  # noqa: E731
+    first = registry.get(_key("a"), loader)
+    assert registry.get(_key("a"), loader) is first
+    assert len(calls) == 1
+
+
+def test_registry_concurrent_requests_share_one_load() -> None:
+    registry = ModelRegistry()
+    calls = []
+
+    def slow_loader() -> object:
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get(_key("a"), slow_loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_registry_never_loads_concurrently_after_a_failed_load() -> None:
+    registry = ModelRegistry()
+    calls = []
+    active = []
+    overlaps = []
+
+    def flaky_loader() -> object:
+        calls.append(1)
+        active.append(1)
+        overlaps.append(len(active) > 1)
+        time.sleep(0.05)
+        active.pop()
+        if len(calls) == 1:
+            raise OSError("download failed")
+        return object()
+
+    def get() -> None:
+        try:
+            registry.get(_key("a"), flaky_loader)
+        except OSError:
+            pass
+
+    first = threading.Thread(target=get)
+    first.start()
+    time.sleep(0.01)
+    waiter = threading.Thread(target=get)  # queues behind the failing load
+    waiter.start()
+    time.sleep(0.06)  # the first load has failed; the waiter is retrying
+    late = [threading.Thread(target=get) for _ in range(4)]
+    for t in late:
+        t.start()
+    for t in [first, waiter, *late]:
+        t.join()
+    assert len(calls) == 2 and not any(overlaps)
+    assert _key("a") in registry and not registry._loading
+
+
+def test_registry_evicts_least_recently_used_over_budget() -> None:
+    registry = ModelRegistry(max_bytes=100, size_of=lambda m: m["size"])
+    registry.get(_key("a"), lambda: {"size": 40})
+    registry.get(_key("b"), lambda: {"size": 40})
+    registry.get(_key("a"), lambda: {"size": 40})  # touch "a"
+    registry.get(_key("c"), lambda: {"size": 40})
+    assert registry.keys() == [_key("a"), _key("c")]
+    registry.set_max_bytes(50)
+    assert registry.keys() == [_key("c")]
+
+
+def test_registry_warmup_and_failed_loads_are_not_cached() -> None:
+    registry = ModelRegistry()
+    registry.warmup([(_key("a"), object), (_key("b"), object)])
+    assert len(registry) == 2
+
+    def broken() -> object:
+        raise OSError("download failed")
+
+    with pytest.raises(OSError):
+        registry.get(_key("c"), broken)
+    assert _key("c") not in registry
+
+
+def test_estimate_model_bytes_duck_types_wrappers() -> None:
+    class Variable:
+        def __init__(self, arr: np.ndarray) -> None:
+            self.shape = arr.shape
+            self.dtype = arr.dtype
+
+    class TfLike:
+        variables = [Variable(np.zeros((10, 10), dtype=np.float32))]
+
+    class Wrapper:
+        model = TfLike()
+
+    assert estimate_model_bytes(Wrapper()) == 400
+    assert estimate_model_bytes(object()) == 0
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from src.vision.batch import PostprocessConfig, postprocess_image
+from src.vision.pipeline import iter_image_files, stream_detections
+
+
+@dataclass
+class _Raw:
+    boxes: np.ndarray
+    scores: np.ndarray
+    labels: np.ndarray
+
+
+def _fake_detect(images: List[Image.Image]) -> List[_Raw]:
+    # Detections derived from the pixel data, so results are tied to their input.
+    out = []
+    for im in images:
+        seed = int(np.asarray(im)[0, 0, 0])
+        rng = np.random.default_rng(seed)
+        xy = rng.uniform(0, 50, size=(20, 2))
+        out.append(
+            _Raw(np.hstack([xy, xy + 10.0]), rng.uniform(size=20), rng.integers(0, 3, size=20))
+        )
+    return out
+
+
+def _frames(n: int):
+    for k in range(n):
+        yield np.full((8, 8, 3), k, dtype=np.uint8)
+
+
+def test_stream_detections_preserves_order_and_contract(tmp_path) -> None:
+    for k in range(5):
+        Image.new("RGB", (8, 8), color=(k, k, k)).save(tmp_path / f"{k:02d}.png")
+    (tmp_path / "notes.txt").write_text("skip me")
+
+    config = PostprocessConfig(threshold=0.3, iou_threshold=0.4)
+    results = list(
+        stream_detections(iter_image_files(tmp_path), _fake_detect, config, batch_size=2)
+    )
+
+    assert [r.index for r in results] == list(range(5))
+    assert [r.source.name for r in results] == [f"{k:02d}.png" for k in range(5)]
+    for r in results:
+        raw = _fake_detect([r.image])[0]
+        xyxy, scores, labels = postprocess_image(raw.boxes, raw.scores, raw.labels, config)
+        assert np.array_equal(r.detections.boxes.xyxy, xyxy)
+        assert np.array_equal(r.detections.scores, scores)
+        assert np.array_equal(r.detections.labels, labels)
+
+
+def test_stream_detections_is_lazy_and_bounded() -> None:
+    consumed = []
+
+    def source():
+        for k, frame in enumerate(_frames(1000)):
+            consumed.append(k)
+            yield frame
+
+    stream = stream_detections(source(), _fake_detect, batch_size=4, prefetch=8, keep_images=False)
+    first = next(stream)
+    assert first.index == 0 and first.image is None
+    assert len(consumed) <= 4 + 8 + 4
+    stream.close()
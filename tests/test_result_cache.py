@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.vision.contracts import DetectionResult
+from src.vision.model_cache import ModelKey
+from src.vision.result_cache import ResultCache, cache_key, image_digest
+
+MODEL = ModelKey("torchvision", "ssdlite", "COCO_V1", "cpu")
+
+
+def _result(seed: int, n: int = 20) -> DetectionResult:
+    rng = np.random.default_rng(seed)
+    return DetectionResult(
+        boxes=rng.uniform(0, 500, size=(n, 4)),
+        scores=rng.random(n).astype(np.float32),
+        class_ids=rng.integers(0, 5, size=n),
+        names={1: "person", 3: "car"},
+        fallback="id_{}",
+    )
+
+
+def test_roundtrip_is_exact(tmp_path) -> None:
+    cache = ResultCache(tmp_path)
+    result = _result(0)
+    cache.put_detections("aa" * 32, result)
+    got = cache.get_detections("aa" * 32)
+    assert np.array_equal(got.boxes.xyxy, result.boxes.xyxy)  # float64 kept when needed
+    assert np.array_equal(got.scores, result.scores) and got.scores.dtype == np.float32
+    assert got.labels.tolist() == result.labels.tolist()
+
+    class_map = np.zeros((70, 90), dtype=np.int16)
+    class_map[10:40, 20:60] = 300
+    cache.put_class_map("bb" * 32, class_map)
+    got_map = cache.get_class_map("bb" * 32)
+    assert got_map.dtype == np.int16 and np.array_equal(got_map, class_map)
+
+    assert cache.get_detections("cc" * 32) is None
+    assert len(cache) == 2 and "aa" * 32 in cache
+    with pytest.raises(ValueError):
+        cache.get_detections("bb" * 32)
+
+
+def test_keys(tmp_path) -> None:
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    path = tmp_path / "frame.png"
+    Image.fromarray(frame).save(path)
+    digests = {image_digest(frame), image_digest(Image.fromarray(frame)), image_digest(path)}
+    assert len(digests) == 3
+    assert image_digest(str(path)) == image_digest(path)
+
+    key = cache_key("img", MODEL, {"max_detections": 100, "size": [320, 320]})
+    on_gpu = dataclasses.replace(MODEL, device="cuda")
+    assert key == cache_key("img", on_gpu, {"size": [320, 320], "max_detections": 100})
+    assert key != cache_key("img", MODEL, {"max_detections": 50, "size": [320, 320]})
+    assert key != cache_key("img", ModelKey("torchvision", "ssdlite", "other", "cpu"))
+    with pytest.raises(ValueError):
+        cache_key("img", MODEL, {"transform": object()})
+
+
+def test_lru_eviction(tmp_path) -> None:
+    cache = ResultCache(tmp_path)
+    keys = [f"{i:02d}" * 32 for i in range(4)]
+    for t, key in enumerate(keys):
+        cache.put_detections(key, _result(t))
+        os.utime(cache.path(key), (1000 + t, 1000 + t))
+    cache.get_detections(keys[0])  # most recently used now
+    entry = os.path.getsize(cache.path(keys[0]))
+    assert cache.prune(2 * entry) == 2
+    assert [k in cache for k in keys] == [True, False, False, True]
+
+    capped = ResultCache(tmp_path / "capped", max_bytes=10 * entry)
+    for i in range(40):
+        capped.put_detections(f"{i:064x}", _result(i))
+    assert capped.size_bytes() <= 10 * entry
+    assert f"{39:064x}" in capped
+
+
+def test_detect_many_runs_the_detector_on_misses_only(tmp_path) -> None:
+    paths = []
+    for i in range(5):
+        paths.append(tmp_path / f"{i}.png")
+        Image.fromarray(np.full((8, 8, 3), i, dtype=np.uint8)).save(paths[-1])
+    calls = []
+
+    def detect(images):
+        calls.append(len(images))
+        return [_result(int(np.asarray(im)[0, 0, 0])) for im in images]
+
+    cache = ResultCache(tmp_path / "cache")
+    first = list(cache.detect_many(paths[:3], detect, MODEL, batch_size=2))
+    assert calls == [2, 1]
+    both = list(cache.detect_many(paths, detect, MODEL, batch_size=2))
+    assert calls == [2, 1, 2]
+    for i, r in enumerate(both):
+        assert np.array_equal(r.boxes.xyxy, _result(i).boxes.xyxy)
+    assert np.array_equal(first[2].scores, both[2].scores)
+
+
+def _writer(root: str, seed: int) -> int:
+    cache = ResultCache(root, max_bytes=1 << 20)
+    ok = 0
+    for i in range(30):
+        key = f"{i % 10:064x}"
+        cache.put_detections(key, _result(i % 10))
+        j = (i * 7 + seed) % 10
+        got = cache.get_detections(f"{j:064x}")
+        ok += got is None or np.array_equal(got.boxes.xyxy, _result(j).boxes.xyxy)
+    return ok
+
+
+def test_concurrent_writers_never_expose_partial_entries(tmp_path) -> None:
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        assert list(pool.map(_writer, [str(tmp_path)] * 3, range(3))) == [30, 30, 30]
+    assert len(ResultCache(tmp_path)) == 10
+    assert not [p for p in tmp_path.rglob("*") if p.name.endswith(".tmp")]
+
+
+def test_detect_many_streams_hits(tmp_path) -> None:
+    frames = [np.full((8, 8, 3), i, dtype=np.uint8) for i in range(6)]
+    cache = ResultCache(tmp_path)
+    for i, frame in enumerate(frames):
+        cache.put_detections(cache_key(image_digest(frame), MODEL), _result(i))
+    consumed = []
+
+    def source():
+        for i, frame in enumerate(frames):
+            consumed.append(i)
+            yield frame
+
+    def detect(images):
+        raise AssertionError("all inputs are cached")
+
+    results = cache.detect_many(source(), detect, MODEL, batch_size=4)
+    first = next(results)
+    assert consumed == [0]
+    assert np.array_equal(first.boxes.xyxy, _result(0).boxes.xyxy)
+    assert len(list(results)) == 5
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.vision.segmentation import class_map_dtype
+
+
+def test_class_map_dtype_picks_smallest_that_fits() -> None:
+    assert class_map_dtype(21) == np.uint8
+    assert class_map_dtype(256) == np.uint8
+    assert class_map_dtype(257) == np.int16
+    assert class_map_dtype(21, np.int64) == np.int64
+
+
+def test_class_map_dtype_rejects_unsupported_or_too_small() -> None:
+    with pytest.raises(ValueError):
+        class_map_dtype(21, np.float32)
+    with pytest.raises(ValueError):
+        class_map_dtype(300, np.uint8)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from src.vision.service import DetectionService, ServiceOverloadedError
+
+
+def test_service_batches_concurrent_requests_and_routes_results() -> None:
+    batch_sizes: List[int] = []
+
+    def infer(items: List[int]) -> List[int]:
+        batch_sizes.append(len(items))
+        return [x * 10 for x in items]
+
+    async def main() -> List[int]:
+        async with DetectionService(infer, max_batch_size=4, max_wait_ms=50) as service:
+            results = await asyncio.gather(*(service.submit(i) for i in range(10)))
+            stats = service.stats()
+        assert stats.completed == 10 and stats.batches == len(batch_sizes)
+        assert stats.batch_fill_ratio == pytest.approx(10 / (4 * len(batch_sizes)))
+        return results
+
+    assert asyncio.run(main()) == [i * 10 for i in range(10)]
+    assert max(batch_sizes) == 4 and sum(batch_sizes) == 10
+
+
+def test_service_flushes_partial_batch_after_max_wait() -> None:
+    async def main() -> int:
+        async with DetectionService(lambda xs: xs, max_batch_size=64, max_wait_ms=1) as service:
+            return await asyncio.wait_for(service.submit(7), timeout=5)
+
+    assert asyncio.run(main()) == 7
+
+
+def test_service_propagates_inference_errors_to_every_caller() -> None:
+    def infer(items):
+        raise ValueError("boom")
+
+    async def main() -> None:
+        async with DetectionService(infer, max_batch_size=2, max_wait_ms=20) as service:
+            outcomes = await asyncio.gather(
+                service.submit(1), service.submit(2), return_exceptions=True
+            )
+            assert all(isinstance(o, ValueError) for o in outcomes)
+            assert service.stats().failed == 2
+
+    asyncio.run(main())
+
+
+def test_service_rejects_when_queue_is_full() -> None:
+    release = threading.Event()
+
+    def infer(items):
+        release.wait(5)
+        return items
+
+    async def main() -> None:
+        async with DetectionService(
+            infer, max_batch_size=1, max_wait_ms=0, max_queue_size=1
+        ) as service:
+            first = asyncio.ensure_future(service.submit(0))
+            await asyncio.sleep(0.05)  # first request is now inside infer
+            # The collector holds the next batch while waiting for a free slot,
+            # then the single queue slot fills up.
+            pending = [asyncio.ensure_future(service.submit(i)) for i in (1, 2)]
+            await asyncio.sleep(0.05)
+            try:
+                with pytest.raises(ServiceOverloadedError):
+                    await service.submit_nowait(3)
+                assert service.stats().rejected == 1
+                assert service.stats().queue_depth == 1
+            finally:
+                release.set()
+            assert await asyncio.gather(first, *pending) == [0, 1, 2]
+
+    asyncio.run(main())
+
+
+def test_stop_resolves_every_request_when_the_queue_is_full() -> None:
+    release = threading.Event()
+
+    def infer(items):
+        release.wait(5)
+        return items
+
+    async def main() -> None:
+        service = DetectionService(infer, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+        await service.start()
+        requests = [asyncio.ensure_future(service.submit(i)) for i in range(4)]
+        await asyncio.sleep(0.05)  # 0 in infer, 1 held by the collector, 2 queued, 3 waiting
+        assert service.stats().queue_depth == 1
+        release.set()
+        assert await requests[0] == 0
+        # The collector has just taken 2, so the stop marker gets the free slot
+        # ahead of request 3, which is only enqueued after the collector exits.
+        await service.stop()
+        outcomes = await asyncio.wait_for(
+            asyncio.gather(*requests, return_exceptions=True), timeout=5
+        )
+        assert outcomes[:3] == [0, 1, 2]
+        assert isinstance(outcomes[3], RuntimeError) and "stopped" in str(outcomes[3])
+
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.vision.boxes import iou_matrix
+from src.vision.contracts import batched_nms, nms
+from src.vision.spatial import GridIndex
+
+
+def _dense_small_boxes(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 400, size=(n, 2))
+    xyxy = np.hstack([xy, xy + rng.uniform(2, 15, size=(n, 2))])
+    xyxy[:5, 2:] += 200  # a few oversized boxes
+    return xyxy
+
+
+def test_grid_query_returns_every_intersecting_box() -> None:
+    xyxy = _dense_small_boxes(500, seed=0)
+    index = GridIndex.build(xyxy)
+    overlaps = iou_matrix(xyxy, xyxy) > 0.0
+    for i in range(0, 500, 7):
+        cand = set(index.query(*xyxy[i]).tolist())
+        assert set(np.flatnonzero(overlaps[i]).tolist()) <= cand
+
+
+def test_grid_nms_matches_dense_nms() -> None:
+    xyxy = _dense_small_boxes(1500, seed=1)
+    scores = np.random.default_rng(2).uniform(size=1500)
+    labels = np.random.default_rng(3).integers(0, 4, size=1500)
+    for thr in (0.0, 0.3):
+        assert nms(xyxy, scores, thr, strategy="grid") == nms(xyxy, scores, thr, strategy="dense")
+        assert batched_nms(xyxy, scores, labels, thr, strategy="grid") == batched_nms(
+            xyxy, scores, labels, thr, strategy="dense"
+        )
+    assert nms(xyxy, scores, 0.3, strategy="grid", max_output=10) == nms(
+        xyxy, scores, 0.3, strategy="dense", max_output=10
+    )
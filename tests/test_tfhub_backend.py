@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image
+
+from src.vision.tfhub_backend import choose_input_shape, decode_entities, letterbox
+
+
+def test_choose_input_shape_matches_aspect_ratio() -> None:
+    shapes = [(480, 640), (640, 480), (640, 640)]
+    assert choose_input_shape(1920, 1080, shapes) == (480, 640)
+    assert choose_input_shape(1080, 1920, shapes) == (640, 480)
+    assert choose_input_shape(500, 520, shapes) == (640, 640)
+    assert choose_input_shape(100, 100, [(320, 320), (640, 640)]) == (640, 640)
+
+
+def test_letterbox_scales_into_the_top_left_corner() -> None:
+    image = Image.new("RGB", (200, 100), (10, 20, 30))
+    canvas, scale = letterbox(image, (480, 640))
+    assert canvas.shape == (480, 640, 3) and canvas.dtype == np.uint8
+    assert scale == 3.2
+    assert (canvas[:320, :640] == (10, 20, 30)).all()
+    assert not canvas[320:].any()
+
+
+def test_decode_entities_builds_a_name_table() -> None:
+    names, ids = decode_entities(np.array([b"Cat", b"Dog", b"Cat"], dtype=object))
+    assert [names[i] for i in ids] == ["Cat", "Dog", "Cat"]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.vision.tiling import (
+    TileGrid,
+    array_region_reader,
+    blend_weights,
+    iter_tile_batches,
+    stitch_tiles,
+)
+
+
+@pytest.mark.parametrize(
+    "width, height, tile, overlap",
+    [(100, 70, 32, 8), (100, 70, 32, 0), (20, 90, 32, 8), (64, 64, 64, 16), (97, 53, 30, 29)],
+)
+def test_stitch_tiles_matches_dense_blending(width, height, tile, overlap) -> None:
+    rng = np.random.default_rng(width * height + tile + overlap)
+    grid = TileGrid.build(width, height, tile, overlap)
+    tiles = [rng.normal(size=(5, grid.tile_h, grid.tile_w)).astype(np.float32) for _ in grid]
+
+    acc = np.zeros((5, height, width), dtype=np.float64)
+    w = blend_weights(grid.tile_h, grid.tile_w, overlap)
+    for (x0, y0, x1, y1), logits in zip(grid, tiles):
+        acc[:, y0:y1, x0:x1] += logits * w
+
+    out = stitch_tiles(grid, iter(tiles))
+    assert out.dtype == np.uint8
+    assert np.array_equal(out, np.argmax(acc, axis=0))
+
+
+def test_stitch_tiles_of_global_logits_is_seamless() -> None:
+    rng = np.random.default_rng(0)
+    logits = rng.normal(size=(3, 50, 80))
+    grid = TileGrid.build(80, 50, 24, 6)
+    out = np.zeros((50, 80), dtype=np.int16)
+    stitch_tiles(grid, (logits[:, y0:y1, x0:x1] for x0, y0, x1, y1 in grid), out=out)
+    assert np.array_equal(out, np.argmax(logits, axis=0))
+
+    # Rows start at 0, 18 and 26: the widest strip (before the last row, shifted
+    # back to end at the border) is 3 classes x (24 - 8) rows x 80 columns.
+    strip = 3 * 16 * 80 * 4
+    tiles = (logits[:, y0:y1, x0:x1] for x0, y0, x1, y1 in grid)
+    stitch_tiles(grid, tiles, max_carry_bytes=strip)
+    with pytest.raises(ValueError, match="max_carry_bytes"):
+        tiles = (logits[:, y0:y1, x0:x1] for x0, y0, x1, y1 in grid)
+        stitch_tiles(grid, tiles, max_carry_bytes=strip - 1)
+
+
+def test_tile_batches_cover_grid_in_order() -> None:
+    image = np.arange(40 * 30 * 3, dtype=np.uint8).reshape(30, 40, 3)
+    grid = TileGrid.build(40, 30, 16, 4)
+    batches = list(iter_tile_batches(grid, array_region_reader(image), 3))
+    tiles = [t for b in batches for t in b]
+    assert len(tiles) == len(grid) and all(len(b) <= 3 for b in batches)
+    x0, y0, x1, y1 = list(grid)[-1]
+    assert np.array_equal(tiles[-1], image[y0:y1, x0:x1])
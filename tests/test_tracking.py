@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+import pytest
+
+from src.vision.tracking import Tracker, greedy_assignment, hungarian_assignment
+
+
+def _frames(n_frames: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(0, 900, size=(20, 2))
+    velocity = rng.uniform(-6, 6, size=(20, 2))
+    size = rng.uniform(30, 60, size=(20, 2))
+    for f in range(n_frames):
+        xy = start + velocity * f
+        yield np.hstack([xy, xy + size]) + rng.normal(0, 0.5, size=(20, 4))
+
+
+def test_tracker_keeps_ids_through_motion_and_short_gaps() -> None:
+    tracker = Tracker(iou_threshold=0.3, max_age=3, min_hits=2)
+    ids = {}
+    for f, boxes in enumerate(_frames(40)):
+        if 10 <= f < 13:  # object 0 is missed for three frames
+            keep = np.arange(1, 20)
+        else:
+            keep = np.arange(20)
+        out = tracker.update(boxes[keep], labels=keep)
+        for obj, track_id in zip(out.labels.tolist(), out.track_ids.tolist()):
+            ids.setdefault(obj, set()).add(track_id)
+        np.testing.assert_array_equal(out.boxes.xyxy, boxes[keep][out.detection_index])
+    assert len(ids) == 20
+    assert all(len(v) == 1 for v in ids.values())
+    assert len(tracker) == 20
+
+
+def test_tracker_lifecycle() -> None:
+    tracker = Tracker(max_age=1, min_hits=2)
+    box = np.array([[0.0, 0.0, 10.0, 10.0]])
+    assert tracker.update(box).track_ids.tolist() == [0]  # reported during warm-up
+    tracker.update(box)
+    tracker.update(box)
+    assert len(tracker.update(box + 100)) == 0  # new track, not yet confirmed
+    tracker.update(np.empty((0, 4)))
+    tracker.update(np.empty((0, 4)))
+    assert len(tracker) == 0  # both tracks outlived max_age
+    with pytest.raises(ValueError):
+        Tracker(assignment="auction")  # type: ignore[arg-type]
+
+
+def test_greedy_assignment_is_one_to_one_and_ordered() -> None:
+    rng = np.random.default_rng(0)
+    iou = rng.uniform(0, 1, size=(6, 8))
+    rows, cols = greedy_assignment(iou, 0.3)
+    assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+    assert (iou[rows, cols] >= 0.3).all()
+    assert rows[0] * 8 + cols[0] == int(np.argmax(iou))
+    assert np.all(np.diff(iou[rows, cols]) <= 0)
+
+
+def test_hungarian_assignment_is_optimal() -> None:
+    pytest.importorskip("scipy")
+    rng = np.random.default_rng(1)
+    iou = rng.uniform(0, 1, size=(5, 5))
+    rows, cols = hungarian_assignment(iou, 0.0)
+    best = max(sum(iou[i, p[i]] for i in range(5)) for p in itertools.permutations(range(5)))
+    assert iou[rows, cols].sum() == pytest.approx(best)
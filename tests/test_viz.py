@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.vision.batch import ImageResult
+from src.vision.boxes import BoxArray
+from src.vision.viz import BoxRenderer, draw_boxes, draw_boxes_array, load_font
+
+
+def test_draw_boxes_array_matches_pil_outlines() -> None:
+    rng = np.random.default_rng(0)
+    for width in (1, 3, 6):
+        xy = rng.uniform(-20, 100, size=(20, 2))
+        xyxy = np.hstack([xy, xy + rng.uniform(2 * width + 1, 40, size=(20, 2))])
+        image = Image.new("RGB", (90, 70), "white")
+        draw = ImageDraw.Draw(image)
+        for box in xyxy:
+            draw.rectangle(box.tolist(), outline="blue", width=width)
+        frame = np.full((70, 90, 3), 255, dtype=np.uint8)
+        assert draw_boxes_array(frame, BoxArray(xyxy), color="blue", width=width) is frame
+        np.testing.assert_array_equal(frame, np.asarray(image))
+
+
+def test_box_renderer_matches_draw_boxes_in_place() -> None:
+    boxes = BoxArray(np.array([[10, 40, 60, 60], [5, 2, 30, 30], [70, 50, 120, 90]], float))
+    result = ImageResult(boxes, np.array([0.9, 0.5, 0.25]), np.array(["cat", "dog", ""], object))
+    base = Image.new("RGB", (100, 80), "white")
+    expected = np.asarray(
+        draw_boxes(base, boxes, result.scores, result.labels, width=2, font_size=12)
+    )
+    assert np.asarray(base).min() == 255  # the copy was drawn on
+
+    renderer = BoxRenderer(width=2, font_size=12, max_cached_labels=2)
+    image, frame = renderer.draw_batch(
+        [base.copy(), np.full((80, 100, 3), 255, dtype=np.uint8)], [result, result]
+    )
+    np.testing.assert_array_equal(np.asarray(image), expected)
+    np.testing.assert_array_equal(frame, expected)
+    assert len(renderer._patches) == 2
+
+    assert draw_boxes(base, boxes, inplace=True) is base
+    assert load_font(12) is load_font(12)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Iterator, List
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.vision import yolo_ultralytics_det
+from src.vision.yolo_ultralytics_det import YoloPredictor
+
+
+class _FakeTensor:
+    """The slice of the torch tensor API that ``_to_result`` uses."""
+
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = data
+        self.shape = data.shape
+
+    def __getitem__(self, item: Any) -> _FakeTensor:
+        return _FakeTensor(self.data[item])
+
+    def cpu(self) -> _FakeTensor:
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self.data
+
+
+class _FakeYolo:
+    """
+    Stands in for ``ultralytics.YOLO``. An ndarray frame whose pixels are
+    ``(2, 1, i)`` after BGR reordering yields ``i + 1`` boxes scored ``i``; a
+    PIL frame yields ``boxes=None``.
+    """
+
+    names = {0: "cat", 1: "dog"}
+
+    def __init__(self) -> None:
+        self.calls: List[List[Any]] = []
+        self.kwargs: List[dict] = []
+
+    def predict(self, frames: List[Any], **kwargs: Any) -> Iterator[SimpleNamespace]:
+        self.calls.append(list(frames))
+        self.kwargs.append(kwargs)
+        for frame in frames:
+            if isinstance(frame, Image.Image):
+                yield SimpleNamespace(boxes=None)
+                continue
+            i = int(frame[0, 0, 2])
+            n = i + 1
+            boxes = np.tile([0.0, 0.0, 1.0, 1.0], (n, 1))
+            yield SimpleNamespace(
+                boxes=SimpleNamespace(
+                    xyxy=_FakeTensor(boxes),
+                    conf=_FakeTensor(np.full(n, float(i))),
+                    cls=_FakeTensor(np.arange(n) % 2),
+                )
+            )
+
+
+def _frame(i: int) -> np.ndarray:
+    """An RGB frame whose pixels are ``(i, 1, 2)``."""
+    return np.broadcast_to(np.array([i, 1, 2], dtype=np.uint8), (2, 2, 3)).copy()
+
+
+@pytest.fixture
+def fake_model(monkeypatch: pytest.MonkeyPatch) -> _FakeYolo:
+    model = _FakeYolo()
+    monkeypatch.setattr(yolo_ultralytics_det, "load_yolo_model", lambda name: model)
+    return model
+
+
+def test_predictor_chunks_frames_by_batch_size(fake_model: _FakeYolo) -> None:
+    predictor = YoloPredictor(batch_size=2, device="cpu", conf=0.5)
+    results = predictor(_frame(i) for i in range(5))
+
+    assert [len(chunk) for chunk in fake_model.calls] == [2, 2, 1]
+    assert [float(r.scores[0]) for r in results] == [0, 1, 2, 3, 4]
+    assert fake_model.kwargs[0] == {
+        "stream": True, "conf": 0.5, "verbose": False, "max_det": 50, "device": "cpu",
+    }
+
+
+def test_predictor_reorders_ndarray_frames_to_bgr(fake_model: _FakeYolo) -> None:
+    frame = _frame(7)
+    YoloPredictor(batch_size=4)([frame])
+
+    sent = fake_model.calls[0][0]
+    assert sent.flags.c_contiguous
+    assert (sent[0, 0] == (2, 1, 7)).all()
+    assert (frame[0, 0] == (7, 1, 2)).all()  # the caller's frame is untouched
+
+
+def test_predictor_handles_frames_without_boxes(fake_model: _FakeYolo) -> None:
+    image = Image.new("RGB", (4, 4))
+    results = YoloPredictor(batch_size=2)([_frame(0), image, _frame(1)])
+
+    assert fake_model.calls[0][1] is image  # PIL frames pass through as-is
+    assert [len(r.boxes) for r in results] == [1, 0, 2]
+    empty = results[1]
+    assert len(empty) == 0 and empty.class_ids.dtype == np.int64
+
+
+def test_predictor_truncates_to_max_detections(fake_model: _FakeYolo) -> None:
+    results = YoloPredictor(max_detections=3, batch_size=8)([_frame(1), _frame(5)])
+
+    assert [len(r.boxes) for r in results] == [2, 3]
+    assert [len(r.scores) for r in results] == [2, 3]
+    assert list(results[1].labels) == ["cat", "dog", "cat"]
+    assert fake_model.kwargs[0]["max_det"] == 3
+
+
+def test_predictor_rejects_bad_arguments(fake_model: _FakeYolo) -> None:
+    with pytest.raises(ValueError, match="batch_size"):
+        YoloPredictor(batch_size=0)
+    with pytest.raises(ValueError, match="max_detections"):
+        YoloPredictor(max_detections=0)